@@ -4,7 +4,7 @@ set -euo pipefail
 SCRIPT_PATH="$(readlink -f "${BASH_SOURCE[0]}")"
 SCRIPT_DIR="$(cd "$(dirname "$SCRIPT_PATH")" && pwd)"
 CLAUDE_SETUP="$SCRIPT_DIR/claude-workflow/setup.sh"
-CODEX_INSTALL="$SCRIPT_DIR/codex-workflow/install.sh"
+CODEX_INSTALLER="$SCRIPT_DIR/codex-workflow/scripts/install_team.py"
 WORKSPACE_ROOT="${WORKSPACE_ROOT:-$(cd "$SCRIPT_DIR/.." && pwd -P)}"
 
 MODE="both" # claude | codex | both
@@ -24,7 +24,7 @@ Usage:
 Modes:
   --both                 Run Claude setup, then Codex install (default)
   --claude-only          Run only .claude-workflow/setup.sh
-  --codex-only           Run only .codex-workflow/install.sh
+  --codex-only           Run only the Codex installer (.codex-workflow/scripts/install_team.py setup)
 
 Codex options:
   --team <id>            Team id for Codex install (optional when auto-detection works)
@@ -115,58 +115,27 @@ run_claude_setup() {
   WORKSPACE_ROOT="$WORKSPACE_ROOT" bash "$CLAUDE_SETUP"
 }
 
-prompt_team_if_needed() {
-  if [[ -n "$TEAM" ]]; then
-    return
-  fi
+run_codex_install() {
+  require_file "$CODEX_INSTALLER"
 
-  if [[ "$AUTO_TEAM" -eq 1 ]]; then
-    local detected_team=""
-    if [[ "$USER_SET_WORKSPACE_ROOT" -eq 1 ]]; then
-      detected_team="$(bash "$CODEX_INSTALL" --detect-team "${CODEX_ARGS[@]}" 2>/dev/null || true)"
-    else
-      detected_team="$(bash "$CODEX_INSTALL" --workspace-root "$WORKSPACE_ROOT" --detect-team "${CODEX_ARGS[@]}" 2>/dev/null || true)"
-    fi
-    detected_team="$(echo "$detected_team" | tr -d '\r\n')"
-    if [[ -n "$detected_team" ]]; then
-      TEAM="$detected_team"
-      echo ""
-      echo "Auto-detected Codex team: $TEAM"
-      return
-    fi
+  # Detection, optional team listing/prompting and installation all run in a
+  # single `install_team.py setup` process that shares the parsed state.
+  local -a setup_args=(setup)
+  if [[ "$USER_SET_WORKSPACE_ROOT" -eq 0 ]]; then
+    setup_args+=(--workspace-root "$WORKSPACE_ROOT")
   fi
-
-  echo ""
-  echo "Codex team not specified."
-  if [[ "$USER_SET_WORKSPACE_ROOT" -eq 1 ]]; then
-    bash "$CODEX_INSTALL" --list-teams
-  else
-    bash "$CODEX_INSTALL" --workspace-root "$WORKSPACE_ROOT" --list-teams
+  if [[ -n "$TEAM" ]]; then
+    setup_args+=(--team "$TEAM")
   fi
-  read -r -p "Enter team id for Codex install: " TEAM
-  if [[ -z "$TEAM" ]]; then
-    echo "Error: team id is required for Codex install." >&2
-    exit 2
+  if [[ "$AUTO_TEAM" -eq 0 ]]; then
+    setup_args+=(--no-auto-team)
   fi
-}
-
-run_codex_install() {
-  require_file "$CODEX_INSTALL"
-
   if [[ "$LIST_TEAMS" -eq 1 ]]; then
-    bash "$CODEX_INSTALL" --list-teams
-    return
+    setup_args+=(--list-teams)
   fi
 
-  prompt_team_if_needed
-
   echo ""
-  echo "==> Running Codex workflow install for team: $TEAM"
-  if [[ "$USER_SET_WORKSPACE_ROOT" -eq 1 ]]; then
-    bash "$CODEX_INSTALL" --team "$TEAM" "${CODEX_ARGS[@]}"
-  else
-    bash "$CODEX_INSTALL" --workspace-root "$WORKSPACE_ROOT" --team "$TEAM" "${CODEX_ARGS[@]}"
-  fi
+  python3 "$CODEX_INSTALLER" "${setup_args[@]}" "${CODEX_ARGS[@]}"
 }
 
 main() {
@@ -0,0 +1,432 @@
+"""
+Plan/execute filesystem engine used by install_team.py.
+
+Installer helpers describe what they need (directories, files written only when
+missing, lines appended only when absent, copies, deletions) against a snapshot
+of the existing tree gathered with one os.scandir walk. The resulting
+ActionPlan is deduplicated and can be printed (dry-run), serialized as JSON, or
+executed in batch: directory operations first, then independent file
+operations in parallel. Files are written to a temporary sibling and renamed
+into place, so readers never observe a partially written file.
+
+The module also provides the primitives for staged installs: an advisory
+per-path file lock, hard-link tree cloning and an atomic directory swap.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+
+class TreeState:
+  """Snapshot of existing paths: ``{path: (is_dir, size, mtime_ns)}``."""
+
+  def __init__(self) -> None:
+    self.entries: Dict[str, tuple[bool, int, int]] = {}
+
+  def scan(self, root: Path, max_depth: int, with_stats: bool = False) -> "TreeState":
+    """Record ``root`` and everything up to ``max_depth`` levels below it."""
+    root_str = str(root)
+    try:
+      root_stat = os.stat(root_str)
+    except OSError:
+      return self
+    self.entries[root_str] = (os.path.isdir(root_str), root_stat.st_size, root_stat.st_mtime_ns)
+    if not self.entries[root_str][0]:
+      return self
+    stack = [(root_str, 0)]
+    while stack:
+      directory, depth = stack.pop()
+      if depth >= max_depth:
+        continue
+      try:
+        with os.scandir(directory) as it:
+          for entry in it:
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if with_stats and not is_dir:
+              stat = entry.stat()
+              self.entries[entry.path] = (False, stat.st_size, stat.st_mtime_ns)
+            else:
+              self.entries[entry.path] = (is_dir, 0, 0)
+            if is_dir:
+              stack.append((entry.path, depth + 1))
+      except OSError:
+        continue
+    return self
+
+  def add_path(self, path: Path) -> "TreeState":
+    """Record a single path (one stat) without walking."""
+    try:
+      stat = os.stat(path)
+    except OSError:
+      return self
+    self.entries[str(path)] = (os.path.isdir(path), stat.st_size, stat.st_mtime_ns)
+    return self
+
+  def exists(self, path: Path) -> bool:
+    return str(path) in self.entries
+
+  def file_stat(self, path: Path) -> Optional[tuple[int, int]]:
+    entry = self.entries.get(str(path))
+    if entry is None or entry[0]:
+      return None
+    return entry[1], entry[2]
+
+
+class ActionPlan:
+  """Deduplicated list of mkdir/write/append/copy/link/delete/utime operations."""
+
+  def __init__(self, state: Optional[TreeState] = None) -> None:
+    self.state = state or TreeState()
+    self.directories: List[str] = []
+    self.operations: List[Dict[str, Any]] = []
+    # Every directory or file the plan creates, including ones it skips
+    # because they already exist.
+    self.outputs: Set[str] = set()
+    self._file_ops: Dict[str, Dict[str, Any]] = {}
+    self._lock = threading.Lock()
+
+  # -- planning ---------------------------------------------------------------
+
+  def mkdir(self, path: Path) -> None:
+    path_str = str(path)
+    self.outputs.add(path_str)
+    if self.state.exists(path) or path_str in self.directories:
+      return
+    self.directories.append(path_str)
+
+  def _ensure_parent(self, path: Path) -> None:
+    parent = path.parent
+    if not self.state.exists(parent):
+      self.mkdir(parent)
+
+  def _add_file_op(self, op: Dict[str, Any]) -> None:
+    path = op["path"]
+    previous = self._file_ops.get(path)
+    if previous is not None:
+      self.operations.remove(previous)
+    self._file_ops[path] = op
+    self.operations.append(op)
+
+  def write(self, path: Path, content: str, shared: bool = False) -> None:
+    """Write (or overwrite) ``path`` with ``content``."""
+    self.outputs.add(str(path))
+    self._ensure_parent(path)
+    self._add_file_op({"op": "write", "path": str(path), "content": content, "lines": [], "shared": shared, "overwrite": True})
+
+  def write_if_missing(self, path: Path, content: str, shared: bool = False) -> None:
+    self.outputs.add(str(path))
+    if self.state.exists(path) or str(path) in self._file_ops:
+      return
+    self._ensure_parent(path)
+    self._add_file_op({"op": "write", "path": str(path), "content": content, "lines": [], "shared": shared, "overwrite": False})
+
+  def append_line_if_missing(self, path: Path, line: str, shared: bool = False) -> None:
+    path_str = str(path)
+    self.outputs.add(path_str)
+    pending = self._file_ops.get(path_str)
+    if pending is not None and pending["op"] == "write":
+      pending["lines"].append(line)
+      if line.rstrip() not in (existing.rstrip() for existing in pending["content"].splitlines()):
+        if pending["content"] and not pending["content"].endswith("\n"):
+          pending["content"] += "\n"
+        pending["content"] += f"{line}\n"
+      return
+    if pending is not None and pending["op"] == "append":
+      if line not in pending["lines"] and not _log_contains(path, line):
+        pending["lines"].append(line)
+      return
+    if not self.state.exists(path):
+      self.write_if_missing(path, f"{line}\n", shared)
+      self._file_ops[path_str]["lines"].append(line)
+      return
+    if _log_contains(path, line):
+      return
+    self._add_file_op({"op": "append", "path": path_str, "lines": [line], "shared": shared})
+
+  def copy(self, src: Path, dst: Path, size: int = 0) -> None:
+    self.outputs.add(str(dst))
+    self._ensure_parent(dst)
+    self._add_file_op({"op": "copy", "path": str(dst), "src": str(src), "bytes": size})
+
+  def link(self, src: Path, dst: Path, digest: str, store: Any, mode: str, size: int = 0) -> None:
+    """Place ``src`` at ``dst`` through the content-addressed ``store`` using ``mode``."""
+    self.outputs.add(str(dst))
+    self._ensure_parent(dst)
+    self._add_file_op({
+      "op": "link",
+      "path": str(dst),
+      "src": str(src),
+      "sha256": digest,
+      "mode": mode,
+      "bytes": size,
+      "store": store,
+    })
+
+  def delete(self, path: Path, prune_until: Optional[Path] = None) -> None:
+    """Delete ``path``; emptied parent directories are removed up to ``prune_until``."""
+    op = {"op": "delete", "path": str(path)}
+    if prune_until is not None:
+      op["prune_until"] = str(prune_until)
+    self._add_file_op(op)
+
+  def utime(self, path: Path, atime_ns: int, mtime_ns: int) -> None:
+    self._add_file_op({"op": "utime", "path": str(path), "times_ns": [atime_ns, mtime_ns]})
+
+  def byte_count(self) -> int:
+    """Bytes the plan copies or writes."""
+    total = 0
+    for op in self.operations:
+      if op["op"] in ("copy", "link"):
+        total += op.get("bytes", 0)
+      elif op["op"] == "write":
+        total += len(op["content"].encode("utf-8"))
+    return total
+
+  # -- output -----------------------------------------------------------------
+
+  def to_json(self) -> Dict[str, Any]:
+    operations = [{"op": "mkdir", "path": path} for path in sorted(self.directories)]
+    for op in self.operations:
+      item = {key: value for key, value in op.items() if key not in ("content", "shared", "overwrite", "store")}
+      if op["op"] == "write":
+        item["bytes"] = len(op["content"].encode("utf-8"))
+        if not op["lines"]:
+          item.pop("lines")
+      operations.append(item)
+    return {"operations": operations}
+
+  def print_dry_run(self, stream: Any = None) -> None:
+    stream = stream or sys.stdout
+    for path in sorted(self.directories):
+      print(f"[dry-run] mkdir -p {path}", file=stream)
+    for op in self.operations:
+      kind = op["op"]
+      if kind == "write":
+        print(f"[dry-run] write {op['path']}", file=stream)
+      elif kind == "append":
+        for line in op["lines"]:
+          print(f"[dry-run] append line to {op['path']}: {line}", file=stream)
+      elif kind == "copy":
+        print(f"[dry-run] copy {op['src']} -> {op['path']}", file=stream)
+      elif kind == "link":
+        obj = op["store"].object_path(op["sha256"])
+        print(f"[dry-run] {op['mode']} {obj} -> {op['path']}", file=stream)
+      elif kind == "delete":
+        print(f"[dry-run] rm {op['path']}", file=stream)
+      elif kind == "utime":
+        print(f"[dry-run] touch {op['path']}", file=stream)
+
+  # -- execution --------------------------------------------------------------
+
+  def execute(self, jobs: int = 8, shared_lock: Any = None) -> None:
+    """Run directory operations, then file operations.
+
+    Independent file operations run on a thread pool. Operations flagged
+    ``shared`` touch files other installers may write concurrently; they run
+    serially under ``shared_lock`` (any context manager) and re-check the
+    file on disk first.
+    """
+    for path in sorted(self.directories, key=lambda item: item.count(os.sep)):
+      os.makedirs(path, exist_ok=True)
+
+    shared_ops = [op for op in self.operations if op.get("shared")]
+    local_ops = [op for op in self.operations if not op.get("shared")]
+    deleted: List[Dict[str, Any]] = []
+    if len(local_ops) > 1 and jobs > 1:
+      from concurrent.futures import ThreadPoolExecutor
+
+      with ThreadPoolExecutor(max_workers=min(jobs, len(local_ops))) as pool:
+        for _ in pool.map(lambda op: self._run_op(op, deleted), local_ops):
+          pass
+    else:
+      for op in local_ops:
+        self._run_op(op, deleted)
+
+    lock = shared_lock or threading.Lock()
+    with lock:
+      for op in shared_ops:
+        self._run_shared_op(op)
+
+    for op in sorted(deleted, key=lambda item: -item["path"].count(os.sep)):
+      if op.get("prune_until"):
+        _prune_empty_parents(Path(op["path"]).parent, Path(op["prune_until"]))
+
+  def _run_op(self, op: Dict[str, Any], deleted: List[Dict[str, Any]]) -> None:
+    kind = op["op"]
+    path = Path(op["path"])
+    if kind == "write":
+      atomic_write_text(path, op["content"])
+    elif kind == "append":
+      _append_lines(path, op["lines"])
+    elif kind == "copy":
+      import shutil
+
+      # Never copy onto the destination in place: it may be a hard link
+      # shared with the live install (see clone_tree).
+      tmp = _tmp_sibling(path)
+      shutil.copy2(op["src"], tmp)
+      os.replace(tmp, path)
+    elif kind == "link":
+      op["store"].materialize(Path(op["src"]), op["sha256"], path, op["mode"])
+    elif kind == "delete":
+      if path.exists() or path.is_symlink():
+        path.unlink()
+        with self._lock:
+          deleted.append(op)
+    elif kind == "utime":
+      os.utime(path, ns=tuple(op["times_ns"]))
+
+  def _run_shared_op(self, op: Dict[str, Any]) -> None:
+    path = Path(op["path"])
+    if op["op"] == "write" and (op["overwrite"] or not path.exists()):
+      path.parent.mkdir(parents=True, exist_ok=True)
+      atomic_write_text(path, op["content"])
+      return
+    lines = op.get("lines") or []
+    if lines and path.exists():
+      _append_lines(path, lines)
+
+
+def _log_contains(path: Path, line: str) -> bool:
+  from append_log import AppendLog
+
+  with AppendLog(path) as log:
+    return log.contains(line)
+
+
+def _append_lines(path: Path, lines: List[str]) -> None:
+  # Exact-line dedup through the log's line-hash sidecar: no full read or rewrite.
+  from append_log import AppendLog
+
+  with AppendLog(path) as log:
+    log.append(lines)
+
+
+def _prune_empty_parents(directory: Path, stop: Path) -> None:
+  while directory != stop and stop in directory.parents and directory.exists() and not any(directory.iterdir()):
+    try:
+      directory.rmdir()
+    except OSError:
+      return
+    directory = directory.parent
+
+
+def _tmp_sibling(path: Path) -> Path:
+  return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def atomic_write_text(path: Path, content: str) -> None:
+  """Write ``content`` to a temporary sibling and rename it over ``path``."""
+  tmp = _tmp_sibling(path)
+  try:
+    tmp.write_text(content, encoding="utf-8")
+    os.replace(tmp, path)
+  except BaseException:
+    if tmp.exists():
+      tmp.unlink()
+    raise
+
+
+def _is_current_file(handle: Any, path: Path) -> bool:
+  try:
+    on_disk = os.stat(path)
+  except FileNotFoundError:
+    return False
+  held = os.fstat(handle.fileno())
+  return (held.st_dev, held.st_ino) == (on_disk.st_dev, on_disk.st_ino)
+
+
+@contextlib.contextmanager
+def file_lock(path: Path, remove: bool = False) -> Any:
+  """Hold an exclusive advisory lock on ``path`` (created if needed).
+
+  Uses ``flock``, so concurrent holders (other processes, or other threads
+  with their own open file) queue instead of interleaving. Without ``fcntl``
+  (Windows) the lock is a no-op. With ``remove`` the lock file is deleted on
+  release; a waiter that then acquires the deleted file retries on a new one.
+  """
+  try:
+    import fcntl
+  except ImportError:
+    yield
+    return
+  path.parent.mkdir(parents=True, exist_ok=True)
+  while True:
+    handle = open(path, "a")
+    fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+    if not remove or _is_current_file(handle, path):
+      break
+    handle.close()
+  with handle:
+    try:
+      yield
+    finally:
+      if remove:
+        with contextlib.suppress(FileNotFoundError):
+          os.unlink(path)
+      fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def clone_tree(src: Path, dst: Path) -> None:
+  """Mirror ``src`` into ``dst`` using hard links; symlinks are recreated as symlinks.
+
+  Falls back to copying a file when it cannot be hard linked.
+  """
+  import shutil
+
+  for dirpath, dirnames, filenames in os.walk(src):
+    rel = os.path.relpath(dirpath, src)
+    out_dir = dst if rel == "." else dst / rel
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name in filenames + [name for name in dirnames if os.path.islink(os.path.join(dirpath, name))]:
+      source = os.path.join(dirpath, name)
+      target = out_dir / name
+      if os.path.islink(source):
+        os.symlink(os.readlink(source), target)
+        continue
+      try:
+        os.link(source, target)
+      except OSError:
+        shutil.copy2(source, target)
+
+
+def _rename_exchange(first: Path, second: Path) -> bool:
+  """Atomically exchange two paths with Linux renameat2(RENAME_EXCHANGE)."""
+  if not sys.platform.startswith("linux"):
+    return False
+  try:
+    import ctypes
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    renameat2 = libc.renameat2
+  except (OSError, AttributeError):
+    return False
+  at_fdcwd, rename_exchange = -100, 2
+  return renameat2(at_fdcwd, os.fsencode(first), at_fdcwd, os.fsencode(second), rename_exchange) == 0
+
+
+def swap_into_place(stage: Path, target: Path) -> None:
+  """Make the fully built ``stage`` directory become ``target``.
+
+  The swap is a single atomic exchange where supported; otherwise the old
+  target is renamed aside first, leaving only a brief window without it.
+  The previous tree is removed afterwards.
+  """
+  import shutil
+
+  if not os.path.lexists(target):
+    os.rename(stage, target)
+    return
+  if _rename_exchange(stage, target):
+    old = stage
+  else:
+    old = stage.with_name(f"{stage.name}.old")
+    os.rename(target, old)
+    os.rename(stage, target)
+  shutil.rmtree(old, ignore_errors=True)
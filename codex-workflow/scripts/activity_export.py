@@ -0,0 +1,249 @@
+"""
+Streaming export of dev_communication and vault activity as change events.
+
+install_team.py's ``export`` subcommand resolves every team's profile and hands
+the folders to ActivityExporter. A run is a generator pipeline: ``_sources``
+walks team inboxes, issue folders, memory stores and ADR decisions with
+os.scandir, ``events`` compares each file with the cursor and yields events,
+and the caller writes them as JSON lines. One file is handled at a time, so
+memory stays flat however large the workspace is.
+
+Events: ``message_created``, ``issue_created``, ``issue_moved``,
+``note_appended`` (with the appended lines) and ``adr_added``.
+
+The cursor is a small SQLite file holding the size/mtime of every file seen,
+the folder of every issue and the last event sequence number. ``commit`` is
+called only after the caller has flushed the events, so an interrupted run
+emits them again instead of losing them; ``seq`` lets consumers drop repeats.
+"""
+
+from __future__ import annotations
+
+import datetime
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from architecture_index import parse_document
+from comms import FOLDER_KEYS, issue_key, parse_header
+from vault_index import VAULT_DIR, classify
+
+# At most this much of an append is read back for a note_appended event.
+APPEND_READ_LIMIT = 64 * 1024
+APPEND_LINE_LIMIT = 50
+
+_DATE_NAME = re.compile(r"^(?P<date>\d{4}-\d{2}-\d{2})")
+
+_SCHEMA_VERSION = 1
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+  path TEXT PRIMARY KEY,
+  kind TEXT NOT NULL,
+  size INTEGER NOT NULL,
+  mtime_ns INTEGER NOT NULL,
+  run INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS issues (
+  team TEXT NOT NULL,
+  issue_id TEXT NOT NULL,
+  folder TEXT NOT NULL,
+  path TEXT NOT NULL,
+  PRIMARY KEY (team, issue_id)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+
+def _markdown_files(directory: Path, recursive: bool = False) -> Iterator[os.DirEntry]:
+  stack = [str(directory)]
+  while stack:
+    try:
+      with os.scandir(stack.pop()) as it:
+        for entry in it:
+          if entry.name.startswith("."):
+            continue
+          if entry.is_dir(follow_symlinks=False):
+            if recursive:
+              stack.append(entry.path)
+          elif entry.name.endswith(".md") and entry.is_file():
+            yield entry
+    except OSError:
+      continue
+
+
+def _is_memory_store(store: str) -> bool:
+  return store == "memory_store" or store.startswith("skill_store/")
+
+
+def _iso(mtime_ns: int) -> str:
+  return datetime.datetime.fromtimestamp(mtime_ns / 1e9, datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+def read_appended(path: Path, offset: int) -> Tuple[List[str], bool]:
+  """Non-empty lines written after ``offset``, capped; the flag is set when the cap cut them short."""
+  with path.open("rb") as f:
+    f.seek(offset)
+    data = f.read(APPEND_READ_LIMIT + 1)
+  truncated = len(data) > APPEND_READ_LIMIT
+  lines = [line.strip() for line in data[:APPEND_READ_LIMIT].decode("utf-8", errors="replace").splitlines() if line.strip()]
+  if truncated and lines:
+    lines.pop()  # probably cut mid-line
+  if len(lines) > APPEND_LINE_LIMIT:
+    return lines[:APPEND_LINE_LIMIT], True
+  return lines, truncated
+
+
+class ActivityExporter:
+  def __init__(self, cursor_path: str, project_root: Path) -> None:
+    """Open (or create) the cursor at ``cursor_path`` (``":memory:"`` for a one-off export)."""
+    self.project_root = project_root
+    if cursor_path != ":memory:":
+      Path(cursor_path).parent.mkdir(parents=True, exist_ok=True)
+    self.db = sqlite3.connect(cursor_path)
+    version = self.db.execute("PRAGMA user_version").fetchone()[0]
+    if version != _SCHEMA_VERSION:
+      self.db.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS issues; DROP TABLE IF EXISTS meta;")
+      self.db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    self.db.executescript(_SCHEMA)
+    self.seq = self._meta("seq")
+    self.run = self._meta("run") + 1
+    self.counts: Dict[str, int] = {}
+
+  def close(self) -> None:
+    # Uncommitted progress is dropped: those events are emitted again next run.
+    self.db.rollback()
+    self.db.close()
+
+  def __enter__(self) -> "ActivityExporter":
+    return self
+
+  def __exit__(self, *exc: Any) -> None:
+    self.close()
+
+  def _meta(self, key: str) -> int:
+    row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return int(row[0]) if row else 0
+
+  def _rel(self, path: str) -> str:
+    # Scandir paths start with the root they were listed from; slicing beats relpath.
+    prefix = str(self.project_root) + os.sep
+    rel = path[len(prefix):] if path.startswith(prefix) else os.path.relpath(path, self.project_root)
+    return rel.replace(os.sep, "/")
+
+  def _sources(
+    self,
+    teams: Dict[str, Dict[str, Any]],
+    architecture_roots: List[str]
+  ) -> Iterator[Tuple[str, Optional[str], Optional[str], str, os.DirEntry]]:
+    """``(kind, team, folder, rel, entry)`` for every tracked file, one at a time."""
+    for team_id, profile in teams.items():
+      default_paths = profile.get("default_paths", {})
+      for key, folder in FOLDER_KEYS.items():
+        if default_paths.get(key):
+          kind = "message" if folder == "inbox" else "issue"
+          for entry in _markdown_files(self.project_root / default_paths[key]):
+            yield kind, team_id, folder, self._rel(entry.path), entry
+    for entry in _markdown_files(self.project_root / VAULT_DIR, recursive=True):
+      rel = self._rel(entry.path)
+      team, store = classify(rel[len(VAULT_DIR) + 1:])
+      if _is_memory_store(store) and (team in teams or team == "shared"):
+        yield "note", team, store, rel, entry
+    for root in architecture_roots:
+      for entry in _markdown_files(self.project_root / root / "decisions", recursive=True):
+        if entry.name.lower() not in ("index.md", "readme.md"):
+          yield "adr", None, None, self._rel(entry.path), entry
+
+  def events(
+    self,
+    teams: Dict[str, Dict[str, Any]],
+    architecture_roots: List[str],
+    emit: bool = True
+  ) -> Iterator[Dict[str, Any]]:
+    """Yield change events since the cursor; with ``emit=False`` only record the current state."""
+    for kind, team, folder, rel, entry in self._sources(teams, architecture_roots):
+      stat = entry.stat()
+      row = self.db.execute("SELECT size, mtime_ns FROM files WHERE path = ?", (rel,)).fetchone()
+      if row is not None and tuple(row) == (stat.st_size, stat.st_mtime_ns):
+        self.db.execute("UPDATE files SET run = ? WHERE path = ?", (self.run, rel))
+        continue
+      self.db.execute(
+        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", (rel, kind, stat.st_size, stat.st_mtime_ns, self.run)
+      )
+      event = self._event(kind, team, folder, rel, row, stat, teams)
+      if event is None or not emit:
+        continue
+      self.seq += 1
+      self.counts[event["event"]] = self.counts.get(event["event"], 0) + 1
+      yield dict(event, seq=self.seq, workspace=str(self.project_root), mtime=_iso(stat.st_mtime_ns))
+    # Only reached when the walk completed, so unseen rows really are gone.
+    self.db.execute("DELETE FROM files WHERE run != ?", (self.run,))
+    self.db.execute("DELETE FROM issues WHERE path NOT IN (SELECT path FROM files)")
+
+  def _event(
+    self,
+    kind: str,
+    team: Optional[str],
+    folder: Optional[str],
+    rel: str,
+    previous: Optional[Tuple[int, int]],
+    stat: os.stat_result,
+    teams: Dict[str, Dict[str, Any]]
+  ) -> Optional[Dict[str, Any]]:
+    path = self.project_root / rel
+    if kind == "note":
+      offset = previous[0] if previous else 0
+      if stat.st_size <= offset:
+        return None  # rewritten or truncated, not appended to
+      lines, truncated = read_appended(path, offset)
+      event: Dict[str, Any] = {
+        "event": "note_appended",
+        "team": team,
+        "store": folder,
+        "path": rel,
+        "created": previous is None,
+        "bytes": stat.st_size - offset,
+        "lines": lines,
+      }
+      if truncated:
+        event["truncated"] = True
+      return event
+    if kind == "adr":
+      if previous is not None:
+        return None
+      values = parse_document(path, "adr")
+      return {
+        "event": "adr_added",
+        "team": values.get("team"),
+        "path": rel,
+        "adr_id": values.get("adr_id"),
+        "title": values.get("title"),
+        "status": values.get("status"),
+        "domain": values.get("domain"),
+        "date": values.get("date"),
+      }
+    header = parse_header(path)
+    if not header["date"]:
+      dated = _DATE_NAME.match(path.name)
+      header["date"] = dated.group("date") if dated else None
+    base = {"team": team, "path": rel, "subject": header["subject"], "status": header["status"], "priority": header["priority"], "date": header["date"]}
+    if kind == "message":
+      return dict(base, event="message_created") if previous is None else None
+    key = issue_key(path.name)
+    if key is None:
+      return None
+    issue_id = f"{key[0]}-{key[1]:03d}"
+    known = self.db.execute("SELECT folder, path FROM issues WHERE team = ? AND issue_id = ?", (team, issue_id)).fetchone()
+    self.db.execute("INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?)", (team, issue_id, folder, rel))
+    issue = dict(base, issue_id=issue_id, prefix=key[0], number=key[1], issue_prefix=teams[team].get("issue_prefix"), folder=folder)
+    if known is None:
+      return dict(issue, event="issue_created")
+    if known[0] != folder:
+      return dict(issue, event="issue_moved", **{"from": known[0], "to": folder, "from_path": known[1]})
+    return None
+
+  def commit(self) -> None:
+    """Persist the cursor; call after the emitted events are safely written."""
+    with self.db:
+      self.db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", (("seq", self.seq), ("run", self.run)))
@@ -0,0 +1,401 @@
+"""
+Append-only Markdown logs with constant-time exact-line dedup.
+
+Vault indexes (``ai_team_config/index.md``), ``notes.md`` and
+``memory-log.md`` only ever grow. AppendLog keeps a SQLite sidecar in the
+workflow cache (``.codex-workflow/cache/logs/<name>-<crc>.lines``, keyed by the
+log's absolute path, never inside the vault) holding a hash of every line, so
+"append unless the line is already there" is one indexed lookup and one
+``O_APPEND`` write instead of reading and rewriting the whole file. Dedup is by
+exact line (trailing whitespace ignored), never by substring. Writers serialize
+on a separate ``.lock`` file beside the sidecar, never on the database itself.
+
+The sidecar also records the log's size, mtime and a hash of its last 4 KiB.
+When the log changed behind its back, a pure append (the old tail is intact)
+only hashes the new bytes; any other edit rebuilds the sidecar once.
+
+With ``max_bytes`` set, a log about to grow past that size is rotated first:
+the current file becomes a dated segment (``memory-log-YYYY-MM-DD.md``), a
+fresh log starts with the old file's header, and ``<stem>-segments.md`` is
+regenerated to list every segment. Segment lines stay in the sidecar, so dedup
+spans the whole history.
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import os
+import re
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from action_plan import atomic_write_text, file_lock
+
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[1] / "cache" / "logs"
+
+_SCHEMA_VERSION = 1
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS lines (hash BLOB PRIMARY KEY) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS segments (
+  name TEXT PRIMARY KEY,
+  rotated_at TEXT NOT NULL,
+  lines INTEGER NOT NULL,
+  bytes INTEGER NOT NULL
+);
+"""
+_TAIL_BYTES = 4096
+_HEADER_LINE_LIMIT = 20
+_TABLE_SEPARATOR = re.compile(r"^\|[\s|:-]+\|\s*$")
+_SEGMENT_SUFFIX = re.compile(r"-(\d{4}-\d{2}-\d{2})(?:-(\d+))?$")
+
+
+def line_hash(line: str) -> bytes:
+  return hashlib.blake2b(line.encode("utf-8").rstrip(), digest_size=16).digest()
+
+
+def sidecar_path(path: Path, cache_dir: Optional[Path] = None) -> Path:
+  encoded = os.path.abspath(path).encode("utf-8")
+  return (cache_dir or DEFAULT_CACHE_DIR) / f"{path.name}-{zlib.crc32(encoded):08x}.lines"
+
+
+def _segment_order(name: str) -> tuple[str, int]:
+  # Rotation order: date, then the same-day counter (the first segment has none).
+  match = _SEGMENT_SUFFIX.search(Path(name).stem)
+  if match is None:
+    return name, 0
+  return match.group(1), int(match.group(2) or 1)
+
+
+def _iter_file_lines(path: Path, offset: int = 0) -> Iterator[str]:
+  with path.open("rb") as f:
+    f.seek(offset)
+    for raw in f:
+      line = raw.decode("utf-8", errors="replace").rstrip()
+      if line:
+        yield line
+
+
+def _iter_file_hashes(path: Path, offset: int = 0) -> Iterator[tuple[bytes]]:
+  # Hashes the raw bytes (same result as line_hash) without decoding each line.
+  blake2b = hashlib.blake2b
+  with path.open("rb") as f:
+    f.seek(offset)
+    for raw in f:
+      raw = raw.rstrip()
+      if raw:
+        yield (blake2b(raw, digest_size=16).digest(),)
+
+
+def _tail_digest(path: Path, size: int) -> str:
+  with path.open("rb") as f:
+    f.seek(max(0, size - _TAIL_BYTES))
+    return hashlib.sha1(f.read(size - max(0, size - _TAIL_BYTES))).hexdigest()
+
+
+def _ends_with_newline(path: Path, size: int) -> bool:
+  if size == 0:
+    return True
+  with path.open("rb") as f:
+    f.seek(size - 1)
+    return f.read(1) == b"\n"
+
+
+def header_lines(path: Path) -> List[str]:
+  """Leading lines of ``path`` before its first entry (bullet or table data row)."""
+  header: List[str] = []
+  seen_separator = False
+  with path.open("r", encoding="utf-8", errors="replace") as f:
+    for index, raw in enumerate(f):
+      line = raw.rstrip("\n")
+      stripped = line.strip()
+      if index >= _HEADER_LINE_LIMIT or stripped.startswith(("- ", "* ", "+ ")):
+        break
+      if stripped.startswith("|"):
+        if seen_separator:
+          break
+        seen_separator = bool(_TABLE_SEPARATOR.match(stripped))
+      header.append(line)
+  return header
+
+
+class AppendLog:
+  def __init__(self, path: Path, max_bytes: int = 0, cache_dir: Optional[Path] = None) -> None:
+    """Log at ``path``; ``max_bytes`` > 0 enables size-based segment rotation.
+
+    The sidecar lives in ``cache_dir`` (default: the workflow's ``cache/logs``).
+    """
+    self.path = path
+    self.max_bytes = max_bytes
+    self.sidecar = sidecar_path(path, cache_dir)
+    self.lock_path = self.sidecar.with_name(f"{self.sidecar.name}.lock")
+    self.segments_index = path.with_name(f"{path.stem}-segments{path.suffix}")
+    self._db: Optional[sqlite3.Connection] = None
+
+  # -- sidecar ----------------------------------------------------------------
+
+  def _open(self) -> sqlite3.Connection:
+    if self._db is None:
+      self.sidecar.parent.mkdir(parents=True, exist_ok=True)
+      db = sqlite3.connect(str(self.sidecar))
+      version = db.execute("PRAGMA user_version").fetchone()[0]
+      if version != _SCHEMA_VERSION:
+        db.executescript("DROP TABLE IF EXISTS meta; DROP TABLE IF EXISTS lines; DROP TABLE IF EXISTS segments;")
+        db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+      db.executescript(_SCHEMA)
+      self._db = db
+    return self._db
+
+  def close(self) -> None:
+    if self._db is not None:
+      self._db.close()
+      self._db = None
+
+  def __enter__(self) -> "AppendLog":
+    return self
+
+  def __exit__(self, *exc: Any) -> None:
+    self.close()
+
+  def _meta(self) -> Dict[str, str]:
+    return dict(self._open().execute("SELECT key, value FROM meta"))
+
+  def _record_state(self) -> None:
+    try:
+      stat = self.path.stat()
+    except OSError:
+      state = {"size": "-1", "mtime_ns": "0", "tail": ""}
+    else:
+      state = {"size": str(stat.st_size), "mtime_ns": str(stat.st_mtime_ns), "tail": _tail_digest(self.path, stat.st_size)}
+    self._open().executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", state.items())
+
+  def _insert(self, lines: Iterable[str]) -> int:
+    return self._insert_hashes((line_hash(line),) for line in lines)
+
+  def _insert_hashes(self, hashes: Iterable[tuple[bytes]]) -> int:
+    db = self._open()
+    before = db.total_changes
+    db.executemany("INSERT OR IGNORE INTO lines (hash) VALUES (?)", hashes)
+    return db.total_changes - before
+
+  def segment_paths(self) -> List[Path]:
+    pattern = re.compile(rf"^{re.escape(self.path.stem)}-\d{{4}}-\d{{2}}-\d{{2}}(?:-\d+)?{re.escape(self.path.suffix)}$")
+    try:
+      names = sorted((entry.name for entry in os.scandir(self.path.parent) if pattern.match(entry.name)), key=_segment_order)
+    except OSError:
+      return []
+    return [self.path.with_name(name) for name in names]
+
+  def rebuild(self) -> int:
+    """Re-hash the log and its segments from scratch; returns the number of distinct lines indexed."""
+    db = self._open()
+    # A rebuild may hash hundreds of MB of random keys: give SQLite a larger page cache.
+    db.execute("PRAGMA cache_size = -65536")
+    with db:
+      db.execute("DELETE FROM lines")
+      db.execute("DELETE FROM segments")
+      count = 0
+      for segment in self.segment_paths():
+        segment_lines = self._insert_hashes(_iter_file_hashes(segment))
+        stat = segment.stat()
+        rotated_at = datetime.datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M")
+        db.execute(
+          "INSERT INTO segments (name, rotated_at, lines, bytes) VALUES (?, ?, ?, ?)",
+          (segment.name, rotated_at, segment_lines, stat.st_size),
+        )
+        count += segment_lines
+      if self.path.exists():
+        count += self._insert_hashes(_iter_file_hashes(self.path))
+      self._record_state()
+    return count
+
+  def sync(self) -> str:
+    """Bring the sidecar up to date with the log: ``current``, ``appended`` or ``rebuilt``."""
+    meta = self._meta()
+    try:
+      stat = self.path.stat()
+    except OSError:
+      stat = None
+    if not meta:
+      self.rebuild()
+      return "rebuilt"
+    size = int(meta["size"])
+    if stat is None:
+      if size == -1:
+        return "current"
+      self.rebuild()
+      return "rebuilt"
+    if stat.st_size == size and str(stat.st_mtime_ns) == meta["mtime_ns"]:
+      return "current"
+    if (
+      size >= 0
+      and stat.st_size > size
+      and _ends_with_newline(self.path, size)
+      and _tail_digest(self.path, size) == meta["tail"]
+    ):
+      with self._open():
+        self._insert_hashes(_iter_file_hashes(self.path, size))
+        self._record_state()
+      return "appended"
+    self.rebuild()
+    return "rebuilt"
+
+  # -- queries and appends ----------------------------------------------------
+
+  def contains(self, line: str) -> bool:
+    """True when ``line`` (trailing whitespace ignored) is already in the log or a segment.
+
+    Read-only: a current sidecar answers with one lookup; otherwise the log
+    and its segments are scanned. The sidecar is never created or synced
+    here, so dry-run planning leaves the cache untouched.
+    """
+    found = self._lookup_readonly(line)
+    if found is not None:
+      return found
+    key = line.rstrip()
+    return any(
+      existing == key
+      for source in [*self.segment_paths(), self.path] if source.exists()
+      for existing in _iter_file_lines(source)
+    )
+
+  def _lookup_readonly(self, line: str) -> Optional[bool]:
+    if not self.sidecar.exists():
+      return None
+    try:
+      db = sqlite3.connect(f"{self.sidecar.as_uri()}?mode=ro", uri=True)
+    except sqlite3.Error:
+      return None
+    try:
+      if db.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+        return None
+      meta = dict(db.execute("SELECT key, value FROM meta"))
+      try:
+        stat = self.path.stat()
+      except OSError:
+        return None
+      if meta.get("size") != str(stat.st_size) or meta.get("mtime_ns") != str(stat.st_mtime_ns):
+        return None
+      return db.execute("SELECT 1 FROM lines WHERE hash = ?", (line_hash(line),)).fetchone() is not None
+    except sqlite3.Error:
+      return None
+    finally:
+      db.close()
+
+  def append(self, lines: Iterable[str]) -> List[str]:
+    """Append the lines not already present (in order, once each); returns the lines written."""
+    with file_lock(self.lock_path):
+      self.sync()
+      db = self._open()
+      missing: List[str] = []
+      seen: set[bytes] = set()
+      for line in lines:
+        key = line_hash(line)
+        if not line.strip() or key in seen:
+          continue
+        seen.add(key)
+        if db.execute("SELECT 1 FROM lines WHERE hash = ?", (key,)).fetchone() is None:
+          missing.append(line.rstrip())
+      if not missing:
+        return []
+      data = "".join(f"{line}\n" for line in missing).encode("utf-8")
+      size = self.path.stat().st_size if self.path.exists() else 0
+      if self.max_bytes > 0 and size > 0 and size + len(data) > self.max_bytes:
+        self._rotate()
+        size = self.path.stat().st_size
+      if size and not _ends_with_newline(self.path, size):
+        data = b"\n" + data
+      self.path.parent.mkdir(parents=True, exist_ok=True)
+      fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+      try:
+        os.write(fd, data)
+      finally:
+        os.close(fd)
+      with db:
+        self._insert(missing)
+        self._record_state()
+      return missing
+
+  def rotate(self) -> Optional[Path]:
+    """Force a rotation now; returns the new segment (None when the log has no entries)."""
+    with file_lock(self.lock_path):
+      self.sync()
+      return self._rotate()
+
+  def _rotate(self) -> Optional[Path]:
+    if not self.path.exists():
+      return None
+    header = header_lines(self.path)
+    line_count = sum(1 for _ in _iter_file_lines(self.path))
+    if line_count <= len([line for line in header if line.strip()]):
+      return None
+    now = datetime.datetime.now()
+    stem = f"{self.path.stem}-{now:%Y-%m-%d}"
+    segment = self.path.with_name(f"{stem}{self.path.suffix}")
+    counter = 2
+    while segment.exists():
+      segment = self.path.with_name(f"{stem}-{counter}{self.path.suffix}")
+      counter += 1
+    size = self.path.stat().st_size
+    os.rename(self.path, segment)
+    older = f"Older entries: [[{self.segments_index.stem}]]"
+    if older not in header:
+      table_start = next((index for index, line in enumerate(header) if line.strip().startswith("|")), None)
+      if table_start is None:
+        while header and not header[-1].strip():
+          header.pop()
+        header += ["", older, ""]
+      else:
+        header[table_start:table_start] = [older, ""]
+    atomic_write_text(self.path, "\n".join(header) + "\n")
+    db = self._open()
+    with db:
+      db.execute(
+        "INSERT OR REPLACE INTO segments (name, rotated_at, lines, bytes) VALUES (?, ?, ?, ?)",
+        (segment.name, f"{now:%Y-%m-%d %H:%M}", line_count, size),
+      )
+      self._insert(header)
+      self._record_state()
+    self._write_segments_index()
+    return segment
+
+  def _segment_rows(self) -> List[tuple[str, str, int, int]]:
+    rows = self._open().execute("SELECT name, rotated_at, lines, bytes FROM segments").fetchall()
+    return sorted(rows, key=lambda row: _segment_order(row[0]))
+
+  def _write_segments_index(self) -> None:
+    rows = self._segment_rows()
+    rows.reverse()
+    body = [
+      f"# {self.path.stem} segments",
+      "",
+      f"<!-- Generated when {self.path.name} is rotated; do not edit. -->",
+      "",
+      f"Current: [[{self.path.stem}]]",
+      "",
+    ]
+    body += [
+      f"- [[{Path(name).stem}]] - rotated {rotated_at}, {lines} lines, {size} bytes"
+      for name, rotated_at, lines, size in rows
+    ]
+    atomic_write_text(self.segments_index, "\n".join(body) + "\n")
+
+  def stats(self) -> Dict[str, Any]:
+    with file_lock(self.lock_path):
+      sync = self.sync()
+      db = self._open()
+      segments = [
+        {"name": name, "rotated_at": rotated_at, "lines": lines, "bytes": size}
+        for name, rotated_at, lines, size in self._segment_rows()
+      ]
+      return {
+        "path": str(self.path),
+        "bytes": self.path.stat().st_size if self.path.exists() else 0,
+        "distinct_lines": db.execute("SELECT COUNT(*) FROM lines").fetchone()[0],
+        "segments": segments,
+        "sync": sync,
+      }
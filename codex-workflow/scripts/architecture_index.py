@@ -0,0 +1,532 @@
+"""
+Incremental SQLite index over dev_communication/shared/architecture.
+
+install_team.py's ``adr`` subcommand hands the architecture root to
+ArchitectureIndex. Each refresh walks ``decisions/``, ``gaps/`` and
+``suggestions/`` with os.scandir and re-parses only files whose size or mtime
+changed; rows for removed files are dropped. Only the frontmatter and header
+block of a file is read (up to its first ``## `` section), except for gap
+index tables, whose rows are indexed as individual gaps.
+
+Status counts, domain coverage and the next free ``<DOMAIN>-<NNN>`` number are
+then answered with SQL. ``sync_adr_index`` regenerates the ``## Index`` rows of
+``adr-index.md`` from the indexed ADR files, keeping hand-written rows for ADRs
+that have no file.
+
+Staleness compares each ADR's date with later commits touching its domain
+(paths matching the ADR's ``paths`` globs, or its keywords and pattern names).
+Commits are read with ``git log --name-only`` into a ``commits`` table once
+and extended incrementally as HEAD moves.
+"""
+
+from __future__ import annotations
+
+import datetime
+import fnmatch
+import os
+import re
+import sqlite3
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+KINDS = {"decisions": "adr", "gaps": "gap", "suggestions": "suggestion"}
+DEFAULT_STATUS = {"adr": "accepted", "gap": "open", "suggestion": "pending"}
+CLOSED_GAP_STATUSES = ("closed", "resolved", "addressed", "done", "wontfix")
+# Only decisions in force are listed in adr-index.md; proposed ones stay out.
+INDEXED_STATUSES = ("accepted", "active", "approved")
+
+_SCHEMA_VERSION = 2
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS docs (
+  path TEXT NOT NULL,
+  row INTEGER NOT NULL,
+  kind TEXT NOT NULL,
+  adr_id TEXT,
+  code TEXT,
+  number INTEGER,
+  title TEXT,
+  status TEXT,
+  domain TEXT,
+  date TEXT,
+  priority TEXT,
+  team TEXT,
+  decision TEXT,
+  keywords TEXT,
+  patterns TEXT,
+  paths TEXT,
+  suggested_adr TEXT,
+  PRIMARY KEY (path, row)
+);
+CREATE INDEX IF NOT EXISTS docs_kind ON docs(kind, status);
+CREATE INDEX IF NOT EXISTS docs_code ON docs(code, number);
+CREATE TABLE IF NOT EXISTS commits (sha TEXT PRIMARY KEY, ts INTEGER NOT NULL, subject TEXT, paths TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS commits_ts ON commits(ts);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+_ADR_ID = re.compile(r"(?:ADR-)?(?P<code>[A-Z][A-Z0-9]*)-(?P<number>\d{3,})(?![\d])")
+_HEADER_FIELD = re.compile(
+  r"^\s*(?:[-*]\s*)?(?:\*\*)?(?P<key>Status|Priority|Domain|Date|Created|Team|Suggested ADR)(?::\*\*|\*\*:|:)\s*(?P<value>.*?)\s*$",
+  re.IGNORECASE,
+)
+_SUGGESTION_NAME = re.compile(r"^(?P<date>\d{4}-\d{2}-\d{2})_(?P<team>[^_]+)_(?P<topic>.+)$")
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_INDEX_ROW = re.compile(r"^(?P<id>[A-Z][A-Z0-9]*-\d{3,})\|")
+_PATH_TOKEN = re.compile(r"[/._-]+")
+_HEADER_LINE_LIMIT = 60
+_INDEX_FORMAT = "ID|Domain|Decision|Keywords|Patterns"
+
+
+def _split_list(value: Optional[str]) -> List[str]:
+  if not value:
+    return []
+  value = value.strip().strip("[]")
+  return [item.strip().strip("\"'") for item in value.split(",") if item.strip().strip("\"'") and item.strip() not in ("—", "-")]
+
+
+def parse_frontmatter(path: Path) -> Tuple[Dict[str, str], Dict[str, str], Optional[str]]:
+  """Frontmatter fields, ``Key: value`` header fields and the ``# `` title of ``path``."""
+  meta: Dict[str, str] = {}
+  fields: Dict[str, str] = {}
+  title = None
+  with path.open("r", encoding="utf-8", errors="replace") as f:
+    in_frontmatter = False
+    for index, raw in enumerate(f):
+      line = raw.rstrip("\n")
+      if index == 0 and line.strip() == "---":
+        in_frontmatter = True
+        continue
+      if in_frontmatter:
+        if line.strip() == "---":
+          in_frontmatter = False
+          continue
+        key, sep, value = line.partition(":")
+        if sep and not key.startswith((" ", "\t", "-")):
+          meta[key.strip().lower()] = value.strip().strip("\"'")
+        continue
+      if index >= _HEADER_LINE_LIMIT or line.startswith("## "):
+        break
+      if title is None and line.startswith("# "):
+        title = line[2:].strip()
+        continue
+      match = _HEADER_FIELD.match(line)
+      if match:
+        fields.setdefault(match.group("key").lower(), match.group("value").strip("* "))
+  return meta, fields, title
+
+
+def parse_document(path: Path, kind: str) -> Dict[str, Any]:
+  """Index columns of one ADR, gap or suggestion file (``kind`` is a KINDS value)."""
+  stem = path.stem
+  meta, fields, title = parse_frontmatter(path)
+  values: Dict[str, Any] = {
+    "title": meta.get("title"),
+    "status": (meta.get("status") or fields.get("status") or DEFAULT_STATUS[kind]).lower(),
+    "domain": meta.get("domain") or fields.get("domain"),
+    "date": _normalize_date(meta.get("date") or meta.get("created") or fields.get("date") or fields.get("created")),
+    "priority": (meta.get("priority") or fields.get("priority") or "").lower() or None,
+    "team": meta.get("team") or fields.get("team"),
+    "decision": meta.get("decision") or meta.get("summary"),
+    "keywords": ",".join(_split_list(meta.get("keywords") or meta.get("tags"))),
+    "patterns": ",".join(_split_list(meta.get("patterns"))),
+    "paths": ",".join(_split_list(meta.get("paths") or meta.get("scope"))),
+    "suggested_adr": meta.get("suggested_adr") or fields.get("suggested adr"),
+  }
+  if kind == "adr":
+    match = _ADR_ID.search(meta.get("id") or "") or _ADR_ID.search(stem) or _ADR_ID.search(title or "")
+    if match:
+      values.update({"adr_id": f"{match.group('code')}-{match.group('number')}", "code": match.group("code"), "number": int(match.group("number"))})
+    if not values["title"] and title:
+      values["title"] = title.split(":", 1)[1].strip() if ":" in title else title
+  elif kind == "suggestion":
+    named = _SUGGESTION_NAME.match(stem)
+    if named:
+      values["date"] = values["date"] or named.group("date")
+      values["team"] = values["team"] or named.group("team")
+  values["title"] = values["title"] or (title.split(":", 1)[1].strip() if title and ":" in title else title) or stem
+  return values
+
+
+def _table_rows(path: Path) -> Iterator[Dict[str, str]]:
+  """Rows of Markdown tables in ``path`` whose header has a Domain column, keyed by lowercase header."""
+  header: Optional[List[str]] = None
+  with path.open("r", encoding="utf-8", errors="replace") as f:
+    for raw in f:
+      line = raw.strip()
+      if not line.startswith("|"):
+        header = None
+        continue
+      cells = [cell.strip() for cell in line.strip("|").split("|")]
+      if header is None:
+        header = [cell.lower() for cell in cells]
+        if "domain" not in header:
+          header = []
+        continue
+      if not header or set(line) <= set("|-: "):
+        continue
+      yield dict(zip(header, cells))
+
+
+def _iter_markdown(directory: Path) -> Iterator[os.DirEntry]:
+  stack = [directory]
+  while stack:
+    try:
+      with os.scandir(stack.pop()) as it:
+        for entry in it:
+          if entry.name.startswith("."):
+            continue
+          if entry.is_dir(follow_symlinks=False):
+            stack.append(Path(entry.path))
+          elif entry.name.endswith(".md") and entry.is_file():
+            yield entry
+    except OSError:
+      continue
+
+
+def _normalize_date(value: Optional[str]) -> Optional[str]:
+  match = _DATE.search(value or "")
+  if match is None:
+    return None
+  try:
+    # Calendar-invalid dates such as 2024-02-30 count as missing.
+    return datetime.date.fromisoformat(match.group(0)).isoformat()
+  except ValueError:
+    return None
+
+
+def _path_matches(path: str, terms: List[str], globs: List[str]) -> bool:
+  if globs:
+    return any(fnmatch.fnmatch(path, pattern) for pattern in globs)
+  lowered = path.lower()
+  tokens = set(_PATH_TOKEN.split(lowered))
+  return any(term in tokens or (len(term) >= 4 and term in lowered) for term in terms)
+
+
+class ArchitectureIndex:
+  def __init__(self, db_path: str, project_root: Path, architecture_root: str) -> None:
+    """Open (or create) the index at ``db_path`` for ``architecture_root`` (project-relative)."""
+    self.project_root = project_root
+    self.architecture_root = architecture_root.rstrip("/")
+    if db_path != ":memory:":
+      Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    self.db = sqlite3.connect(db_path)
+    version = self.db.execute("PRAGMA user_version").fetchone()[0]
+    if version != _SCHEMA_VERSION:
+      self.db.executescript(
+        "DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS docs; DROP TABLE IF EXISTS commits; DROP TABLE IF EXISTS meta;"
+      )
+      self.db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    self.db.executescript(_SCHEMA)
+
+  def close(self) -> None:
+    self.db.close()
+
+  def __enter__(self) -> "ArchitectureIndex":
+    return self
+
+  def __exit__(self, *exc: Any) -> None:
+    self.close()
+
+  def refresh(self) -> Dict[str, int]:
+    """Bring the index up to date; returns ``{parsed, unchanged, removed, adr_changes}`` counts."""
+    stats = {"parsed": 0, "unchanged": 0, "removed": 0, "adr_changes": 0}
+    known = {path: (size, mtime_ns) for path, size, mtime_ns in self.db.execute("SELECT path, size, mtime_ns FROM files")}
+    seen = set()
+    with self.db:
+      for folder, kind in KINDS.items():
+        root = self.project_root / self.architecture_root / folder
+        for entry in _iter_markdown(root):
+          rel = os.path.relpath(entry.path, self.project_root).replace(os.sep, "/")
+          seen.add(rel)
+          stat = entry.stat()
+          if known.get(rel) == (stat.st_size, stat.st_mtime_ns):
+            stats["unchanged"] += 1
+            continue
+          self.db.execute("DELETE FROM docs WHERE path = ?", (rel,))
+          self._index_file(rel, kind)
+          self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?)", (rel, stat.st_size, stat.st_mtime_ns))
+          stats["parsed"] += 1
+          if kind == "adr":
+            stats["adr_changes"] += 1
+      removed = [(path,) for path in known if path not in seen]
+      if removed:
+        stats["adr_changes"] += sum(1 for (path,) in removed if "/decisions/" in f"/{path}")
+        self.db.executemany("DELETE FROM docs WHERE path = ?", removed)
+        self.db.executemany("DELETE FROM files WHERE path = ?", removed)
+        stats["removed"] = len(removed)
+    return stats
+
+  def _index_file(self, rel: str, kind: str) -> None:
+    path = self.project_root / rel
+    stem = Path(rel).stem
+    if kind == "gap" and stem.lower() in ("index", "readme"):
+      for row, cells in enumerate(_table_rows(path), start=1):
+        title = cells.get("gap") or cells.get("title") or cells.get("id") or ""
+        self._insert(rel, row, "gap", {
+          "title": title,
+          "status": (cells.get("status") or DEFAULT_STATUS["gap"]).lower(),
+          "domain": cells.get("domain"),
+          "priority": (cells.get("priority") or "").lower() or None,
+          "suggested_adr": cells.get("suggested adr") or cells.get("adr"),
+        })
+      return
+    self._insert(rel, 0, kind, parse_document(path, kind))
+
+  def _insert(self, rel: str, row: int, kind: str, values: Dict[str, Any]) -> None:
+    columns = ("adr_id", "code", "number", "title", "status", "domain", "date", "priority", "team", "decision", "keywords", "patterns", "paths", "suggested_adr")
+    self.db.execute(
+      f"INSERT OR REPLACE INTO docs (path, row, kind, {', '.join(columns)}) VALUES ({', '.join('?' for _ in range(len(columns) + 3))})",
+      (rel, row, kind, *(values.get(column) for column in columns)),
+    )
+
+  # -- queries ----------------------------------------------------------------
+
+  def adrs(self) -> List[Dict[str, Any]]:
+    columns = ("adr_id", "code", "number", "title", "status", "domain", "date", "decision", "keywords", "patterns", "paths", "path")
+    return [
+      dict(zip(columns, row))
+      for row in self.db.execute(f"SELECT {', '.join(columns)} FROM docs WHERE kind = 'adr' ORDER BY code, number, path")
+    ]
+
+  def status_counts(self) -> Dict[str, Dict[str, int]]:
+    """Counts per kind (adr/gap/suggestion) split by status; gaps also by priority under ``gap_priority``."""
+    counts: Dict[str, Dict[str, int]] = {}
+    for kind, status, count in self.db.execute("SELECT kind, status, COUNT(*) FROM docs GROUP BY kind, status ORDER BY kind, status"):
+      counts.setdefault(kind, {})[status or "-"] = count
+    placeholders = ", ".join("?" for _ in CLOSED_GAP_STATUSES)
+    for priority, count in self.db.execute(
+      f"SELECT COALESCE(priority, '-'), COUNT(*) FROM docs WHERE kind = 'gap' AND status NOT IN ({placeholders}) GROUP BY priority ORDER BY priority",
+      CLOSED_GAP_STATUSES,
+    ):
+      counts.setdefault("gap_priority", {})[priority] = count
+    return counts
+
+  def gaps(self, include_closed: bool = False) -> List[Dict[str, Any]]:
+    columns = ("title", "status", "domain", "priority", "suggested_adr", "path", "row")
+    sql = f"SELECT {', '.join(columns)} FROM docs WHERE kind = 'gap'"
+    params: List[Any] = []
+    if not include_closed:
+      sql += f" AND status NOT IN ({', '.join('?' for _ in CLOSED_GAP_STATUSES)})"
+      params.extend(CLOSED_GAP_STATUSES)
+    rank = "CASE priority WHEN 'critical' THEN 0 WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 ELSE 4 END"
+    return [dict(zip(columns, row)) for row in self.db.execute(f"{sql} ORDER BY {rank}, domain, path, row", params)]
+
+  def next_adr_id(self, code: str, index_rows: Optional[Dict[str, Dict[str, str]]] = None) -> str:
+    """Next free ``<CODE>-<NNN>`` across ADR files and rows already listed in ``adr-index.md``."""
+    code = code.upper().removeprefix("ADR-")
+    highest = self.db.execute("SELECT MAX(number) FROM docs WHERE kind = 'adr' AND code = ?", (code,)).fetchone()[0] or 0
+    for adr_id in index_rows or {}:
+      match = _ADR_ID.fullmatch(adr_id)
+      if match and match.group("code") == code:
+        highest = max(highest, int(match.group("number")))
+    return f"{code}-{highest + 1:03d}"
+
+  def coverage(self, index_rows: Optional[Dict[str, Dict[str, str]]] = None) -> List[Dict[str, Any]]:
+    """Per domain code: ADRs by status, open gaps and a ``covered``/``weak``/``missing`` verdict.
+
+    ADRs listed only in ``adr-index.md`` count as accepted. Gap domains given
+    as names (``Endpoints``) are mapped to codes through the ADR domains.
+    """
+    domains: Dict[str, Dict[str, Any]] = {}
+    names: Dict[str, str] = {}
+
+    def domain(code: str, name: Optional[str]) -> Dict[str, Any]:
+      entry = domains.setdefault(code, {"code": code, "name": name, "adrs": {}, "open_gaps": 0, "high_gaps": 0})
+      if name:
+        entry["name"] = entry["name"] or name
+        names[name.lower()] = code
+      names[code.lower()] = code
+      return entry
+
+    for adr in self.adrs():
+      if adr["code"]:
+        statuses = domain(adr["code"], adr["domain"])["adrs"]
+        statuses[adr["status"]] = statuses.get(adr["status"], 0) + 1
+    file_ids = {adr["adr_id"] for adr in self.adrs()}
+    for adr_id, row in (index_rows or {}).items():
+      match = _ADR_ID.fullmatch(adr_id)
+      if match and adr_id not in file_ids:
+        statuses = domain(match.group("code"), row.get("domain"))["adrs"]
+        statuses["accepted"] = statuses.get("accepted", 0) + 1
+    for gap in self.gaps():
+      raw = (gap["domain"] or "unknown").strip()
+      entry = domains.get(names.get(raw.lower(), "")) or domain(raw.upper(), raw)
+      entry["open_gaps"] += 1
+      entry["high_gaps"] += gap["priority"] in ("critical", "high")
+    for entry in domains.values():
+      accepted = entry["adrs"].get("accepted", 0)
+      if not entry["adrs"]:
+        entry["coverage"] = "missing"
+      elif not accepted or entry["high_gaps"]:
+        entry["coverage"] = "weak"
+      else:
+        entry["coverage"] = "covered"
+    return sorted(domains.values(), key=lambda item: ({"missing": 0, "weak": 1, "covered": 2}[item["coverage"]], item["code"]))
+
+  # -- adr-index.md ---------------------------------------------------------------
+
+  def sync_adr_index(self, index_path: Path, dry_run: bool = False) -> Dict[str, Any]:
+    """Regenerate the ``## Index`` rows of ``index_path`` from ADR files; returns ``{changed, added, updated}``."""
+    try:
+      text = index_path.read_text(encoding="utf-8")
+    except OSError:
+      text = f"# ADR Index\n\n## Format\n{_INDEX_FORMAT}\n\n## Index\n"
+    lines = text.splitlines()
+    start = next((i for i, line in enumerate(lines) if line.strip() == "## Index"), None)
+    if start is None:
+      lines += ["", "## Index"]
+      start = len(lines) - 1
+    end = next((i for i in range(start + 1, len(lines)) if lines[i].startswith("## ")), len(lines))
+    block = lines[start + 1:end]
+    rows: Dict[str, str] = {}
+    order: List[str] = []
+    other: List[str] = []
+    for line in block:
+      match = _INDEX_ROW.match(line)
+      if match:
+        rows[match.group("id")] = line
+        order.append(match.group("id"))
+      elif line.strip():
+        other.append(line)
+    added, updated = [], []
+    for adr in self.adrs():
+      if not adr["adr_id"] or adr["status"] not in INDEXED_STATUSES:
+        continue
+      previous = rows.get(adr["adr_id"])
+      old_cells = previous.split("|") if previous else []
+      cells = [
+        adr["adr_id"],
+        adr["domain"] or (old_cells[1] if len(old_cells) > 1 else adr["code"]),
+        adr["decision"] or (old_cells[2] if len(old_cells) > 2 else adr["title"]),
+        adr["keywords"] or (old_cells[3] if len(old_cells) > 3 else "—"),
+        adr["patterns"] or (old_cells[4] if len(old_cells) > 4 else "—"),
+      ]
+      line = "|".join(cell.replace("|", "/") for cell in cells)
+      if previous is None:
+        order.append(adr["adr_id"])
+        added.append(adr["adr_id"])
+      elif previous != line:
+        updated.append(adr["adr_id"])
+      rows[adr["adr_id"]] = line
+    new_block = other + [rows[adr_id] for adr_id in order]
+    lines[start + 1:end] = new_block + ([""] if end < len(lines) else [])
+    new_text = "\n".join(lines) + "\n"
+    changed = new_text != text
+    if changed and not dry_run:
+      from action_plan import atomic_write_text
+
+      index_path.parent.mkdir(parents=True, exist_ok=True)
+      atomic_write_text(index_path, new_text)
+    return {"path": str(index_path), "changed": changed, "added": added, "updated": updated}
+
+  # -- staleness --------------------------------------------------------------
+
+  def _git(self, *args: str) -> Optional[str]:
+    try:
+      completed = subprocess.run(
+        ["git", "-C", str(self.project_root), *args], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+      )
+    except OSError:
+      return None
+    return completed.stdout if completed.returncode == 0 else None
+
+  def refresh_commits(self, since: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Load commits after ``since`` (YYYY-MM-DD) into the index, incrementally from the last seen HEAD.
+
+    Returns ``{head, added, mode}`` or None outside a git work tree.
+    """
+    head = (self._git("rev-parse", "HEAD") or "").strip()
+    if not head:
+      return None
+    meta = dict(self.db.execute("SELECT key, value FROM meta"))
+    old_head, old_since = meta.get("git_head"), meta.get("git_since", "")
+    covered = old_since == "" or (since is not None and since >= old_since)
+    if old_head == head and covered:
+      return {"head": head, "added": 0, "mode": "cached"}
+    args = ["log", "--no-merges", "--format=%x1e%H%x1f%ct%x1f%s", "--name-only"]
+    mode = "full"
+    if old_head and covered and self._git("merge-base", "--is-ancestor", old_head, head) is not None:
+      args.append(f"{old_head}..{head}")
+      mode = "incremental"
+    elif since:
+      args.append(f"--since={since}")
+    output = self._git(*args) or ""
+    records = []
+    for chunk in output.split("\x1e")[1:]:
+      header, _, names = chunk.partition("\n")
+      sha, ts, subject = (header.split("\x1f") + ["", ""])[:3]
+      paths = [name for name in names.splitlines() if name.strip()]
+      records.append((sha, int(ts or 0), subject, "\n".join(paths)))
+    with self.db:
+      if mode == "full":
+        self.db.execute("DELETE FROM commits")
+      self.db.executemany("INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?)", records)
+      self.db.executemany(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+        [("git_head", head), ("git_since", old_since if mode == "incremental" else (since or ""))],
+      )
+    return {"head": head, "added": len(records), "mode": mode}
+
+  def staleness(self, index_rows: Optional[Dict[str, Dict[str, str]]] = None, min_commits: int = 5) -> Dict[str, Any]:
+    """ADRs ranked by commits touching their domain after the ADR date.
+
+    An ADR is ``stale`` once ``min_commits`` such commits exist. Domain paths
+    come from the ADR's ``paths`` globs, else its keywords (including the
+    ``adr-index.md`` row) and pattern names are matched against changed paths.
+    Architecture documents themselves are ignored.
+    """
+    adrs = [adr for adr in self.adrs() if adr["adr_id"] and adr["date"] and adr["status"] in INDEXED_STATUSES]
+    since = min((adr["date"] for adr in adrs), default=None)
+    git = self.refresh_commits(since)
+    if git is None:
+      return {"available": False, "adrs": []}
+    today = datetime.date.today()
+    results = []
+    for adr in adrs:
+      row = (index_rows or {}).get(adr["adr_id"], {})
+      terms = _split_list(adr["keywords"]) + _split_list(row.get("keywords"))
+      terms += [pattern.rstrip("-*") for pattern in _split_list(adr["patterns"]) + _split_list(row.get("patterns"))]
+      terms = sorted({term.lower() for term in terms if len(term) > 2})
+      globs = _split_list(adr["paths"])
+      start = datetime.datetime.fromisoformat(adr["date"]).replace(tzinfo=datetime.timezone.utc)
+      touching, last = 0, None
+      for ts, paths in self.db.execute("SELECT ts, paths FROM commits WHERE ts > ? ORDER BY ts", (int(start.timestamp()) + 86400,)):
+        relevant = [
+          path for path in paths.split("\n")
+          if path and not path.startswith(f"{self.architecture_root}/") and _path_matches(path, terms, globs)
+        ]
+        if relevant:
+          touching += 1
+          last = ts
+      results.append({
+        "adr_id": adr["adr_id"],
+        "title": adr["title"],
+        "date": adr["date"],
+        "age_days": (today - datetime.date.fromisoformat(adr["date"])).days,
+        "commits_after": touching,
+        "last_touch": datetime.datetime.fromtimestamp(last, datetime.timezone.utc).date().isoformat() if last else None,
+        "stale": touching >= min_commits,
+        "path": adr["path"],
+      })
+    results.sort(key=lambda item: (-item["commits_after"], item["adr_id"]))
+    return {"available": True, "git": git, "min_commits": min_commits, "adrs": results}
+
+
+def read_index_rows(index_path: Path) -> Dict[str, Dict[str, str]]:
+  """``ID -> {domain, decision, keywords, patterns}`` from the ``## Index`` section of ``adr-index.md``."""
+  rows: Dict[str, Dict[str, str]] = {}
+  try:
+    text = index_path.read_text(encoding="utf-8")
+  except OSError:
+    return rows
+  section = ""
+  for line in text.splitlines():
+    if line.startswith("## "):
+      section = line[3:].strip()
+      continue
+    if section == "Index" and _INDEX_ROW.match(line):
+      cells = (line.split("|") + [""] * 5)[:5]
+      rows[cells[0]] = dict(zip(("domain", "decision", "keywords", "patterns"), cells[1:]))
+  return rows
@@ -0,0 +1,416 @@
+"""
+Packed, compressed store for archived comms threads and completed issues.
+
+install_team.py's ``archive`` subcommand finds old items (files in each team's
+``issues_completed`` folder and thread folders under
+``dev_communication/archive/``) and packs them into append-only segment files
+in ``dev_communication/archive/packs/``. Every document is zlib-compressed on
+its own behind a small record header, so one document is read back by mapping
+its segment with mmap and decompressing the bytes at its offset.
+
+Each ``segment-NNNN.pack`` has a sidecar ``segment-NNNN.idx.jsonl`` with one
+line per packed document: item, path, offset, length, sha1 and the parsed
+header metadata (team, issue id, subject, status, priority, date). Searches
+read only these lines. Restoring an item writes its files back and appends a
+``restore`` line; its packed bytes stay in the segment. The sidecars are plain
+text because, unlike the SQLite caches, they are the only record of what was
+packed and live in the repository next to the segments. Packed issue ids still
+count as used: ``max_issue_number`` feeds ``comms next-issue``.
+
+Writers serialize on a lock file the caller places outside the repository
+(``.codex-workflow/cache/archive/``).
+
+Records are written in batches: the segment is synced, then the batch's index
+lines, and only then are its loose files removed. An interrupted pack leaves
+either the loose file or a complete record (re-packing a file whose sha1 is
+already indexed just removes it); unindexed bytes in a segment are ignored.
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from action_plan import file_lock
+from comms import issue_key, parse_header
+
+ARCHIVE_DIR = "dev_communication/archive"
+PACKS_DIR = "packs"
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+DEFAULT_OLDER_THAN_DAYS = 30
+
+_SEGMENT_MAGIC = b"CWARCHIVE1\n"
+_RECORD = struct.Struct(">4sII")
+_RECORD_MAGIC = b"CWAR"
+_SEGMENT_NAME = re.compile(r"^segment-(?P<number>\d{4,})\.pack$")
+_DATE_NAME = re.compile(r"^(?P<date>\d{4}-\d{2}-\d{2})")
+_BATCH_RECORDS = 256
+
+
+def _now() -> str:
+  return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+def _item_date(name: str, mtime: float) -> datetime.date:
+  dated = _DATE_NAME.match(name)
+  if dated:
+    try:
+      return datetime.date.fromisoformat(dated.group("date"))
+    except ValueError:
+      pass
+  return datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc).date()
+
+
+def find_candidates(
+  project_root: Path,
+  completed_dirs: Dict[str, str],
+  archive_rel: str,
+  older_than_days: int,
+  today: Optional[datetime.date] = None
+) -> Iterator[Dict[str, Any]]:
+  """Items old enough to pack: completed issues (by mtime) and archived thread folders (by date prefix, else mtime).
+
+  ``completed_dirs`` maps team id -> that team's ``issues_completed`` folder.
+  """
+  cutoff = (today or datetime.date.today()) - datetime.timedelta(days=older_than_days)
+  for team, rel_dir in completed_dirs.items():
+    try:
+      with os.scandir(project_root / rel_dir) as it:
+        entries = sorted((entry for entry in it if entry.name.endswith(".md") and entry.is_file()), key=lambda entry: entry.name)
+    except OSError:
+      continue
+    for entry in entries:
+      if entry.name.startswith(".") or _item_date(entry.name, entry.stat().st_mtime) > cutoff:
+        continue
+      rel = f"{rel_dir.rstrip('/')}/{entry.name}"
+      yield {"item": rel, "kind": "issue", "team": team, "files": [rel]}
+  try:
+    with os.scandir(project_root / archive_rel) as it:
+      threads = sorted((entry for entry in it if entry.is_dir(follow_symlinks=False)), key=lambda entry: entry.name)
+  except OSError:
+    return
+  for entry in threads:
+    if entry.name.startswith(".") or entry.name == PACKS_DIR or _item_date(entry.name, entry.stat().st_mtime) > cutoff:
+      continue
+    files = []
+    for current, dirs, names in os.walk(entry.path):
+      dirs[:] = sorted(name for name in dirs if not name.startswith("."))
+      files.extend(os.path.relpath(os.path.join(current, name), project_root).replace(os.sep, "/") for name in sorted(names))
+    if files:
+      yield {"item": f"{archive_rel.rstrip('/')}/{entry.name}", "kind": "thread", "team": None, "files": files}
+
+
+def _metadata(path: Path, kind: str) -> Dict[str, Any]:
+  if path.suffix != ".md":
+    return {}
+  header = parse_header(path)
+  meta: Dict[str, Any] = {key: value for key, value in header.items() if value}
+  key = issue_key(path.name) if kind == "issue" else None
+  if key:
+    meta["issue_id"] = f"{key[0]}-{key[1]:03d}"
+  return meta
+
+
+class ArchiveStore:
+  """Segments and sidecar indexes under ``<archive>/packs``."""
+
+  def __init__(self, project_root: Path, archive_rel: str, lock_path: Path, segment_bytes: int = DEFAULT_SEGMENT_BYTES) -> None:
+    self.project_root = project_root
+    self.archive_rel = archive_rel.rstrip("/")
+    self.root = project_root / self.archive_rel / PACKS_DIR
+    self.lock_path = lock_path
+    self.segment_bytes = segment_bytes
+    self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+  # -- index ----------------------------------------------------------------------
+
+  def segments(self) -> List[Path]:
+    try:
+      names = [name for name in os.listdir(self.root) if _SEGMENT_NAME.match(name)]
+    except OSError:
+      return []
+    return [self.root / name for name in sorted(names, key=lambda name: int(_SEGMENT_NAME.match(name).group("number")))]
+
+  @staticmethod
+  def _index_path(segment: Path) -> Path:
+    return segment.with_name(segment.stem + ".idx.jsonl")
+
+  def entries(self) -> Dict[str, Dict[str, Any]]:
+    """Packed documents by original path (restored ones excluded), from the sidecar indexes."""
+    if self._entries is None:
+      entries: Dict[str, Dict[str, Any]] = {}
+      for segment in self.segments():
+        try:
+          handle = self._index_path(segment).open("r", encoding="utf-8")
+        except OSError:
+          continue
+        with handle:
+          for line in handle:
+            try:
+              record = json.loads(line)
+            except ValueError:
+              continue  # torn last line of an interrupted pack
+            if record.get("op") == "restore":
+              for path in record.get("paths", []):
+                entries.pop(path, None)
+            elif record.get("path"):
+              entries[record["path"]] = dict(record, segment=segment.name)
+      self._entries = entries
+    return self._entries
+
+  def max_issue_number(self, prefix: str, team: Optional[str] = None) -> int:
+    """Highest ``<prefix>-<NNN>`` number ever packed (restored ones included), else 0."""
+    prefix = f"{prefix.upper()}-"
+    highest = 0
+    for segment in self.segments():
+      try:
+        handle = self._index_path(segment).open("r", encoding="utf-8")
+      except OSError:
+        continue
+      with handle:
+        for line in handle:
+          if prefix not in line:
+            continue
+          try:
+            record = json.loads(line)
+          except ValueError:
+            continue
+          issue = record.get("issue_id") or ""
+          if issue.startswith(prefix) and (team is None or record.get("team") == team) and issue[len(prefix):].isdigit():
+            highest = max(highest, int(issue[len(prefix):]))
+    return highest
+
+  def items(self) -> Dict[str, List[Dict[str, Any]]]:
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in self.entries().values():
+      grouped.setdefault(entry["item"], []).append(entry)
+    return grouped
+
+  def _open_segment(self) -> Tuple[Path, Any, Any]:
+    """The segment to append to (a new one once the last is full) with its data and index handles."""
+    segments = self.segments()
+    segment = segments[-1] if segments else None
+    if segment is None or segment.stat().st_size >= max(self.segment_bytes, len(_SEGMENT_MAGIC) + 1):
+      number = int(_SEGMENT_NAME.match(segment.name).group("number")) + 1 if segment else 1
+      segment = self.root / f"segment-{number:04d}.pack"
+    self.root.mkdir(parents=True, exist_ok=True)
+    data = segment.open("ab")
+    if data.tell() == 0:
+      data.write(_SEGMENT_MAGIC)
+    index_path = self._index_path(segment)
+    with index_path.open("ab+") as raw:
+      if raw.tell() and (raw.seek(-1, os.SEEK_END), raw.read(1))[1] != b"\n":
+        raw.write(b"\n")  # end a torn line so the next record parses
+    index = index_path.open("a", encoding="utf-8")
+    return segment, data, index
+
+  # -- pack -----------------------------------------------------------------------
+
+  def pack(self, candidates: Iterator[Dict[str, Any]], dry_run: bool = False) -> Dict[str, Any]:
+    """Append each candidate's files to the current segment and remove them; returns counts and packed items."""
+    summary: Dict[str, Any] = {"items": [], "files": 0, "bytes": 0, "packed_bytes": 0, "already_packed": 0}
+    if dry_run:
+      for candidate in candidates:
+        summary["items"].append({"item": candidate["item"], "kind": candidate["kind"], "files": len(candidate["files"])})
+        summary["files"] += len(candidate["files"])
+        summary["bytes"] += sum((self.project_root / rel).stat().st_size for rel in candidate["files"])
+      return summary
+    self.root.mkdir(parents=True, exist_ok=True)
+    with file_lock(self.lock_path):
+      self._entries = None
+      entries = self.entries()
+      segment, data, index = self._open_segment()
+      # Records of a batch are synced (data first, then index lines) before its loose files go.
+      lines: List[str] = []
+      done: List[Dict[str, Any]] = []
+
+      def commit() -> None:
+        data.flush()
+        os.fsync(data.fileno())
+        index.write("".join(lines))
+        index.flush()
+        os.fsync(index.fileno())
+        for candidate in done:
+          for rel in candidate["files"]:
+            (self.project_root / rel).unlink()
+          if candidate["kind"] == "thread":
+            self._remove_empty_dirs(self.project_root / candidate["item"])
+          summary["items"].append({"item": candidate["item"], "kind": candidate["kind"], "files": len(candidate["files"])})
+        lines.clear()
+        done.clear()
+
+      try:
+        for candidate in candidates:
+          if data.tell() >= max(self.segment_bytes, len(_SEGMENT_MAGIC) + 1):
+            commit()
+            data.close()
+            index.close()
+            segment, data, index = self._open_segment()
+          packed_at = _now()
+          for rel in candidate["files"]:
+            path = self.project_root / rel
+            raw = path.read_bytes()
+            digest = hashlib.sha1(raw).hexdigest()
+            if entries.get(rel, {}).get("sha1") == digest:
+              summary["already_packed"] += 1
+            else:
+              compressed = zlib.compress(raw, 6)
+              offset = data.tell()
+              data.write(_RECORD.pack(_RECORD_MAGIC, len(compressed), len(raw)))
+              data.write(compressed)
+              record = {
+                "item": candidate["item"],
+                "kind": candidate["kind"],
+                "team": candidate["team"],
+                "path": rel,
+                "offset": offset,
+                "length": len(compressed),
+                "size": len(raw),
+                "sha1": digest,
+                "mtime": int(path.stat().st_mtime),
+                "packed_at": packed_at,
+              }
+              record.update(_metadata(path, candidate["kind"]))
+              lines.append(json.dumps(record, sort_keys=True) + "\n")
+              entries[rel] = dict(record, segment=segment.name)
+              summary["packed_bytes"] += _RECORD.size + len(compressed)
+            summary["files"] += 1
+            summary["bytes"] += len(raw)
+          done.append(candidate)
+          if len(lines) >= _BATCH_RECORDS:
+            commit()
+        commit()
+      finally:
+        data.close()
+        index.close()
+    return summary
+
+  @staticmethod
+  def _remove_empty_dirs(directory: Path) -> None:
+    for current, _, _ in sorted(os.walk(directory), key=lambda walked: -len(walked[0])):
+      try:
+        os.rmdir(current)
+      except OSError:
+        pass
+
+  # -- read -----------------------------------------------------------------------
+
+  def read(self, entry: Dict[str, Any], mapped: Optional[Dict[str, Any]] = None) -> bytes:
+    """One document's bytes, decompressed from its segment through mmap.
+
+    ``mapped`` caches open maps by segment name when reading several documents.
+    """
+    maps = mapped if mapped is not None else {}
+    view = maps.get(entry["segment"])
+    if view is None:
+      with (self.root / entry["segment"]).open("rb") as f:
+        view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+      maps[entry["segment"]] = view
+    try:
+      magic, length, size = _RECORD.unpack_from(view, entry["offset"])
+      if magic != _RECORD_MAGIC or length != entry["length"]:
+        raise ValueError(f"{entry['segment']}: no archive record at offset {entry['offset']}")
+      start = entry["offset"] + _RECORD.size
+      raw = zlib.decompress(view[start:start + length])
+      if len(raw) != size or hashlib.sha1(raw).hexdigest() != entry["sha1"]:
+        raise ValueError(f"{entry['segment']}: checksum mismatch for {entry['path']}")
+      return raw
+    finally:
+      if mapped is None:
+        view.close()
+
+  def find(self, name: str) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    """Resolve an item id, packed path, issue id or unique item-name fragment to ``(item, entries)``."""
+    name = name.strip().rstrip("/")
+    entries = self.entries()
+    if name in entries:
+      entry = entries[name]
+      return entry["item"], [entry]
+    items = self.items()
+    if name in items:
+      return name, items[name]
+    lowered = name.lower()
+    matches = sorted({
+      entry["item"] for entry in entries.values()
+      if (entry.get("issue_id") or "").lower() == lowered or lowered in entry["item"].lower().rsplit("/", 1)[-1]
+    })
+    if len(matches) == 1:
+      return matches[0], items[matches[0]]
+    return None, [entry for item in matches for entry in items[item]]
+
+  def search(self, words: List[str], team: Optional[str] = None, kind: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """Packed documents whose metadata (path, subject, issue id, status, date) contains every word."""
+    terms = [word.lower() for word in words if word.strip()]
+    results = []
+    for entry in self.entries().values():
+      if team and entry.get("team") != team:
+        continue
+      if kind and entry.get("kind") != kind:
+        continue
+      haystack = " ".join(str(entry.get(key) or "") for key in ("path", "subject", "issue_id", "status", "priority", "date", "team")).lower()
+      if all(term in haystack for term in terms):
+        results.append(entry)
+    results.sort(key=lambda entry: (entry.get("date") or "", entry["path"]), reverse=True)
+    return results[:limit]
+
+  # -- restore --------------------------------------------------------------------
+
+  def restore(self, item: str, force: bool = False) -> List[str]:
+    """Write an item's files back to their original paths and mark them restored in the index."""
+    with file_lock(self.lock_path):
+      self._entries = None
+      entries = self.items().get(item)
+      if not entries:
+        raise KeyError(item)
+      existing = [entry["path"] for entry in entries if (self.project_root / entry["path"]).exists()]
+      if existing and not force:
+        raise FileExistsError(f"already exists: {', '.join(existing)} (pass --force to overwrite)")
+      maps: Dict[str, Any] = {}
+      try:
+        for entry in entries:
+          raw = self.read(entry, maps)
+          path = self.project_root / entry["path"]
+          path.parent.mkdir(parents=True, exist_ok=True)
+          tmp = path.with_name(f".{path.name}.restore-tmp")
+          tmp.write_bytes(raw)
+          os.replace(tmp, path)
+          os.utime(path, (entry["mtime"], entry["mtime"]))
+      finally:
+        for view in maps.values():
+          view.close()
+      segment, data, index = self._open_segment()
+      data.close()
+      with index:
+        index.write(json.dumps({"op": "restore", "item": item, "paths": [entry["path"] for entry in entries], "restored_at": _now()}, sort_keys=True) + "\n")
+        index.flush()
+        os.fsync(index.fileno())
+      self._entries = None
+    return [entry["path"] for entry in entries]
+
+  def stats(self) -> Dict[str, Any]:
+    entries = self.entries()
+    segments = self.segments()
+    by_kind: Dict[str, int] = {}
+    for item in self.items().values():
+      by_kind[item[0]["kind"]] = by_kind.get(item[0]["kind"], 0) + 1
+    live_bytes = sum(_RECORD.size + entry["length"] for entry in entries.values())
+    segment_bytes = sum(segment.stat().st_size for segment in segments)
+    return {
+      "root": str(self.root),
+      "segments": len(segments),
+      "segment_bytes": segment_bytes,
+      "documents": len(entries),
+      "items": by_kind,
+      "original_bytes": sum(entry["size"] for entry in entries.values()),
+      "live_bytes": live_bytes,
+      # Bytes of restored or superseded records still held by the append-only segments.
+      "dead_bytes": max(0, segment_bytes - live_bytes - len(_SEGMENT_MAGIC) * len(segments)),
+    }
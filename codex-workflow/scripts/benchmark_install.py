@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Benchmark install_team.py against synthetic workspaces.
+
+Generates a throwaway workspace per size (N teams in registry.yaml, per-team
+definition.yaml files with sub-teams, M skills of K files each, and a
+pre-populated ai_team_config vault), then times installer invocations in fresh
+interpreters:
+
+  cold_install         first install into an empty target with no YAML cache
+  warm_reinstall       --force rerun with unchanged inputs (fingerprint hit)
+  full_copy_reinstall  --force --full-copy rerun (wipe and recopy)
+  dry_run              --force --full-copy --dry-run
+  detect_team          --detect-team
+  list_teams           --list-teams
+
+Output is stable JSON (sorted keys, fixed rounding) so runs can be diffed
+between commits.
+
+Usage examples:
+  python3 .codex-workflow/scripts/benchmark_install.py
+  python3 .codex-workflow/scripts/benchmark_install.py --teams 10,100,500 --repeat 5 --output bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+INSTALLER_FILES = ["install_team.py", "installer.py", "subcommands.py", "action_plan.py", "object_store.py", "append_log.py"]
+WORKSPACE_NAME = "bench-workspace"
+
+
+def _team_id(index: int) -> str:
+  return f"team-{index:04d}"
+
+
+def _write(path: Path, content: str) -> None:
+  path.parent.mkdir(parents=True, exist_ok=True)
+  path.write_text(content, encoding="utf-8")
+
+
+def _generate_workflow_root(
+  workflow_root: Path,
+  team_count: int,
+  skill_count: int,
+  files_per_skill: int,
+  file_size: int
+) -> None:
+  scripts_dir = workflow_root / "scripts"
+  scripts_dir.mkdir(parents=True, exist_ok=True)
+  for name in INSTALLER_FILES:
+    shutil.copy2(SCRIPTS_DIR / name, scripts_dir / name)
+
+  skills = [f"skill-{index:03d}" for index in range(skill_count)]
+  filler = ("lorem ipsum dolor sit amet " * (file_size // 27 + 1))[:file_size]
+  for skill in skills:
+    _write(workflow_root / "skills" / skill / "SKILL.md", f"---\nname: {skill}\n---\n\n{filler}\n")
+    for index in range(1, files_per_skill):
+      _write(workflow_root / "skills" / skill / "references" / f"ref-{index:03d}.md", f"# {skill} {index}\n\n{filler}\n")
+
+  teams: Dict[str, Any] = {}
+  for index in range(team_count):
+    team_id = _team_id(index)
+    teams[team_id] = {
+      "name": f"Team {index}",
+      "alias": f"t{index}",
+      "issue_prefix": f"T{index}-ISS",
+      "enabled_skills": skills,
+      "default_paths": {
+        "inbox": f"dev_communication/{team_id}/inbox",
+        "issues_queue": f"dev_communication/{team_id}/issues/queue",
+        "issues_active": f"dev_communication/{team_id}/issues/active",
+        "issues_completed": f"dev_communication/{team_id}/issues/completed",
+        "architecture_root": "dev_communication/shared/architecture",
+      },
+    }
+  _write(
+    workflow_root / "teams" / "profiles.json",
+    json.dumps({"version": "bench", "teams": teams}, indent=2) + "\n"
+  )
+  _write(workflow_root / "teams" / "protocol.yaml", "protocol: bench\n")
+
+
+def _generate_dev_communication(project_root: Path, team_count: int, sub_teams: int) -> None:
+  registry_lines = [f"project: {WORKSPACE_NAME}", "", "active_teams:"]
+  alias_lines = ["", "aliases:"]
+  for index in range(team_count):
+    team_id = _team_id(index)
+    repo = WORKSPACE_NAME if index == 0 else f"repo-{index:04d}"
+    registry_lines += [
+      f"  - id: {team_id}",
+      f"    name: Team {index}",
+      f"    alias: t{index}",
+      f"    repo: {repo}",
+      f"    definition: {team_id}/definition.yaml",
+      "    sub_teams:",
+    ]
+    definition_lines = [
+      "team:",
+      f"  id: {team_id}",
+      f"  name: Team {index}",
+      f"  alias: t{index}",
+      "identity:",
+      f"  issue_prefix: T{index}-ISS",
+      f"  inbox: {team_id}/inbox",
+      f"  issues: {team_id}/issues",
+      f"  status: {team_id}/status.md",
+      "sub_teams:",
+    ]
+    for sub_index in range(sub_teams):
+      sub_id = f"{team_id}-sub{sub_index}"
+      registry_lines += [f"      - id: {sub_id}", f"        name: Sub {sub_index}", "        function: dev"]
+      definition_lines += [f"  {sub_id}:", f"    name: Sub-{sub_index}", "    function: dev", f"    issue_prefix: T{index}-S{sub_index}"]
+      alias_lines.append(f"  {sub_id}: {team_id}")
+    alias_lines.append(f"  t{index}: {team_id}")
+    _write(project_root / "dev_communication" / team_id / "definition.yaml", "\n".join(definition_lines) + "\n")
+  _write(
+    project_root / "dev_communication" / "shared" / "registry.yaml",
+    "\n".join(registry_lines + alias_lines) + "\n"
+  )
+
+
+def _generate_vault(project_root: Path, team_count: int, notes_per_team: int) -> None:
+  for index in range(team_count):
+    team_root = project_root / "ai_team_config" / _team_id(index)
+    for note in range(notes_per_team):
+      _write(team_root / "memory_store" / f"note-{note:04d}.md", f"# Note {note}\n\n[[ai_team_config/{_team_id(index)}/index]]\n")
+
+
+def generate_workspace(root: Path, config: Dict[str, int]) -> tuple[Path, Path]:
+  """Create a synthetic workspace under ``root``; return (workspace, workflow_root)."""
+  project_root = root / WORKSPACE_NAME
+  workflow_root = project_root / ".codex-workflow"
+  _generate_workflow_root(
+    workflow_root,
+    config["teams"],
+    config["skills"],
+    config["files_per_skill"],
+    config["file_size"]
+  )
+  _generate_dev_communication(project_root, config["teams"], config["sub_teams"])
+  _generate_vault(project_root, config["teams"], config["vault_notes"])
+  return project_root, workflow_root
+
+
+def _run(command: List[str], env: Dict[str, str]) -> float:
+  started = time.perf_counter()
+  completed = subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+  elapsed = time.perf_counter() - started
+  if completed.returncode not in (0, 1):
+    raise RuntimeError(f"{' '.join(command)} failed ({completed.returncode}): {completed.stderr.strip()}")
+  return elapsed
+
+
+def _summarize(samples: List[float]) -> Dict[str, Any]:
+  return {
+    "runs": len(samples),
+    "min_ms": round(min(samples) * 1000, 1),
+    "median_ms": round(statistics.median(samples) * 1000, 1),
+    "max_ms": round(max(samples) * 1000, 1),
+  }
+
+
+def benchmark_size(config: Dict[str, int], repeat: int) -> Dict[str, Any]:
+  with tempfile.TemporaryDirectory(prefix="codex-bench-") as tmp:
+    tmp_root = Path(tmp)
+    project_root, workflow_root = generate_workspace(tmp_root, config)
+    installer = str(workflow_root / "scripts" / "install_team.py")
+    env = dict(os.environ, CODEX_HOME=str(tmp_root / "codex-home"))
+    base = [sys.executable, installer, "--workspace-root", str(project_root), "--no-local-config"]
+    team = ["--team", _team_id(0)]
+    samples: Dict[str, List[float]] = {name: [] for name in (
+      "cold_install", "warm_reinstall", "full_copy_reinstall", "dry_run", "detect_team", "list_teams"
+    )}
+    phases: Dict[str, Any] = {}
+
+    for run in range(repeat):
+      target = tmp_root / "targets" / f"run-{run}"
+      # Cold means no parsed-YAML cache either.
+      shutil.rmtree(workflow_root / "cache", ignore_errors=True)
+      samples["cold_install"].append(_run(base + team + ["--target", str(target)], env))
+      if not phases:
+        manifest = json.loads((target / "install-manifest.json").read_text(encoding="utf-8"))
+        phases = manifest.get("timings", {}).get("phases", {})
+      samples["warm_reinstall"].append(_run(base + team + ["--target", str(target), "--force"], env))
+      samples["full_copy_reinstall"].append(_run(base + team + ["--target", str(target), "--force", "--full-copy"], env))
+      samples["dry_run"].append(_run(base + team + ["--target", str(target), "--force", "--full-copy", "--dry-run"], env))
+      samples["detect_team"].append(_run(base + ["--detect-team"], env))
+      samples["list_teams"].append(_run(base + ["--list-teams"], env))
+
+    return {
+      "config": dict(sorted(config.items())),
+      "results": {name: _summarize(values) for name, values in sorted(samples.items())},
+      "cold_install_phase_ms": {name: phases[name].get("ms") for name in sorted(phases)},
+    }
+
+
+def _parse_sizes(value: str) -> List[int]:
+  sizes = [int(item) for item in value.split(",") if item.strip()]
+  if not sizes or any(size < 1 for size in sizes):
+    raise argparse.ArgumentTypeError("expected a comma-separated list of positive integers")
+  return sizes
+
+
+def main() -> int:
+  parser = argparse.ArgumentParser(description="Benchmark install_team.py against synthetic workspaces")
+  parser.add_argument("--teams", type=_parse_sizes, default=[10, 100], help="Comma-separated registry sizes to benchmark (default: 10,100)")
+  parser.add_argument("--sub-teams", type=int, default=2, help="Sub-teams per team definition (default: 2)")
+  parser.add_argument("--skills", type=int, default=6, help="Skills per team profile (default: 6)")
+  parser.add_argument("--files-per-skill", type=int, default=5, help="Files per skill folder (default: 5)")
+  parser.add_argument("--file-size", type=int, default=4096, help="Bytes per generated skill file (default: 4096)")
+  parser.add_argument("--vault-notes", type=int, default=20, help="Pre-populated memory notes per team vault (default: 20)")
+  parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (default: 3)")
+  parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+  args = parser.parse_args()
+
+  sizes = []
+  for team_count in args.teams:
+    config = {
+      "teams": team_count,
+      "sub_teams": args.sub_teams,
+      "skills": args.skills,
+      "files_per_skill": args.files_per_skill,
+      "file_size": args.file_size,
+      "vault_notes": args.vault_notes,
+    }
+    print(f"Benchmarking {team_count} teams...", file=sys.stderr)
+    sizes.append(benchmark_size(config, max(1, args.repeat)))
+
+  report = {
+    "benchmark": "install_team",
+    "python": platform.python_version(),
+    "repeat": max(1, args.repeat),
+    "sizes": sizes,
+  }
+  body = json.dumps(report, indent=2, sort_keys=True) + "\n"
+  if args.output:
+    Path(args.output).write_text(body, encoding="utf-8")
+  else:
+    sys.stdout.write(body)
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,477 @@
+"""
+Incremental SQLite index over dev_communication inboxes and issue folders.
+
+install_team.py's ``comms`` subcommand resolves a team's ``default_paths``
+(inbox, issues_queue, issues_active, issues_completed) and hands them to
+CommsIndex. Each refresh walks those folders with os.scandir and re-parses only
+files whose size or mtime changed since the last run; rows for deleted files are
+dropped. Check summaries, status counts and the next issue number are then
+answered with SQL instead of listing and reading every file.
+
+Only the header block of a file is read (up to the first ``## `` section).
+
+The module also implements the batch issue mover: each move streams the file
+into the destination folder with its ``Status:`` header rewritten, renames it
+into place atomically and records progress in a JSONL journal so an
+interrupted batch can be resumed or rolled back.
+"""
+
+from __future__ import annotations
+
+import filecmp
+import fnmatch
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# default_paths keys indexed per team -> folder label stored in the index.
+FOLDER_KEYS = {
+  "inbox": "inbox",
+  "issues_queue": "queue",
+  "issues_active": "active",
+  "issues_completed": "completed",
+}
+FOLDER_STATUS = {"queue": "QUEUE", "active": "ACTIVE", "completed": "COMPLETE"}
+
+_SCHEMA_VERSION = 1
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+  path TEXT PRIMARY KEY,
+  team TEXT NOT NULL,
+  folder TEXT NOT NULL,
+  kind TEXT NOT NULL,
+  prefix TEXT,
+  number INTEGER,
+  status TEXT,
+  subject TEXT,
+  date TEXT,
+  priority TEXT,
+  size INTEGER NOT NULL,
+  mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_team_folder ON files(team, folder);
+CREATE INDEX IF NOT EXISTS files_prefix_number ON files(prefix, number);
+"""
+
+_ISSUE_NAME = re.compile(r"^(?P<prefix>[A-Za-z][A-Za-z0-9]*(?:-[A-Za-z][A-Za-z0-9]*)*)-(?P<number>\d+)(?=[_.\s-]|$)")
+_DATE_NAME = re.compile(r"^(?P<date>\d{4}-\d{2}-\d{2})")
+_HEADER_FIELD = re.compile(r"^\s*(?:[-*]\s*)?(?:\*\*)?(?P<key>Status|Priority|Created|Date)(?::\*\*|\*\*:|:)\s*(?P<value>.*?)\s*$", re.IGNORECASE)
+_HEADER_LINE_LIMIT = 40
+
+
+def parse_header(path: Path) -> Dict[str, Optional[str]]:
+  """Read the title and ``Status``/``Priority``/``Created``/``Date`` fields from the top of ``path``."""
+  fields: Dict[str, Optional[str]] = {"subject": None, "status": None, "priority": None, "date": None}
+  with path.open("r", encoding="utf-8", errors="replace") as f:
+    for index, line in enumerate(f):
+      if index >= _HEADER_LINE_LIMIT or line.startswith("## "):
+        break
+      if fields["subject"] is None and line.startswith("# "):
+        title = line[2:].strip()
+        # "# API-ISS-012: Title" and "# Message: Subject" keep only the text.
+        fields["subject"] = title.split(":", 1)[1].strip() if ":" in title else title
+        continue
+      match = _HEADER_FIELD.match(line)
+      if not match:
+        continue
+      key = match.group("key").lower()
+      value = match.group("value").strip("* ")
+      if key in ("created", "date"):
+        fields["date"] = fields["date"] or value
+      elif fields[key] is None:
+        fields[key] = value.upper() if key == "status" else value
+  return fields
+
+
+def issue_key(name: str) -> Optional[tuple[str, int]]:
+  """``(PREFIX, number)`` from an issue file name such as ``API-ISS-012_title.md``."""
+  match = _ISSUE_NAME.match(name)
+  return (match.group("prefix").upper(), int(match.group("number"))) if match else None
+
+
+def _markdown_files(directory: Path) -> Iterator[os.DirEntry]:
+  try:
+    with os.scandir(directory) as it:
+      for entry in it:
+        if entry.name.endswith(".md") and not entry.name.startswith(".") and entry.is_file():
+          yield entry
+  except OSError:
+    return
+
+
+class CommsIndex:
+  def __init__(self, db_path: str, project_root: Path) -> None:
+    """Open (or create) the index at ``db_path`` (``":memory:"`` for a throwaway index)."""
+    self.project_root = project_root
+    if db_path != ":memory:":
+      Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    self.db = sqlite3.connect(db_path)
+    version = self.db.execute("PRAGMA user_version").fetchone()[0]
+    if version != _SCHEMA_VERSION:
+      self.db.executescript("DROP TABLE IF EXISTS files;")
+      self.db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    self.db.executescript(_SCHEMA)
+
+  def close(self) -> None:
+    self.db.close()
+
+  def __enter__(self) -> "CommsIndex":
+    return self
+
+  def __exit__(self, *exc: Any) -> None:
+    self.close()
+
+  def refresh(self, team_id: str, default_paths: Dict[str, str]) -> Dict[str, int]:
+    """Bring the team's rows up to date; returns ``{parsed, unchanged, removed}`` counts."""
+    stats = {"parsed": 0, "unchanged": 0, "removed": 0}
+    with self.db:
+      for key, folder in FOLDER_KEYS.items():
+        rel_dir = default_paths.get(key)
+        if not rel_dir:
+          continue
+        known = {
+          path: (size, mtime_ns)
+          for path, size, mtime_ns in self.db.execute(
+            "SELECT path, size, mtime_ns FROM files WHERE team = ? AND folder = ?", (team_id, folder)
+          )
+        }
+        seen = set()
+        for entry in _markdown_files(self.project_root / rel_dir):
+          rel = f"{rel_dir.rstrip('/')}/{entry.name}"
+          seen.add(rel)
+          stat = entry.stat()
+          if known.get(rel) == (stat.st_size, stat.st_mtime_ns):
+            stats["unchanged"] += 1
+            continue
+          self._index_file(rel, entry.name, team_id, folder, stat.st_size, stat.st_mtime_ns)
+          stats["parsed"] += 1
+        removed = [(path,) for path in known if path not in seen]
+        if removed:
+          self.db.executemany("DELETE FROM files WHERE path = ?", removed)
+          stats["removed"] += len(removed)
+    return stats
+
+  def _index_file(self, rel: str, name: str, team_id: str, folder: str, size: int, mtime_ns: int) -> None:
+    header = parse_header(self.project_root / rel)
+    issue = issue_key(name) if folder != "inbox" else None
+    date = header["date"]
+    if not date:
+      dated = _DATE_NAME.match(name)
+      date = dated.group("date") if dated else None
+    self.db.execute(
+      "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+      (
+        rel,
+        team_id,
+        folder,
+        "issue" if folder != "inbox" else "message",
+        issue[0] if issue else None,
+        issue[1] if issue else None,
+        header["status"],
+        header["subject"] or Path(name).stem,
+        date,
+        header["priority"],
+        size,
+        mtime_ns,
+      ),
+    )
+
+  # -- queries ----------------------------------------------------------------
+
+  def status_counts(self, team_id: str) -> Dict[str, Dict[str, int]]:
+    """Issue counts per folder, split by the ``Status:`` header value."""
+    counts: Dict[str, Dict[str, int]] = {}
+    rows = self.db.execute(
+      "SELECT folder, COALESCE(status, '-'), COUNT(*) FROM files "
+      "WHERE team = ? AND kind = 'issue' GROUP BY folder, status ORDER BY folder, status",
+      (team_id,),
+    )
+    for folder, status, count in rows:
+      counts.setdefault(folder, {})[status] = count
+    return counts
+
+  def mismatched_status(self, team_id: str) -> List[Dict[str, Any]]:
+    """Issues whose ``Status:`` header does not match their folder."""
+    rows = self.db.execute(
+      "SELECT path, folder, status FROM files WHERE team = ? AND kind = 'issue' ORDER BY path",
+      (team_id,),
+    )
+    return [
+      {"path": path, "folder": folder, "status": status, "expected": FOLDER_STATUS[folder]}
+      for path, folder, status in rows
+      if status != FOLDER_STATUS[folder]
+    ]
+
+  def check_summary(self, team_id: str) -> Dict[str, Any]:
+    """Pending inbox messages, open issues and counts for the comms ``check`` action."""
+    columns = ("path", "subject", "date", "priority", "status", "prefix", "number")
+    messages = [
+      dict(zip(columns, row))
+      for row in self.db.execute(
+        f"SELECT {', '.join(columns)} FROM files WHERE team = ? AND folder = 'inbox' ORDER BY date DESC, path",
+        (team_id,),
+      )
+    ]
+    open_issues = {
+      folder: [
+        dict(zip(columns, row))
+        for row in self.db.execute(
+          f"SELECT {', '.join(columns)} FROM files WHERE team = ? AND folder = ? ORDER BY prefix, number, path",
+          (team_id, folder),
+        )
+      ]
+      for folder in ("queue", "active")
+    }
+    completed = self.db.execute(
+      "SELECT COUNT(*) FROM files WHERE team = ? AND folder = 'completed'", (team_id,)
+    ).fetchone()[0]
+    return {
+      "team": team_id,
+      "inbox": messages,
+      "queue": open_issues["queue"],
+      "active": open_issues["active"],
+      "counts": {
+        "inbox": len(messages),
+        "queue": len(open_issues["queue"]),
+        "active": len(open_issues["active"]),
+        "completed": completed,
+      },
+    }
+
+  def next_issue_number(self, team_id: str, prefix: str, used: int = 0) -> int:
+    """One past the highest ``<prefix>-<NNN>`` number across the team's issue folders and ``used``.
+
+    ``used`` is the highest number known elsewhere, e.g. issues packed into the archive.
+    """
+    row = self.db.execute(
+      "SELECT MAX(number) FROM files WHERE team = ? AND prefix = ?", (team_id, prefix.upper())
+    ).fetchone()
+    return max(row[0] or 0, used) + 1
+
+
+# -- batch issue mover ---------------------------------------------------------
+
+
+def issue_id(prefix: str, number: int) -> str:
+  return f"{prefix}-{number:03d}"
+
+
+def _status_line(template: Optional[str], status: str) -> str:
+  if template is None:
+    return f"**Status:** {status}\n"
+  match = _HEADER_FIELD.match(template)
+  ending = "\n" if template.endswith("\n") else ""
+  return f"{template[:match.start('value')]}{status}{ending}"
+
+
+def rewrite_status(src: Path, dst: Path, status: Optional[str], overwrite: bool = True) -> None:
+  """Copy ``src`` to ``dst`` with the header ``Status:`` set to ``status`` (None drops it).
+
+  Only the header block is buffered; the body is streamed. The result is
+  written to a temporary sibling of ``dst`` and renamed into place; without
+  ``overwrite`` it is linked into place instead, raising FileExistsError if
+  ``dst`` exists.
+  """
+  tmp = dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+  try:
+    with src.open("r", encoding="utf-8", newline="") as source, tmp.open("w", encoding="utf-8", newline="") as out:
+      header: List[str] = []
+      status_at: Optional[int] = None
+      title_at: Optional[int] = None
+      boundary: Optional[str] = None
+      for line in source:
+        if len(header) >= _HEADER_LINE_LIMIT or line.startswith("## "):
+          boundary = line
+          break
+        if title_at is None and line.startswith("# "):
+          title_at = len(header)
+        match = _HEADER_FIELD.match(line)
+        if status_at is None and match and match.group("key").lower() == "status":
+          status_at = len(header)
+        header.append(line)
+      if status_at is not None:
+        if status is None:
+          del header[status_at]
+        else:
+          header[status_at] = _status_line(header[status_at], status)
+      elif status is not None:
+        insert_at = title_at + 1 if title_at is not None else 0
+        if insert_at and not header[insert_at - 1].endswith("\n"):
+          header[insert_at - 1] += "\n"
+        header.insert(insert_at, _status_line(None, status))
+      out.writelines(header)
+      if boundary is not None:
+        out.write(boundary)
+      shutil.copyfileobj(source, out)
+    shutil.copystat(src, tmp)
+    if overwrite:
+      os.replace(tmp, dst)
+    else:
+      os.link(tmp, dst)
+      tmp.unlink()
+  except BaseException:
+    if tmp.exists():
+      tmp.unlink()
+    raise
+
+
+def plan_moves(
+  index: CommsIndex,
+  team_id: str,
+  patterns: List[str],
+  default_paths: Dict[str, str],
+  to_folder: str
+) -> tuple[List[Dict[str, Any]], List[str]]:
+  """Resolve issue id patterns (globs allowed) to moves into ``to_folder``.
+
+  Returns (moves, unmatched patterns, conflicts). Issues already in
+  ``to_folder`` with the right status are left out. A move whose destination
+  is taken by another file, or by another move of the batch, is reported in
+  conflicts instead of moves.
+  """
+  target_dir = default_paths[f"issues_{to_folder}"].rstrip("/")
+  rows = index.db.execute(
+    "SELECT path, folder, prefix, number, status FROM files WHERE team = ? AND kind = 'issue' ORDER BY path",
+    (team_id,),
+  ).fetchall()
+  wanted = [pattern.upper() for pattern in patterns]
+  matched_patterns = set()
+  moves: List[Dict[str, Any]] = []
+  conflicts: List[Dict[str, Any]] = []
+  claimed: set[str] = set()
+  for path, folder, prefix, number, status in rows:
+    names = [Path(path).stem.upper()]
+    if prefix:
+      names.append(issue_id(prefix, number))
+      names.append(f"{prefix}-{number}")
+    hits = [pattern for pattern in wanted if any(fnmatch.fnmatchcase(name, pattern) for name in names)]
+    if not hits:
+      continue
+    matched_patterns.update(hits)
+    if folder == to_folder and status == FOLDER_STATUS[to_folder]:
+      continue
+    move = {
+      "src": path,
+      "dst": f"{target_dir}/{Path(path).name}",
+      "status_from": status,
+      "status_to": FOLDER_STATUS[to_folder],
+    }
+    if move["dst"] in claimed or (move["dst"] != path and os.path.lexists(index.project_root / move["dst"])):
+      conflicts.append(move)
+    else:
+      claimed.add(move["dst"])
+      moves.append(move)
+  return moves, [pattern for pattern in patterns if pattern.upper() not in matched_patterns], conflicts
+
+
+def _move_one(project_root: Path, src_rel: str, dst_rel: str, status: Optional[str]) -> None:
+  """Move one issue, rewriting its status; never replaces a different file at ``dst``."""
+  src = project_root / src_rel
+  dst = project_root / dst_rel
+  dst.parent.mkdir(parents=True, exist_ok=True)
+  rewrite_status(src, dst, status, overwrite=src == dst)
+  if src != dst:
+    src.unlink()
+
+
+def _is_moved_copy(src: Path, dst: Path, status: Optional[str]) -> bool:
+  """Whether ``dst`` is ``src`` rewritten with ``status``: a move interrupted before its unlink."""
+  probe = dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}.check")
+  try:
+    rewrite_status(src, probe, status)
+    return filecmp.cmp(probe, dst, shallow=False)
+  finally:
+    if probe.exists():
+      probe.unlink()
+
+
+def _journal_append(journal: Any, record: Dict[str, Any]) -> None:
+  journal.write(json.dumps(record, sort_keys=True) + "\n")
+  journal.flush()
+  os.fsync(journal.fileno())
+
+
+def read_journal(journal_path: Path) -> tuple[Dict[str, Any], List[Dict[str, Any]], set[str]]:
+  """Return (batch header, planned moves, sources already done) from a journal."""
+  header: Dict[str, Any] = {}
+  moves: List[Dict[str, Any]] = []
+  done: set[str] = set()
+  with journal_path.open("r", encoding="utf-8") as f:
+    for line in f:
+      try:
+        record = json.loads(line)
+      except ValueError:
+        # A torn final line from a crash mid-append.
+        continue
+      if "batch" in record:
+        header = record
+      elif "done" in record:
+        done.add(record["done"])
+      elif "src" in record:
+        moves.append(record)
+  return header, moves, done
+
+
+def run_moves(project_root: Path, journal_path: Path, moves: List[Dict[str, Any]], batch: Dict[str, Any]) -> Dict[str, Any]:
+  """Journal the planned batch, then move each issue; the journal is removed on success."""
+  journal_path.parent.mkdir(parents=True, exist_ok=True)
+  with journal_path.open("w", encoding="utf-8") as journal:
+    _journal_append(journal, dict(batch, count=len(moves)))
+    for move in moves:
+      # Rollback only deletes destinations this batch created.
+      _journal_append(journal, dict(move, dst_existed=os.path.lexists(project_root / move["dst"])))
+  return resume_moves(project_root, journal_path)
+
+
+def resume_moves(project_root: Path, journal_path: Path) -> Dict[str, Any]:
+  """Finish every journaled move not yet marked done."""
+  header, moves, done = read_journal(journal_path)
+  moved: List[Dict[str, Any]] = []
+  with journal_path.open("a", encoding="utf-8") as journal:
+    for move in moves:
+      if move["src"] in done:
+        continue
+      src = project_root / move["src"]
+      dst = project_root / move["dst"]
+      if src.exists():
+        if src != dst and not move.get("dst_existed") and dst.exists() and _is_moved_copy(src, dst, move["status_to"]):
+          # Interrupted between writing the destination and removing the source.
+          src.unlink()
+        else:
+          _move_one(project_root, move["src"], move["dst"], move["status_to"])
+      elif not dst.exists():
+        raise FileNotFoundError(f"Journaled issue missing at both {move['src']} and {move['dst']}")
+      _journal_append(journal, {"done": move["src"]})
+      moved.append(move)
+  journal_path.unlink()
+  return {"batch": header.get("batch"), "moved": moved, "previously_done": len(done)}
+
+
+def rollback_moves(project_root: Path, journal_path: Path) -> Dict[str, Any]:
+  """Undo a journaled batch: move issues back and restore their original status."""
+  header, moves, _ = read_journal(journal_path)
+  restored: List[Dict[str, Any]] = []
+  for move in reversed(moves):
+    src = project_root / move["src"]
+    dst = project_root / move["dst"]
+    if src == dst:
+      _move_one(project_root, move["dst"], move["src"], move["status_from"])
+    elif dst.exists():
+      if not src.exists():
+        _move_one(project_root, move["dst"], move["src"], move["status_from"])
+      elif not move.get("dst_existed") and _is_moved_copy(src, dst, move["status_to"]):
+        # Interrupted between writing the destination and removing the source.
+        dst.unlink()
+      else:
+        # The move never ran; dst belongs to someone else.
+        continue
+    else:
+      continue
+    restored.append(move)
+  journal_path.unlink()
+  return {"batch": header.get("batch"), "restored": restored}
@@ -0,0 +1,570 @@
+"""
+Token-budgeted context packs for the context skill's Full mode.
+
+install_team.py's ``context`` subcommand infers a work type from the request
+text, picks the ADRs, patterns and memory notes relevant to it and writes a
+pack of their summaries into the team ``context_store`` that fits a token
+budget (estimated at ``CHARS_PER_TOKEN`` characters per token).
+
+Everything expensive is done once and cached in SQLite:
+
+- the work-type, pattern and ADR indexes are compiled into one lookup table,
+  recompiled only when one of the index files changes;
+- each source document is summarized once per content hash (a file whose
+  size and mtime are unchanged is not even re-read);
+- an assembled pack is stored with the stat of every file and folder it was
+  built from, so a repeated load for the same work type, budget and topic is
+  served without touching the sources again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+CHARS_PER_TOKEN = 4
+DEFAULT_BUDGET = 2000
+DEFAULT_WORK_TYPE = "new-feature"
+# Per-kind summary size and count caps, from the context skill's token budget.
+SUMMARY_TOKENS = {"adr": 150, "pattern": 300, "memory": 150}
+KIND_LIMITS = {"adr": 3, "pattern": 4, "memory": 3}
+INDEX_FILES = ("work-type-index.md", "pattern-index.md", "adr-index.md")
+
+_SCHEMA_VERSION = 2
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS sources (
+  path TEXT PRIMARY KEY,
+  size INTEGER NOT NULL,
+  mtime_ns INTEGER NOT NULL,
+  sha1 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS summaries (
+  sha1 TEXT NOT NULL,
+  kind TEXT NOT NULL,
+  title TEXT,
+  summary TEXT NOT NULL,
+  tokens INTEGER NOT NULL,
+  full_tokens INTEGER NOT NULL,
+  PRIMARY KEY (sha1, kind)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS packs (key TEXT PRIMARY KEY, deps TEXT NOT NULL, payload TEXT NOT NULL);
+"""
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9_-]*")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_DEFAULT_LINE = re.compile(r"no keywords match:\s*`([^`]+)`", re.IGNORECASE)
+_QUICK_REF = re.compile(r"^###\s+.*\((?P<id>[A-Z]+-\d+)\)\s*$")
+_WIKI_LINK = re.compile(r"\[\[([^\[\]\n]+?)\]\]")
+_STOPWORDS = frozenset(
+  "the and for with from into this that these those are was were will should would could have has had "
+  "not but all any our your their its can may need needs use using add new make get set via per "
+  "when then than also just like want please".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+  return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def query_terms(text: str) -> List[str]:
+  """Sorted distinct lowercase words of ``text`` worth matching (no stopwords or short words)."""
+  return sorted({token for token in _TOKEN.findall(text.lower()) if len(token) > 2 and token not in _STOPWORDS})
+
+
+def _split_ids(value: str) -> List[str]:
+  return [item.strip() for item in value.split(",") if item.strip() and item.strip() not in ("—", "-")]
+
+
+def _stat_key(path: Path) -> Optional[List[int]]:
+  try:
+    stat = path.stat()
+  except OSError:
+    return None
+  return [stat.st_size, stat.st_mtime_ns]
+
+
+# -- index compilation ----------------------------------------------------------
+
+
+def _parse_work_types(text: str) -> Dict[str, Any]:
+  work_types: Dict[str, Dict[str, Any]] = {}
+  keywords: Dict[str, List[str]] = {}
+  default = DEFAULT_WORK_TYPE
+  in_yaml = False
+  current: Optional[str] = None
+  for line in text.splitlines():
+    stripped = line.strip()
+    if _FENCE.match(line):
+      in_yaml = not in_yaml and "yaml" in stripped
+      current = None
+      continue
+    if in_yaml:
+      if stripped.endswith(":") and not line.startswith((" ", "\t")):
+        current = stripped[:-1]
+        keywords[current] = []
+      elif current and stripped.startswith("- "):
+        keywords[current].append(stripped[2:].strip().strip("\"'").lower())
+      continue
+    if stripped.startswith("|") and not stripped.startswith("|--"):
+      cells = [cell.strip() for cell in stripped.strip("|").split("|")]
+      if len(cells) >= 4 and cells[0] and cells[0].lower() != "type":
+        work_types[cells[0]] = {"adrs": _split_ids(cells[1]), "patterns": _split_ids(cells[2]), "precheck": cells[3]}
+      continue
+    match = _DEFAULT_LINE.search(line)
+    if match:
+      default = match.group(1)
+  return {"work_types": work_types, "keywords": keywords, "default": default}
+
+
+def _pipe_rows(text: str, sections: Iterable[str], fields: int) -> Iterable[Tuple[str, List[str]]]:
+  wanted = set(sections)
+  section = ""
+  for line in text.splitlines():
+    if line.startswith("## "):
+      section = line[3:].strip()
+      continue
+    if section in wanted and line.count("|") == fields - 1 and not line.startswith(("<!--", "|")):
+      yield section, [cell.strip() for cell in line.split("|")]
+
+
+def _parse_patterns(text: str) -> Dict[str, Any]:
+  patterns: Dict[str, Any] = {}
+  for section, cells in _pipe_rows(text, ("Active Patterns", "Draft Patterns", "Promoted Patterns"), 5):
+    pattern_id, work_types, parent_adr, status, summary = cells
+    patterns[pattern_id] = {
+      "work_types": _split_ids(work_types),
+      "adr": parent_adr,
+      "status": status or section.split()[0].lower(),
+      "summary": summary,
+    }
+  return patterns
+
+
+def _parse_adrs(text: str) -> Dict[str, Any]:
+  adrs: Dict[str, Any] = {}
+  for _, cells in _pipe_rows(text, ("Index",), 5):
+    adr_id, domain, decision, keywords, patterns = cells
+    adrs[adr_id] = {
+      "domain": domain,
+      "decision": decision,
+      "keywords": [keyword.lower() for keyword in _split_ids(keywords)],
+      "patterns": patterns,
+      "quick_reference": [],
+    }
+  current: Optional[str] = None
+  for line in text.splitlines():
+    match = _QUICK_REF.match(line)
+    if match:
+      current = match.group("id") if match.group("id") in adrs else None
+    elif line.startswith("#"):
+      current = None
+    elif current and line.strip().startswith("- "):
+      adrs[current]["quick_reference"].append(line.strip()[2:])
+  return adrs
+
+
+def compile_indexes(indexes_root: Path) -> Dict[str, Any]:
+  """Compile the three index files under ``indexes_root`` into one lookup table."""
+  texts = {}
+  for name in INDEX_FILES:
+    try:
+      texts[name] = (indexes_root / name).read_text(encoding="utf-8")
+    except OSError:
+      texts[name] = ""
+  lookup = _parse_work_types(texts["work-type-index.md"])
+  lookup["patterns"] = _parse_patterns(texts["pattern-index.md"])
+  lookup["adrs"] = _parse_adrs(texts["adr-index.md"])
+  return lookup
+
+
+def infer_work_type(lookup: Dict[str, Any], text: str) -> Tuple[str, List[str]]:
+  """Work type whose keywords match ``text`` most often (or a work type named in it); falls back to the index default."""
+  lowered = text.lower()
+  for work_type in lookup["work_types"]:
+    if re.search(rf"(?<![\w-]){re.escape(work_type)}(?![\w-])", lowered):
+      return work_type, [work_type]
+  best, best_hits, best_weight = lookup["default"], [], 0
+  for work_type, phrases in lookup["keywords"].items():
+    hits = [phrase for phrase in phrases if re.search(rf"(?<!\w){re.escape(phrase)}(?!\w)", lowered)]
+    # Multi-word phrases ("create endpoint") are stronger evidence than single words ("role").
+    weight = sum(len(phrase.split()) for phrase in hits)
+    if weight > best_weight:
+      best, best_hits, best_weight = work_type, hits, weight
+  return best, best_hits
+
+
+# -- summaries ------------------------------------------------------------------
+
+
+def _strip_frontmatter(text: str) -> Tuple[Dict[str, str], str]:
+  if not text.startswith("---\n"):
+    return {}, text
+  end = text.find("\n---", 4)
+  if end == -1:
+    return {}, text
+  meta = {}
+  for line in text[4:end].splitlines():
+    key, sep, value = line.partition(":")
+    if sep:
+      meta[key.strip()] = value.strip()
+  return meta, text[end + 4:]
+
+
+def _delink(text: str) -> str:
+  # Packs are generated copies: a [[link]] left in them would show up as a
+  # broken or duplicate edge in the vault graph, so keep only its text.
+  return _WIKI_LINK.sub(lambda match: match.group(1).split("|", 1)[-1].strip(), text)
+
+
+def summarize(text: str, max_tokens: int, prefer: Tuple[str, ...] = ()) -> Tuple[Optional[str], str]:
+  """Title and a compact summary of a Markdown document: lead text plus the first lines of each section.
+
+  Code blocks, tables, comments and ``Backlink(s):`` lines are skipped and
+  ``[[wiki links]]`` are reduced to their text. When a section named in
+  ``prefer`` exists (e.g. an ADR's ``Decision``), only those sections are
+  summarized.
+  """
+  meta, body = _strip_frontmatter(text)
+  title = None
+  sections: List[Tuple[str, List[str]]] = [("", [])]
+  in_fence = False
+  for line in body.splitlines():
+    if _FENCE.match(line):
+      in_fence = not in_fence
+      continue
+    stripped = line.strip()
+    if in_fence or not stripped or stripped.startswith(("|", "<!--", "---", "Backlink")):
+      continue
+    if title is None and stripped.startswith("# "):
+      title = stripped[2:].strip()
+    elif stripped.startswith("#"):
+      sections.append((_delink(stripped.lstrip("#").strip()), []))
+    else:
+      sections[-1][1].append(_delink(stripped))
+  title = title or meta.get("name") or meta.get("title")
+  title = _delink(title) if title else None
+  chosen = [section for section in sections if section[0].lower() in prefer] or sections
+  out: List[str] = []
+  for heading, lines in chosen:
+    if not lines:
+      continue
+    if not heading:
+      out.extend(lines[:3])
+    elif lines[0][:1] in "-*+" or lines[0][:1].isdigit():
+      out.extend([f"**{heading}:**"] + lines[:3])
+    else:
+      out.extend([f"**{heading}:** {lines[0]}"] + lines[1:3])
+  limit = max_tokens * CHARS_PER_TOKEN
+  summary = ""
+  for line in out:
+    if len(summary) + len(line) + 1 > limit:
+      summary = summary or line[: limit - 1] + "…"
+      break
+    summary = f"{summary}\n{line}" if summary else line
+  return title, summary
+
+
+# -- ranking and assembly ---------------------------------------------------------
+
+
+def _overlap(terms: Iterable[str], text: str) -> int:
+  lowered = text.lower()
+  return sum(1 for term in terms if term in lowered)
+
+
+def rank_candidates(
+  lookup: Dict[str, Any],
+  work_type: str,
+  terms: List[str],
+  pattern_files: Dict[str, Path],
+  adr_files: Dict[str, Path],
+  memory_hits: List[str]
+) -> List[Dict[str, Any]]:
+  """Score ADRs, patterns and memory notes for ``work_type`` and the request ``terms`` (highest first).
+
+  Entries listed for the work type in the work-type index rank first (in index
+  order), then patterns tagged with the work type, ADRs whose keywords match
+  the request and memory notes in full-text rank order; request words found in
+  an entry's index line add to its score.
+  """
+  entry = lookup["work_types"].get(work_type, {"adrs": [], "patterns": []})
+  candidates: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+  def add(kind: str, item_id: str, score: float, path: Optional[Path]) -> None:
+    key = (kind, item_id)
+    if key not in candidates or candidates[key]["score"] < score:
+      candidates[key] = {"kind": kind, "id": item_id, "score": score, "path": path}
+
+  for position, adr_id in enumerate(entry["adrs"]):
+    add("adr", adr_id, 90 - position, adr_files.get(adr_id))
+  for adr_id, adr in lookup["adrs"].items():
+    hits = _overlap(terms, " ".join(adr["keywords"] + [adr["domain"], adr["decision"]]))
+    if hits:
+      add("adr", adr_id, 40 + 5 * hits, adr_files.get(adr_id))
+  for position, pattern_id in enumerate(entry["patterns"]):
+    add("pattern", pattern_id, 100 - position, pattern_files.get(pattern_id))
+  for pattern_id, pattern in lookup["patterns"].items():
+    if work_type in pattern["work_types"]:
+      add("pattern", pattern_id, 70, pattern_files.get(pattern_id))
+  for pattern_id, path in pattern_files.items():
+    hits = _overlap(terms, pattern_id)
+    if hits and pattern_id not in lookup["patterns"]:
+      add("pattern", pattern_id, 30 + 5 * hits, path)
+  for position, rel in enumerate(memory_hits):
+    add("memory", rel, 60 - 5 * position, None)
+
+  for candidate in candidates.values():
+    if candidate["kind"] == "adr" and candidate["id"] in lookup["adrs"]:
+      adr = lookup["adrs"][candidate["id"]]
+      candidate["score"] += 2 * _overlap(terms, " ".join(adr["keywords"]))
+    elif candidate["kind"] == "pattern" and candidate["id"] in lookup["patterns"]:
+      candidate["score"] += 2 * _overlap(terms, lookup["patterns"][candidate["id"]]["summary"])
+  return sorted(candidates.values(), key=lambda item: (-item["score"], item["kind"], item["id"]))
+
+
+class ContextPacker:
+  def __init__(self, db_path: str, project_root: Path) -> None:
+    """Open (or create) the cache at ``db_path`` (``":memory:"`` for a throwaway cache)."""
+    self.project_root = project_root
+    if db_path != ":memory:":
+      Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    self.db = sqlite3.connect(db_path)
+    version = self.db.execute("PRAGMA user_version").fetchone()[0]
+    if version != _SCHEMA_VERSION:
+      self.db.executescript(
+        "DROP TABLE IF EXISTS meta; DROP TABLE IF EXISTS sources; DROP TABLE IF EXISTS summaries; DROP TABLE IF EXISTS packs;"
+      )
+      self.db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    self.db.executescript(_SCHEMA)
+    self.stats = {"summarized": 0, "summary_hits": 0}
+
+  def close(self) -> None:
+    self.db.close()
+
+  def __enter__(self) -> "ContextPacker":
+    return self
+
+  def __exit__(self, *exc: Any) -> None:
+    self.close()
+
+  def relative(self, path: Path) -> str:
+    try:
+      return path.relative_to(self.project_root).as_posix()
+    except ValueError:
+      return str(path)
+
+  def lookup(self, indexes_root: Path) -> Dict[str, Any]:
+    """Compiled index lookup table, recompiled only when an index file changed."""
+    signature = json.dumps([str(indexes_root)] + [_stat_key(indexes_root / name) for name in INDEX_FILES])
+    row = self.db.execute("SELECT value FROM meta WHERE key = 'lookup'").fetchone()
+    if row:
+      cached = json.loads(row[0])
+      if cached.get("signature") == signature:
+        return cached["lookup"]
+    lookup = compile_indexes(indexes_root)
+    with self.db:
+      self.db.execute(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES ('lookup', ?)",
+        (json.dumps({"signature": signature, "lookup": lookup}),),
+      )
+    return lookup
+
+  def summary(self, path: Path, kind: str, prefer: Tuple[str, ...] = ()) -> Optional[Dict[str, Any]]:
+    """Cached summary of ``path`` (``{title, summary, tokens, full_tokens}``), or None if unreadable."""
+    rel = self.relative(path)
+    stat = _stat_key(path)
+    if stat is None:
+      return None
+    row = self.db.execute("SELECT size, mtime_ns, sha1 FROM sources WHERE path = ?", (rel,)).fetchone()
+    raw: Optional[bytes] = None
+    if row and [row[0], row[1]] == stat:
+      digest = row[2]
+    else:
+      try:
+        raw = path.read_bytes()
+      except OSError:
+        return None
+      digest = hashlib.sha1(raw).hexdigest()
+      with self.db:
+        self.db.execute("INSERT OR REPLACE INTO sources (path, size, mtime_ns, sha1) VALUES (?, ?, ?, ?)", (rel, *stat, digest))
+    cached = self.db.execute(
+      "SELECT title, summary, tokens, full_tokens FROM summaries WHERE sha1 = ? AND kind = ?", (digest, kind)
+    ).fetchone()
+    if cached:
+      self.stats["summary_hits"] += 1
+      return dict(zip(("title", "summary", "tokens", "full_tokens"), cached))
+    if raw is None:
+      try:
+        raw = path.read_bytes()
+      except OSError:
+        return None
+    text = raw.decode("utf-8", errors="replace")
+    title, summary = summarize(text, SUMMARY_TOKENS.get(kind, 150), prefer)
+    result = {"title": title, "summary": summary, "tokens": estimate_tokens(summary), "full_tokens": estimate_tokens(text)}
+    with self.db:
+      self.db.execute(
+        "INSERT OR REPLACE INTO summaries (sha1, kind, title, summary, tokens, full_tokens) VALUES (?, ?, ?, ?, ?, ?)",
+        (digest, kind, title, summary, result["tokens"], result["full_tokens"]),
+      )
+    self.stats["summarized"] += 1
+    return result
+
+  def cached_pack(self, key: str) -> Optional[Dict[str, Any]]:
+    """Stored pack for ``key`` if none of the files and folders it was built from changed."""
+    row = self.db.execute("SELECT deps, payload FROM packs WHERE key = ?", (key,)).fetchone()
+    if not row:
+      return None
+    for path, stat in json.loads(row[0]):
+      if _stat_key(Path(path)) != stat:
+        return None
+    return json.loads(row[1])
+
+  def store_pack(self, key: str, payload: Dict[str, Any], deps: Iterable[Path]) -> None:
+    recorded = [[str(path), _stat_key(path)] for path in sorted(set(deps))]
+    with self.db:
+      self.db.execute(
+        "INSERT OR REPLACE INTO packs (key, deps, payload) VALUES (?, ?, ?)",
+        (key, json.dumps(recorded), json.dumps(payload)),
+      )
+
+
+def pack_key(team_id: str, work_type: str, budget: int, terms: List[str]) -> str:
+  return f"{team_id}|{work_type}|{budget}|{' '.join(terms)}"
+
+
+def _adr_fallback(adr_id: str, adr: Dict[str, Any]) -> Dict[str, Any]:
+  lines = [f"{adr['domain']}: {adr['decision']}"] + adr["quick_reference"]
+  summary = "\n".join(lines)
+  return {"title": f"{adr['domain']}: {adr['decision']}", "summary": summary, "tokens": estimate_tokens(summary), "full_tokens": 0}
+
+
+_SECTIONS = (("adr", "ADRs"), ("pattern", "Patterns"), ("memory", "Memory"))
+_FOOTER_TOKENS = 20
+
+
+def _render_item(kind: str, item_id: str, info: Dict[str, Any], source: Optional[str]) -> str:
+  label = item_id if kind != "memory" else (info["title"] or Path(item_id).stem)
+  suffix = f" (`{source}`)" if source else ""
+  return f"### {_delink(label)}{suffix}\n{_delink(info['summary'])}"
+
+
+def assemble_pack(
+  packer: ContextPacker,
+  lookup: Dict[str, Any],
+  work_type: str,
+  matched: List[str],
+  candidates: List[Dict[str, Any]],
+  budget: int,
+  team_id: str
+) -> Dict[str, Any]:
+  """Greedily add candidate summaries in rank order while the pack stays within ``budget`` tokens.
+
+  Each candidate is charged for its rendered block, its section heading when
+  it is the first of its kind and its checklist line, so the estimate of the
+  finished pack never exceeds the budget.
+  """
+  entry = lookup["work_types"].get(work_type, {})
+  precheck = entry.get("precheck", "")
+  header = [f"# Context pack: {work_type}", "", f"- Team: {team_id}"]
+  header.append(f"- Work type: {work_type}" + (f" (matched: {', '.join(matched)})" if matched else ""))
+  checklist = []
+  if precheck:
+    header.append(f"- Pre-check: {precheck}")
+    checklist.append(f"- [ ] {precheck}")
+  used = estimate_tokens("\n".join(header)) + estimate_tokens("\n".join(["", "## Checklist"] + checklist)) + _FOOTER_TOKENS
+  blocks: Dict[str, List[str]] = {kind: [] for kind, _ in _SECTIONS}
+  selected: List[Dict[str, Any]] = []
+  skipped = 0
+  for candidate in candidates:
+    kind = candidate["kind"]
+    if len(blocks[kind]) >= KIND_LIMITS[kind]:
+      continue
+    path = candidate["path"]
+    if kind == "memory":
+      path = packer.project_root / candidate["id"]
+    info = packer.summary(path, kind, ("decision",) if kind == "adr" else ()) if path else None
+    if info is None and kind == "adr" and candidate["id"] in lookup["adrs"]:
+      info = _adr_fallback(candidate["id"], lookup["adrs"][candidate["id"]])
+    if info is None and kind == "pattern" and candidate["id"] in lookup["patterns"]:
+      summary = lookup["patterns"][candidate["id"]]["summary"]
+      info = {"title": candidate["id"], "summary": summary, "tokens": estimate_tokens(summary), "full_tokens": 0}
+    if info is None or not info["summary"]:
+      continue
+    source = packer.relative(path) if path else None
+    block = _render_item(kind, candidate["id"], info, source)
+    check = ""
+    if kind == "pattern" and candidate["id"] in lookup["patterns"]:
+      check = f"- [ ] {candidate['id']}: {_delink(lookup['patterns'][candidate['id']]['summary'])}"
+    cost = estimate_tokens(f"\n\n{block}") + (estimate_tokens(f"\n{check}") if check else 0)
+    if not blocks[kind]:
+      cost += estimate_tokens(f"\n\n## {dict(_SECTIONS)[kind]}")
+    if used + cost > budget:
+      skipped += 1
+      continue
+    used += cost
+    blocks[kind].append(block)
+    if check:
+      checklist.append(check)
+    selected.append({
+      "kind": kind,
+      "id": candidate["id"],
+      "score": candidate["score"],
+      "title": info["title"],
+      "tokens": info["tokens"],
+      "full_tokens": info["full_tokens"],
+      "source": source,
+    })
+
+  body = list(header)
+  for kind, heading in _SECTIONS:
+    if blocks[kind]:
+      body += ["", f"## {heading}"]
+      for block in blocks[kind]:
+        body += ["", block]
+  if checklist:
+    body += ["", "## Checklist"] + checklist
+  text = "\n".join(body)
+  tokens = estimate_tokens(text)
+  text += f"\n\n<!-- ~{tokens} of {budget} tokens; {len(selected)} source(s), {skipped} skipped for budget -->\n"
+  return {
+    "team": team_id,
+    "work_type": work_type,
+    "matched": matched,
+    "budget": budget,
+    "tokens": tokens,
+    "items": selected,
+    "skipped_for_budget": skipped,
+    "markdown": text,
+  }
+
+
+def source_files(directories: Iterable[Path], pattern: str = "*.md") -> Dict[str, Path]:
+  """Map file stem -> path for ``pattern`` files in ``directories`` (earlier directories win)."""
+  found: Dict[str, Path] = {}
+  for directory in directories:
+    try:
+      entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+    except OSError:
+      continue
+    for entry in entries:
+      if entry.is_file() and Path(entry.name).match(pattern):
+        found.setdefault(Path(entry.name).stem, Path(entry.path))
+  return found
+
+
+def adr_files(decisions_root: Path, adr_ids: Iterable[str]) -> Dict[str, Path]:
+  """Map ADR id -> ``ADR-<id>*.md`` (or ``<id>*.md``) file in ``decisions_root``."""
+  files = source_files([decisions_root])
+  found: Dict[str, Path] = {}
+  for adr_id in adr_ids:
+    for stem, path in files.items():
+      if stem == adr_id or stem.startswith((f"ADR-{adr_id}", f"{adr_id}-", f"{adr_id}_")):
+        found[adr_id] = path
+        break
+  return found
@@ -0,0 +1,1623 @@
+"""
+Installer engine behind install_team.py.
+
+install_team.py only imports ``main`` from here: a script run as ``__main__``
+is recompiled on every invocation, while imported modules load from cached
+bytecode. This module holds profile loading, team detection, the staged
+install pipeline and the top-level CLI; the other subcommands live in
+subcommands.py. action_plan, object_store and subcommands are imported only on
+the code paths that use them, so --list-teams and --detect-team stay fast.
+"""
+
+from __future__ import annotations
+
+import time
+
+_PROCESS_STARTED = time.perf_counter()
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+# typing is only needed by type checkers (annotations are not evaluated), and
+# importing it costs several milliseconds on every run.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+  from typing import Any, Dict, List, Optional
+
+  from action_plan import ActionPlan, TreeState
+  from object_store import ObjectStore
+
+# Heavy or rarely needed modules (yaml, shutil, hashlib, zlib, datetime,
+# concurrent.futures, action_plan, object_store) are imported on first use so
+# that --list-teams and --detect-team stay fast. _IMPORT_TIMINGS feeds
+# --startup-profile.
+_IMPORT_TIMINGS: Dict[str, float] = {}
+_MISSING = object()
+_yaml_module: Any = _MISSING
+
+
+def _lazy_import(name: str) -> Any:
+  if name in sys.modules:
+    # Not sys.modules[name]: import_module waits for a module that another
+    # worker thread is still initializing instead of returning it half-built.
+    return importlib.import_module(name)
+  started = time.perf_counter()
+  with _TRACER.span(f"import:{name}", "imports"):
+    module = importlib.import_module(name)
+  _IMPORT_TIMINGS[name] = time.perf_counter() - started
+  return module
+
+
+def _import_yaml() -> Any:
+  global _yaml_module
+  if _yaml_module is _MISSING:
+    try:
+      _yaml_module = _lazy_import("yaml")
+    except Exception:  # pragma: no cover - optional dependency
+      _yaml_module = None
+  return _yaml_module
+
+
+class _Span:
+  """Timed region; nested spans are subtracted from their parent's self time."""
+
+  def __init__(self, tracer: "_Tracer", name: str, phase: str, args: Dict[str, Any]) -> None:
+    self.tracer = tracer
+    self.name = name
+    self.phase = phase
+    self.args = args
+    self.files = 0
+    self.bytes = 0
+    self.child_seconds = 0.0
+    self.started = 0.0
+
+  def add(self, files: int = 0, bytes: int = 0) -> None:
+    self.files += files
+    self.bytes += bytes
+
+  def __enter__(self) -> "_Span":
+    self.tracer._stack().append(self)
+    self.started = time.perf_counter()
+    return self
+
+  def __exit__(self, *exc: Any) -> None:
+    duration = time.perf_counter() - self.started
+    stack = self.tracer._stack()
+    stack.pop()
+    if stack:
+      stack[-1].child_seconds += duration
+    self.tracer._record(self, duration)
+
+
+class _Tracer:
+  """Per-phase timing totals plus optional Chrome trace-event capture.
+
+  Phase totals use self time, so nested helpers (e.g. YAML parsing inside
+  team detection) are not counted twice. Totals are kept process-wide and
+  per install thread (see ``begin_install``) for the manifest summary.
+  """
+
+  def __init__(self) -> None:
+    self.capture_events = False
+    self.events: List[Dict[str, Any]] = []
+    self.phases: Dict[str, Dict[str, float]] = {}
+    self._lock = threading.Lock()
+    self._local = threading.local()
+
+  def _stack(self) -> List[_Span]:
+    stack = getattr(self._local, "stack", None)
+    if stack is None:
+      stack = self._local.stack = []
+    return stack
+
+  def span(self, name: str, phase: str, **args: Any) -> _Span:
+    return _Span(self, name, phase, args)
+
+  def begin_install(self) -> Dict[str, Dict[str, float]]:
+    self._local.install_phases = {}
+    return self._local.install_phases
+
+  def _record(self, span: _Span, duration: float) -> None:
+    self_seconds = max(duration - span.child_seconds, 0.0)
+    targets = [self.phases]
+    install_phases = getattr(self._local, "install_phases", None)
+    if install_phases is not None:
+      targets.append(install_phases)
+    with self._lock:
+      for phases in targets:
+        totals = phases.setdefault(span.phase, {"seconds": 0.0, "files": 0, "bytes": 0, "calls": 0})
+        totals["seconds"] += self_seconds
+        totals["files"] += span.files
+        totals["bytes"] += span.bytes
+        totals["calls"] += 1
+      if self.capture_events:
+        args = dict(span.args)
+        if span.files or span.bytes:
+          args.update({"files": span.files, "bytes": span.bytes})
+        self.events.append({
+          "name": span.name,
+          "cat": span.phase,
+          "ph": "X",
+          "ts": (span.started - _PROCESS_STARTED) * 1_000_000,
+          "dur": duration * 1_000_000,
+          "pid": os.getpid(),
+          "tid": threading.get_ident(),
+          "args": args,
+        })
+
+  def write_trace(self, path: Path) -> None:
+    payload = {"traceEvents": sorted(self.events, key=lambda event: event["ts"]), "displayTimeUnit": "ms"}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+_TRACER = _Tracer()
+
+
+def _traced(phase: str) -> Any:
+  """Decorator wrapping a helper in a tracer span named after the function."""
+  def decorate(func: Any) -> Any:
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+      with _TRACER.span(func.__name__.lstrip("_"), phase):
+        return func(*args, **kwargs)
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+  return decorate
+
+
+def _phase_summary(phases: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+  return {
+    name: {
+      "ms": round(totals["seconds"] * 1000, 2),
+      "files": int(totals["files"]),
+      "bytes": int(totals["bytes"]),
+    }
+    for name, totals in phases.items()
+  }
+
+
+def _print_timings(total_seconds: float) -> None:
+  print("Timings (self time per phase):", file=sys.stderr)
+  print(f"  {'phase':18} {'ms':>9} {'calls':>6} {'files':>7} {'bytes':>10}", file=sys.stderr)
+  for name, totals in sorted(_TRACER.phases.items(), key=lambda item: -item[1]["seconds"]):
+    print(
+      f"  {name:18} {totals['seconds'] * 1000:9.2f} {int(totals['calls']):6d} "
+      f"{int(totals['files']):7d} {int(totals['bytes']):10d}",
+      file=sys.stderr,
+    )
+  print(f"  {'total (wall)':18} {total_seconds * 1000:9.2f}", file=sys.stderr)
+
+
+INSTALLER_VERSION = "1.1.1"
+
+# object_store.LINK_MODES, repeated so that building the parser needs no import.
+_LINK_MODES = ("copy", "hardlink", "symlink", "reflink")
+
+# Depth bound for the scandir walk of an existing install target.
+_TARGET_SCAN_DEPTH = 32
+
+# Serializes writes to vault files shared by every team (ai_team_config/index.md,
+# shared memory index, TEAM_CONFIG_CONTRACT.md) when teams install concurrently.
+# _vault_lock adds a file lock so separate installer processes queue as well.
+_SHARED_VAULT_LOCK = threading.Lock()
+
+
+@_traced("profiles")
+def _load_profiles(profiles_path: Path) -> Dict[str, Any]:
+  if not profiles_path.exists():
+    raise FileNotFoundError(f"Missing team profiles: {profiles_path}")
+  with profiles_path.open("r", encoding="utf-8") as f:
+    return json.load(f)
+
+
+def _default_target(pack_name: str) -> Path:
+  codex_home = os.environ.get("CODEX_HOME")
+  if codex_home:
+    return Path(codex_home).expanduser() / "skills" / pack_name
+  return Path.home() / ".codex" / "skills" / pack_name
+
+
+def _print_teams(profiles: Dict[str, Any]) -> None:
+  teams = profiles.get("teams", {})
+  if not teams:
+    print("No teams found in profiles.")
+    return
+  print("Available teams:")
+  for team_id in sorted(teams.keys()):
+    team = teams[team_id]
+    name = team.get("name", team_id)
+    alias = team.get("alias", "-")
+    prefix = team.get("issue_prefix", "-")
+    print(f"  - {team_id:16} name={name}, alias={alias}, issue_prefix={prefix}")
+
+
+# In-process YAML cache keyed by (path, mtime_ns, size), plus an optional
+# on-disk JSON sidecar cache shared across installer runs.
+_YAML_CACHE: Dict[tuple[str, int, int], Dict[str, Any]] = {}
+_YAML_CACHE_LOCK = threading.Lock()
+_YAML_STATS = {"parsed": 0, "memory_hits": 0, "disk_hits": 0}
+_yaml_disk_cache_dir: Optional[Path] = None
+_yaml_disk_cache_read_only = False
+
+
+def _configure_yaml_cache(cache_dir: Optional[Path], read_only: bool = False) -> None:
+  """Use ``cache_dir`` for JSON sidecars; ``read_only`` (dry runs) reads them but never writes."""
+  global _yaml_disk_cache_dir, _yaml_disk_cache_read_only
+  _yaml_disk_cache_dir = cache_dir
+  _yaml_disk_cache_read_only = read_only
+
+
+def _yaml_sidecar_path(path: Path) -> Optional[Path]:
+  if _yaml_disk_cache_dir is None:
+    return None
+  # crc32 keeps hashlib/OpenSSL off the --detect-team path; a collision only
+  # costs a cache miss because the sidecar records and checks its source path.
+  encoded = str(path).encode("utf-8")
+  key = f"{_lazy_import('zlib').crc32(encoded):08x}{len(encoded):04x}"
+  return _yaml_disk_cache_dir / f"{key}.json"
+
+
+def _read_yaml_sidecar(path: Path, mtime_ns: int, size: int) -> Optional[Dict[str, Any]]:
+  sidecar = _yaml_sidecar_path(path)
+  if sidecar is None or not sidecar.exists():
+    return None
+  try:
+    cached = json.loads(sidecar.read_text(encoding="utf-8"))
+  except (OSError, ValueError):
+    return None
+  if (
+    not isinstance(cached, dict)
+    or cached.get("path") != str(path)
+    or cached.get("mtime_ns") != mtime_ns
+    or cached.get("size") != size
+    or not isinstance(cached.get("data"), dict)
+  ):
+    return None
+  return cached["data"]
+
+
+def _write_yaml_sidecar(path: Path, mtime_ns: int, size: int, payload: Dict[str, Any]) -> None:
+  sidecar = _yaml_sidecar_path(path)
+  if sidecar is None or _yaml_disk_cache_read_only:
+    return
+  try:
+    # Only lossless JSON round-trips are cached (no dates, sets, ...).
+    body = json.dumps({"path": str(path), "mtime_ns": mtime_ns, "size": size, "data": payload})
+  except (TypeError, ValueError):
+    return
+  try:
+    sidecar.parent.mkdir(parents=True, exist_ok=True)
+    tmp = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(body, encoding="utf-8")
+    os.replace(tmp, sidecar)
+  except OSError:
+    pass
+
+
+def _load_yaml(path: Path) -> Dict[str, Any]:
+  """Load a YAML mapping, memoized by (path, mtime, size).
+
+  Returned mappings are shared between callers and must be treated as
+  read-only. Uses libyaml's CSafeLoader when available.
+  """
+  try:
+    stat = path.stat()
+  except OSError:
+    return {}
+  key = (str(path), stat.st_mtime_ns, stat.st_size)
+  with _YAML_CACHE_LOCK:
+    cached = _YAML_CACHE.get(key)
+    if cached is not None:
+      _YAML_STATS["memory_hits"] += 1
+      return cached
+
+  payload = _read_yaml_sidecar(path, stat.st_mtime_ns, stat.st_size)
+  if payload is not None:
+    stat_name = "disk_hits"
+  else:
+    yaml = _import_yaml()
+    if yaml is None:
+      return {}
+    stat_name = "parsed"
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with _TRACER.span("yaml_parse", "yaml", path=str(path)) as span:
+      with path.open("r", encoding="utf-8") as f:
+        loaded = yaml.load(f, Loader=loader) or {}
+      span.add(files=1, bytes=stat.st_size)
+    payload = loaded if isinstance(loaded, dict) else {}
+    _write_yaml_sidecar(path, stat.st_mtime_ns, stat.st_size, payload)
+
+  with _YAML_CACHE_LOCK:
+    _YAML_STATS[stat_name] += 1
+    _YAML_CACHE[key] = payload
+  return payload
+
+
+def _normalize_rel_path(path_value: str) -> str:
+  return path_value.strip().strip("/")
+
+
+def _maybe_role_guidance_path(project_root: Path, sub_team_name: str, sub_team_id: str) -> Optional[str]:
+  guidance_root = project_root / "dev_communication" / "shared" / "guidance"
+  if not guidance_root.exists():
+    return None
+  candidates = []
+  if sub_team_name:
+    candidates.append(sub_team_name.upper().replace("-", "_"))
+  if sub_team_id:
+    candidates.append(sub_team_id.upper().replace("-", "_"))
+  for candidate in candidates:
+    rel = f"dev_communication/shared/guidance/{candidate}_ROLE_GUIDANCE.md"
+    if (project_root / rel).exists():
+      return rel
+  return None
+
+
+class Registry:
+  """Indexed view of ``registry.yaml``.
+
+  Built once per loaded file; lookups by team id, repo name, alias and
+  sub-team id are dictionary hits instead of scans over ``active_teams``.
+  """
+
+  def __init__(self, payload: Optional[Dict[str, Any]] = None) -> None:
+    self.entries: List[Dict[str, Any]] = []
+    self.by_id: Dict[str, Dict[str, Any]] = {}
+    self.by_repo: Dict[str, List[str]] = {}
+    self.aliases: Dict[str, str] = {}
+    self.sub_team_owner: Dict[str, str] = {}
+
+    payload = payload or {}
+    active = payload.get("active_teams", [])
+    for item in active if isinstance(active, list) else []:
+      if not isinstance(item, dict):
+        continue
+      team_id = str(item.get("id", "")).strip()
+      if not team_id or team_id in self.by_id:
+        continue
+      entry = {
+        "id": team_id,
+        "name": str(item.get("name", "") or "").strip(),
+        "alias": str(item.get("alias", "") or "").strip(),
+        "repo": str(item.get("repo", "") or "").strip(),
+        "definition": str(item.get("definition", "") or "").strip(),
+      }
+      self.entries.append(entry)
+      self.by_id[team_id] = entry
+      if entry["repo"]:
+        self.by_repo.setdefault(entry["repo"], []).append(team_id)
+      if entry["alias"]:
+        self.aliases.setdefault(entry["alias"], team_id)
+      sub_teams = item.get("sub_teams", [])
+      for sub_team in sub_teams if isinstance(sub_teams, list) else []:
+        if isinstance(sub_team, dict) and str(sub_team.get("id", "")).strip():
+          self.sub_team_owner.setdefault(str(sub_team["id"]).strip(), team_id)
+
+    aliases = payload.get("aliases", {})
+    if isinstance(aliases, dict):
+      for alias, team_id in aliases.items():
+        alias_key = str(alias).strip()
+        target = str(team_id or "").strip()
+        if alias_key and target:
+          self.aliases[alias_key] = target
+
+  @property
+  def team_ids(self) -> List[str]:
+    return [entry["id"] for entry in self.entries]
+
+  def entry(self, team_id: str) -> Optional[Dict[str, Any]]:
+    return self.by_id.get(team_id)
+
+  def teams_for_repo(self, repo_name: str) -> List[str]:
+    return self.by_repo.get(repo_name, [])
+
+  def resolve(self, name: str) -> Optional[str]:
+    """Resolve a team id, alias or sub-team id to a registry team id."""
+    name = name.strip()
+    if name in self.by_id:
+      return name
+    if name in self.aliases:
+      return self.aliases[name]
+    return self.sub_team_owner.get(name)
+
+
+_REGISTRY_CACHE: Dict[tuple[str, int, int], Registry] = {}
+
+
+def _registry_path(project_root: Path) -> Path:
+  return project_root / "dev_communication" / "shared" / "registry.yaml"
+
+
+@_traced("registry")
+def _load_registry(project_root: Path) -> Registry:
+  path = _registry_path(project_root)
+  try:
+    stat = path.stat()
+  except OSError:
+    return Registry()
+  # Keyed by real path so repos sharing one registry (symlinks, a parent
+  # dev_communication) parse it once.
+  key = (os.path.realpath(path), stat.st_mtime_ns, stat.st_size)
+  with _YAML_CACHE_LOCK:
+    cached = _REGISTRY_CACHE.get(key)
+  if cached is not None:
+    return cached
+  registry = Registry(_load_yaml(path))
+  with _YAML_CACHE_LOCK:
+    _REGISTRY_CACHE[key] = registry
+  return registry
+
+
+@_traced("detect")
+def _detect_team_with_source(
+  project_root: Path,
+  teams: Dict[str, Any],
+  registry: Optional[Registry] = None
+) -> tuple[Optional[str], Optional[str]]:
+  """Detect the workspace team and how it was found.
+
+  The source is ``registry``, ``package.json`` or ``directory`` (layout heuristic).
+  """
+  if registry is None:
+    registry = _load_registry(project_root)
+  matches = [team_id for team_id in registry.teams_for_repo(project_root.name) if team_id in teams]
+
+  if len(matches) == 1:
+    return matches[0], "registry"
+  if len(matches) > 1:
+    return None, None
+
+  package_json = project_root / "package.json"
+  if package_json.exists():
+    try:
+      package = json.loads(package_json.read_text(encoding="utf-8"))
+      package_name = str(package.get("name", "")).lower()
+      if ("api" in package_name or "backend" in package_name) and "backend" in teams:
+        return "backend", "package.json"
+      if ("ui" in package_name or "frontend" in package_name) and "frontend" in teams:
+        return "frontend", "package.json"
+    except Exception:
+      pass
+
+  if (project_root / "src" / "routes").exists() and "backend" in teams:
+    return "backend", "directory"
+  if (project_root / "src" / "app").exists() and "frontend" in teams:
+    return "frontend", "directory"
+  return None, None
+
+
+def _detect_team_from_project(
+  project_root: Path,
+  teams: Dict[str, Any],
+  registry: Optional[Registry] = None
+) -> Optional[str]:
+  return _detect_team_with_source(project_root, teams, registry)[0]
+
+
+# Directory names never descended into when scanning for workspaces (hidden
+# directories such as .git and .venv are skipped as well).
+_SCAN_PRUNE_DIRS = frozenset({"node_modules", "__pycache__", "venv", "dist", "build", "target", "vendor"})
+_RECURSIVE_SCAN_DEPTH = 6
+
+
+@_traced("detect")
+def _find_workspaces(root: Path, max_depth: int = _RECURSIVE_SCAN_DEPTH) -> List[tuple[Path, Path]]:
+  """Find repositories under ``root`` with a pruned scandir walk.
+
+  A workspace is a directory holding ``.git`` or ``.codex-workflow``; the walk
+  does not descend below one (except ``root`` itself). Each workspace is paired
+  with the directory whose ``dev_communication/shared/registry.yaml`` applies:
+  its own, or else the nearest one above it within ``root``.
+  """
+  found: List[tuple[Path, Path]] = []
+  stack: List[tuple[str, int, Optional[str]]] = [(str(root), 0, None)]
+  while stack:
+    directory, depth, registry_root = stack.pop()
+    try:
+      with os.scandir(directory) as it:
+        entries = list(it)
+    except OSError:
+      continue
+    names = {entry.name for entry in entries}
+    if "dev_communication" in names and _registry_path(Path(directory)).is_file():
+      registry_root = directory
+    if ".git" in names or ".codex-workflow" in names:
+      found.append((Path(directory), Path(registry_root or directory)))
+      if depth > 0:
+        continue
+    if depth >= max_depth:
+      continue
+    for entry in entries:
+      if entry.name.startswith(".") or entry.name in _SCAN_PRUNE_DIRS:
+        continue
+      if entry.is_dir(follow_symlinks=False):
+        stack.append((entry.path, depth + 1, registry_root))
+  return sorted(found)
+
+
+def _detect_teams_recursive(root: Path, teams: Dict[str, Any], jobs: Optional[int]) -> Dict[str, Dict[str, Optional[str]]]:
+  """Detect the team of every workspace under ``root``: ``{path: {team, source}}``."""
+  workspaces = _find_workspaces(root)
+  if not workspaces:
+    return {}
+  registry_roots = sorted({registry_root for _, registry_root in workspaces})
+  workers = max(1, min(jobs or 8, len(workspaces)))
+  futures = _lazy_import("concurrent.futures")
+  with futures.ThreadPoolExecutor(max_workers=workers) as pool:
+    # Each distinct registry.yaml is parsed once, then shared by its repos.
+    registries = dict(zip(registry_roots, pool.map(_load_registry, registry_roots)))
+
+    def detect(workspace: tuple[Path, Path]) -> tuple[str, Dict[str, Optional[str]]]:
+      team_id, source = _detect_team_with_source(workspace[0], teams, registries[workspace[1]])
+      return str(workspace[0]), {"team": team_id, "source": source}
+
+    return dict(pool.map(detect, workspaces))
+
+
+@_traced("resolve_profile")
+def _resolve_other_team_inbox(
+  project_root: Path,
+  registry: Registry,
+  team_id: str
+) -> Optional[str]:
+  for entry in registry.entries:
+    other_id = entry["id"]
+    if other_id == team_id:
+      continue
+    if entry["definition"]:
+      definition = _load_yaml(project_root / "dev_communication" / entry["definition"])
+      identity = definition.get("identity", {}) if isinstance(definition, dict) else {}
+      inbox = identity.get("inbox") if isinstance(identity, dict) else None
+      if isinstance(inbox, str) and inbox.strip():
+        return f"dev_communication/{_normalize_rel_path(inbox)}"
+    return f"dev_communication/{other_id}/inbox"
+  return None
+
+
+@_traced("resolve_profile")
+def _apply_repo_team_definition(
+  project_root: Path,
+  team_id: str,
+  base_profile: Dict[str, Any],
+  registry: Optional[Registry] = None
+) -> tuple[Dict[str, Any], str]:
+  if registry is None:
+    registry = _load_registry(project_root)
+  team_entry = registry.entry(team_id)
+  if not team_entry:
+    return base_profile, "profiles.json"
+
+  definition_rel = team_entry["definition"]
+  if not definition_rel:
+    return base_profile, "profiles.json"
+  definition = _load_yaml(project_root / "dev_communication" / definition_rel)
+  if not definition:
+    return base_profile, "profiles.json"
+
+  profile = json.loads(json.dumps(base_profile))
+  team_meta = definition.get("team", {}) if isinstance(definition, dict) else {}
+  identity = definition.get("identity", {}) if isinstance(definition, dict) else {}
+
+  if isinstance(team_meta, dict):
+    if team_meta.get("name"):
+      profile["name"] = str(team_meta["name"])
+    if team_meta.get("alias"):
+      profile["alias"] = str(team_meta["alias"])
+  if team_entry["name"]:
+    profile["name"] = team_entry["name"]
+  if team_entry["alias"]:
+    profile["alias"] = team_entry["alias"]
+
+  default_paths = dict(profile.get("default_paths", {}))
+  if isinstance(identity, dict):
+    issue_prefix = identity.get("issue_prefix")
+    inbox = identity.get("inbox")
+    issues = identity.get("issues")
+    status = identity.get("status")
+    if isinstance(issue_prefix, str) and issue_prefix.strip():
+      profile["issue_prefix"] = issue_prefix.strip()
+    if isinstance(inbox, str) and inbox.strip():
+      default_paths["inbox"] = f"dev_communication/{_normalize_rel_path(inbox)}"
+    if isinstance(issues, str) and issues.strip():
+      issues_root = f"dev_communication/{_normalize_rel_path(issues)}"
+      default_paths["issues_queue"] = f"{issues_root}/queue"
+      default_paths["issues_active"] = f"{issues_root}/active"
+      default_paths["issues_completed"] = f"{issues_root}/completed"
+    if isinstance(status, str) and status.strip():
+      default_paths["status"] = f"dev_communication/{_normalize_rel_path(status)}"
+
+  other_team_inbox = _resolve_other_team_inbox(project_root, registry, team_id)
+  if other_team_inbox:
+    default_paths["other_team_inbox"] = other_team_inbox
+  profile["default_paths"] = default_paths
+
+  sub_teams = definition.get("sub_teams")
+  if isinstance(sub_teams, dict) and sub_teams:
+    normalized_sub_teams: Dict[str, Any] = {}
+    for sub_team_id, payload in sub_teams.items():
+      if not isinstance(payload, dict):
+        continue
+      entry = {
+        "name": payload.get("name", sub_team_id),
+        "function": payload.get("function", ""),
+        "issue_prefix": payload.get("issue_prefix", profile.get("issue_prefix", "")),
+      }
+      role_guidance = _maybe_role_guidance_path(
+        project_root,
+        str(payload.get("name", "")),
+        str(sub_team_id)
+      )
+      if role_guidance:
+        entry["role_guidance"] = role_guidance
+      normalized_sub_teams[str(sub_team_id)] = entry
+    if normalized_sub_teams:
+      profile["sub_teams"] = normalized_sub_teams
+
+  return profile, "dev_communication/shared/registry.yaml + team definition"
+
+
+def _file_sha256(path: Path) -> str:
+  digest = _lazy_import("hashlib").sha256()
+  with path.open("rb") as f:
+    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+      digest.update(chunk)
+  return digest.hexdigest()
+
+
+def _new_sync_stats() -> Dict[str, int]:
+  return {"copied": 0, "skipped": 0, "deleted": 0}
+
+
+def _sync_tree(
+  src_root: Path,
+  dst_root: Path,
+  rel_prefix: str,
+  previous_files: Dict[str, Any],
+  files: Dict[str, Any],
+  stats: Dict[str, int],
+  plan: ActionPlan,
+  store: Optional[ObjectStore] = None,
+  link_mode: str = "copy"
+) -> None:
+  """Plan copies of only added/changed files from src_root into dst_root.
+
+  Each synced file is recorded in ``files`` keyed by its path relative to the
+  install target. A file is skipped without hashing when its source size and
+  mtime match the previous manifest entry and the installed copy (from the
+  plan's scanned state) still carries the same size/mtime; otherwise its
+  content hash decides. With a link mode, changed files are placed through
+  ``store`` and installed files are compared by size only, since they share
+  the store object's mtime.
+  """
+  for dirpath, dirnames, filenames in os.walk(src_root):
+    dirnames.sort()
+    rel_dir = os.path.relpath(dirpath, src_root)
+    for filename in sorted(filenames):
+      src = Path(dirpath) / filename
+      rel = filename if rel_dir == "." else f"{rel_dir}/{filename}"
+      rel = f"{rel_prefix}/{rel}".replace(os.sep, "/")
+      dst = dst_root / Path(rel).relative_to(rel_prefix)
+      src_stat = src.stat()
+      previous = previous_files.get(rel)
+      dst_stat = plan.state.file_stat(dst) if previous else None
+      linked = store is not None
+
+      if (
+        previous
+        and dst_stat is not None
+        and previous.get("size") == src_stat.st_size
+        and previous.get("mtime_ns") == src_stat.st_mtime_ns
+        and (dst_stat[0] == src_stat.st_size if linked else dst_stat == (src_stat.st_size, src_stat.st_mtime_ns))
+      ):
+        files[rel] = previous
+        stats["skipped"] += 1
+        continue
+
+      digest = _file_sha256(src)
+      entry = {"sha256": digest, "size": src_stat.st_size, "mtime_ns": src_stat.st_mtime_ns}
+      files[rel] = entry
+      if (
+        previous
+        and dst_stat is not None
+        and previous.get("sha256") == digest
+        and dst_stat[0] == src_stat.st_size
+      ):
+        stats["skipped"] += 1
+        if not linked and dst_stat[1] != src_stat.st_mtime_ns:
+          # Re-align mtimes so the next run can skip this file without hashing.
+          plan.utime(dst, src_stat.st_atime_ns, src_stat.st_mtime_ns)
+        continue
+
+      stats["copied"] += 1
+      if linked:
+        plan.link(src, dst, digest, store, link_mode, size=src_stat.st_size)
+      else:
+        plan.copy(src, dst, size=src_stat.st_size)
+
+
+@_traced("skill_sync")
+def _delete_removed_files(
+  target_root: Path,
+  previous_files: Dict[str, Any],
+  files: Dict[str, Any],
+  stats: Dict[str, int],
+  plan: ActionPlan
+) -> None:
+  for rel in sorted(set(previous_files) - set(files)):
+    path = target_root / rel
+    if not plan.state.exists(path):
+      continue
+    stats["deleted"] += 1
+    plan.delete(path, prune_until=target_root)
+
+
+def _load_install_manifest(target_root: Path) -> Dict[str, Any]:
+  manifest_path = target_root / "install-manifest.json"
+  if not manifest_path.exists():
+    return {}
+  try:
+    payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+  except (OSError, ValueError):
+    return {}
+  return payload if isinstance(payload, dict) else {}
+
+
+def _fingerprint_flags(args: argparse.Namespace, team_id: str, target_root: Path, write_local_config: bool) -> Dict[str, Any]:
+  return {
+    "team": team_id,
+    "target": str(target_root),
+    "pack_name": args.pack_name,
+    "no_repo_profile": bool(args.no_repo_profile),
+    "write_local_config": write_local_config,
+    "link_mode": args.link_mode,
+  }
+
+
+def _fingerprint_inputs(
+  workflow_root: Path,
+  project_root: Path,
+  registry: Registry,
+  enabled_skills: list[str],
+  use_repo_profile: bool
+) -> Dict[str, list[str]]:
+  files = [str(workflow_root / "teams" / "profiles.json")]
+  dirs = [str(workflow_root / "teams")]
+  dirs.extend(str(workflow_root / "skills" / skill) for skill in enabled_skills)
+  if use_repo_profile:
+    files.append(str(_registry_path(project_root)))
+    for entry in registry.entries:
+      if entry["definition"]:
+        files.append(str(project_root / "dev_communication" / entry["definition"]))
+    # Role guidance links depend on which guidance files exist.
+    dirs.append(str(project_root / "dev_communication" / "shared" / "guidance"))
+  return {"files": sorted(set(files)), "dirs": sorted(set(dirs))}
+
+
+@_traced("fingerprint")
+def _compute_fingerprint(flags: Dict[str, Any], inputs: Dict[str, list[str]]) -> str:
+  """Hash installer version, CLI flags, input file contents and input tree stats."""
+  digest = _lazy_import("hashlib").sha256()
+  digest.update(json.dumps({"version": INSTALLER_VERSION, "flags": flags}, sort_keys=True).encode("utf-8"))
+  for file_path in inputs.get("files", []):
+    path = Path(file_path)
+    digest.update(f"\0file:{file_path}\0".encode("utf-8"))
+    digest.update(_file_sha256(path).encode("ascii") if path.is_file() else b"missing")
+  for dir_path in inputs.get("dirs", []):
+    digest.update(f"\0dir:{dir_path}\0".encode("utf-8"))
+    if not os.path.isdir(dir_path):
+      digest.update(b"missing")
+      continue
+    for dirpath, dirnames, filenames in os.walk(dir_path):
+      dirnames.sort()
+      for filename in sorted(filenames):
+        stat = os.stat(os.path.join(dirpath, filename))
+        rel = os.path.relpath(os.path.join(dirpath, filename), dir_path)
+        digest.update(f"{rel}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+  return digest.hexdigest()
+
+
+def _planned_outputs(plan: ActionPlan, build_root: Path, target_root: Path) -> list[str]:
+  """Every path the plan creates outside the target, plus the target's own files.
+
+  Staged paths are mapped to the live target. Synced files are checked through
+  the manifest's ``files`` records instead, so they are not listed twice.
+  """
+  stage_prefix = str(build_root) + os.sep
+  outputs = {path for path in plan.outputs if path != str(build_root) and not path.startswith(stage_prefix)}
+  outputs.update((str(target_root / "config" / "active-team.json"), str(target_root / "TEAM_PROFILE.md")))
+  return sorted(outputs)
+
+
+def _install_is_current(previous_manifest: Dict[str, Any], flags: Dict[str, Any]) -> bool:
+  fingerprint = previous_manifest.get("fingerprint")
+  if not isinstance(fingerprint, dict) or not fingerprint.get("digest"):
+    return False
+  outputs = fingerprint.get("outputs", [])
+  files = previous_manifest.get("files", {})
+  if not isinstance(outputs, list) or not isinstance(files, dict):
+    return False
+  # A deleted vault note, store folder or installed file forces a reinstall.
+  installed = (os.path.join(flags["target"], rel) for rel in files)
+  if not all(os.path.exists(path) for path in (*outputs, *installed)):
+    return False
+  inputs = fingerprint.get("inputs", {})
+  if not isinstance(inputs, dict):
+    return False
+  return _compute_fingerprint(flags, inputs) == fingerprint["digest"]
+
+
+@_traced("skill_sync")
+def _copy_skills(
+  workflow_root: Path,
+  target_root: Path,
+  enabled_skills: list[str],
+  plan: ActionPlan,
+  previous_files: Optional[Dict[str, Any]] = None,
+  files: Optional[Dict[str, Any]] = None,
+  stats: Optional[Dict[str, int]] = None,
+  store: Optional[ObjectStore] = None,
+  link_mode: str = "copy"
+) -> None:
+  previous_files = previous_files if previous_files is not None else {}
+  files = files if files is not None else {}
+  stats = stats if stats is not None else _new_sync_stats()
+  target_skills = target_root / "skills"
+  plan.mkdir(target_skills)
+
+  for skill in enabled_skills:
+    src = workflow_root / "skills" / skill
+    dst = target_skills / skill
+    if not src.exists():
+      raise FileNotFoundError(f"Skill folder not found: {src}")
+    with _TRACER.span(f"copy_skill:{skill}", "skill_sync", skill=skill) as span:
+      synced_before = len(files)
+      _sync_tree(src, dst, f"skills/{skill}", previous_files, files, stats, plan, store, link_mode)
+      span.add(files=len(files) - synced_before)
+
+
+def _copy_team_metadata(
+  workflow_root: Path,
+  target_root: Path,
+  plan: ActionPlan,
+  previous_files: Optional[Dict[str, Any]] = None,
+  files: Optional[Dict[str, Any]] = None,
+  stats: Optional[Dict[str, int]] = None,
+  store: Optional[ObjectStore] = None,
+  link_mode: str = "copy"
+) -> None:
+  files = files if files is not None else {}
+  with _TRACER.span("copy_team_metadata", "skill_sync") as span:
+    synced_before = len(files)
+    _sync_tree(
+      workflow_root / "teams",
+      target_root / "teams",
+      "teams",
+      previous_files if previous_files is not None else {},
+      files,
+      stats if stats is not None else _new_sync_stats(),
+      plan,
+      store,
+      link_mode
+    )
+    span.add(files=len(files) - synced_before)
+
+
+def _json_text(payload: Dict[str, Any]) -> str:
+  return json.dumps(payload, indent=2) + "\n"
+
+
+def _write_json(path: Path, payload: Dict[str, Any], dry_run: bool) -> None:
+  if dry_run:
+    print(f"[dry-run] write {path}")
+    return
+  path.parent.mkdir(parents=True, exist_ok=True)
+  _lazy_import("action_plan").atomic_write_text(path, _json_text(payload))
+
+
+def _team_profile_md(team_id: str, team: Dict[str, Any]) -> str:
+  lines = [
+    f"# Active Team Profile: {team_id}",
+    "",
+    f"- Name: {team.get('name', team_id)}",
+    f"- Alias: {team.get('alias', '-')}",
+    f"- Issue Prefix: {team.get('issue_prefix', '-')}",
+    "",
+    "## Enabled Skills",
+  ]
+  for skill in team.get("enabled_skills", []):
+    lines.append(f"- `{skill}`")
+  lines.append("")
+  lines.append("## Default Paths")
+  for key, value in sorted(team.get("default_paths", {}).items()):
+    lines.append(f"- `{key}`: `{value}`")
+  lines.append("")
+  return "\n".join(lines) + "\n"
+
+
+@_traced("vault")
+def _scan_vault_state(state: TreeState, project_root: Path, team_id: str) -> None:
+  """Gather the vault paths the installer checks with bounded scandir walks."""
+  ai_root = project_root / "ai_team_config"
+  state.scan(ai_root, max_depth=1)
+  state.scan(ai_root / "memory_store", max_depth=1)
+  # team/<store>/index.md and team/skill_store/<skill>/memory_store/index.md
+  state.scan(ai_root / team_id, max_depth=4)
+  state.add_path(project_root / "TEAM_CONFIG_CONTRACT.md")
+
+
+@_traced("vault")
+def _ensure_ai_team_store(
+  project_root: Path,
+  team_id: str,
+  enabled_skills: list[str],
+  plan: ActionPlan
+) -> Dict[str, str]:
+  ai_root = project_root / "ai_team_config"
+  shared_memory_root = ai_root / "memory_store"
+  team_root = ai_root / team_id
+  adr_store = team_root / "adr_store"
+  memory_store = team_root / "memory_store"
+  context_store = team_root / "context_store"
+  skill_store_root = team_root / "skill_store"
+
+  dirs = [ai_root, shared_memory_root, team_root, adr_store, memory_store, context_store, skill_store_root]
+  for directory in dirs:
+    plan.mkdir(directory)
+
+  # Root vault index (shared by all teams)
+  root_index = ai_root / "index.md"
+  root_index_content = (
+    "# AI Team Config Vault\n\n"
+    "This is the shared team-oriented AI storage vault in Obsidian-compatible Markdown.\n\n"
+    "## Shared Stores\n"
+    "- Shared Memory: [[ai_team_config/memory_store/index]]\n\n"
+    "## Team Roots\n"
+    f"- [[ai_team_config/{team_id}/index]]\n\n"
+    "## Notes\n"
+    "- Use wiki links for cross-reference and backlinks.\n"
+    "- Keep skill memory in `skill_store/<skill>/memory_store/`.\n"
+  )
+  shared_memory_index = shared_memory_root / "index.md"
+  plan.write_if_missing(root_index, root_index_content, shared=True)
+  plan.append_line_if_missing(root_index, "- Shared Memory: [[ai_team_config/memory_store/index]]", shared=True)
+  plan.append_line_if_missing(root_index, f"- [[ai_team_config/{team_id}/index]]", shared=True)
+  plan.write_if_missing(
+    shared_memory_index,
+    (
+      "# Shared Memory Store\n\n"
+      "Backlinks: [[ai_team_config/index]] [[TEAM_CONFIG_CONTRACT]]\n\n"
+      "This vault stores shared cross-team memory artifacts in Obsidian-compatible Markdown.\n"
+    ),
+    shared=True
+  )
+
+  # Team index with cross-links
+  team_index = team_root / "index.md"
+  team_index_content = (
+    f"# Team Vault: {team_id}\n\n"
+    f"Backlink: [[ai_team_config/index]]\n\n"
+    "## Core Stores\n"
+    f"- ADR: [[ai_team_config/{team_id}/adr_store/index]]\n"
+    f"- Memory: [[ai_team_config/{team_id}/memory_store/index]]\n"
+    f"- Context: [[ai_team_config/{team_id}/context_store/index]]\n"
+    f"- Skill Store: [[ai_team_config/{team_id}/skill_store/index]]\n"
+  )
+  plan.write_if_missing(team_index, team_index_content)
+
+  adr_index = adr_store / "index.md"
+  plan.write_if_missing(
+    adr_index,
+    (
+      "# ADR Store\n\n"
+      f"Backlinks: [[ai_team_config/{team_id}/index]] [[ai_team_config/index]]\n\n"
+      "Store architecture notes, ADR drafts, and decision snapshots here.\n"
+    )
+  )
+
+  memory_index = memory_store / "index.md"
+  plan.write_if_missing(
+    memory_index,
+    (
+      "# Memory Store\n\n"
+      f"Backlinks: [[ai_team_config/{team_id}/index]] [[ai_team_config/index]]\n\n"
+      "Store long-lived team memory and distilled implementation notes here.\n"
+    )
+  )
+
+  context_index = context_store / "index.md"
+  plan.write_if_missing(
+    context_index,
+    (
+      "# Context Store\n\n"
+      f"Backlinks: [[ai_team_config/{team_id}/index]] [[ai_team_config/index]]\n\n"
+      "Store pre-implementation context packs and topic context notes here.\n"
+    )
+  )
+
+  skill_store_index = skill_store_root / "index.md"
+  skill_store_index_content = (
+    "# Skill Store\n\n"
+    f"Backlinks: [[ai_team_config/{team_id}/index]] [[ai_team_config/index]]\n\n"
+    "## Skill Memory Stores\n"
+  )
+  for skill in enabled_skills:
+    skill_store_index_content += f"- [[ai_team_config/{team_id}/skill_store/{skill}/memory_store/index]]\n"
+  plan.write_if_missing(skill_store_index, skill_store_index_content)
+
+  for skill in enabled_skills:
+    skill_memory_dir = skill_store_root / skill / "memory_store"
+    plan.mkdir(skill_memory_dir)
+
+    skill_memory_index = skill_memory_dir / "index.md"
+    plan.write_if_missing(
+      skill_memory_index,
+      (
+        f"# Skill Memory: {skill}\n\n"
+        f"Backlinks: [[ai_team_config/{team_id}/skill_store/index]] "
+        f"[[ai_team_config/{team_id}/memory_store/index]] [[ai_team_config/{team_id}/index]]\n\n"
+        "Store skill-specific memory notes in this folder.\n"
+      )
+    )
+
+  return {
+    "vault_root": str(ai_root),
+    "shared_memory_root": str(shared_memory_root),
+    "team_root": str(team_root),
+    "adr_store": str(adr_store),
+    "memory_store": str(memory_store),
+    "context_store": str(context_store),
+    "skill_store_root": str(skill_store_root)
+  }
+
+
+def _profile_with_store(team_profile: Dict[str, Any], team_store_paths: Dict[str, str]) -> Dict[str, Any]:
+  """The profile written to active-team.json: default_paths gain the vault store paths."""
+  team_profile_with_store = dict(team_profile)
+  default_paths = dict(team_profile_with_store.get("default_paths", {}))
+  default_paths.update({
+    "memory_root": team_store_paths["shared_memory_root"],
+    "team_vault_root": team_store_paths["team_root"],
+    "adr_store": team_store_paths["adr_store"],
+    "memory_store": team_store_paths["memory_store"],
+    "context_store": team_store_paths["context_store"],
+    "skill_store_root": team_store_paths["skill_store_root"]
+  })
+  team_profile_with_store["default_paths"] = default_paths
+  return team_profile_with_store
+
+
+@_traced("vault")
+def _ensure_team_contract(project_root: Path, plan: ActionPlan) -> None:
+  contract_path = project_root / "TEAM_CONFIG_CONTRACT.md"
+  contract_content = (
+    "# Team Config Contract\n\n"
+    "This file defines how team-scoped AI storage is organized for the project.\n\n"
+    "Required shared vault structure:\n"
+    "- `ai_team_config/memory_store/`\n\n"
+    "Required team vault structure:\n"
+    "- `ai_team_config/<team>/adr_store/`\n"
+    "- `ai_team_config/<team>/memory_store/`\n"
+    "- `ai_team_config/<team>/context_store/`\n"
+    "- `ai_team_config/<team>/skill_store/<skill>/memory_store/`\n\n"
+    "Storage format: Obsidian-compatible Markdown with wiki-links/backlinks.\n"
+  )
+  plan.write_if_missing(contract_path, contract_content, shared=True)
+
+
+def _lock_path(target_root: Path) -> Path:
+  return target_root.parent / f".{target_root.name}.lock"
+
+
+@contextlib.contextmanager
+def _vault_lock(workflow_root: Path, project_root: Path) -> Any:
+  # Kept in the workflow cache: nothing but tracked notes belongs in ai_team_config/.
+  with _SHARED_VAULT_LOCK, _lazy_import("action_plan").file_lock(_workspace_cache_path(workflow_root, project_root, "install", ".vault.lock")):
+    yield
+
+
+def _prepare_stage(target_root: Path, clone_existing: bool) -> Path:
+  """Create a fresh staging directory next to ``target_root``.
+
+  Must be called with the target lock held: leftover stages from interrupted
+  installs are removed first. With ``clone_existing`` the current install is
+  mirrored into the stage with hard links so the incremental sync only has to
+  replace changed files.
+  """
+  shutil = _lazy_import("shutil")
+  parent = target_root.parent
+  for leftover in parent.glob(f".{target_root.name}.stage-*"):
+    shutil.rmtree(leftover, ignore_errors=True)
+  stage = parent / f".{target_root.name}.stage-{os.getpid()}-{threading.get_ident()}"
+  if clone_existing:
+    _lazy_import("action_plan").clone_tree(target_root, stage)
+  else:
+    stage.mkdir(parents=True)
+  return stage
+
+
+def _install_team(
+  workflow_root: Path,
+  project_root: Path,
+  teams: Dict[str, Any],
+  team_id: str,
+  target_root: Path,
+  args: argparse.Namespace,
+  registry: Optional[Registry],
+  write_local_config: bool
+) -> Dict[str, Any]:
+  """Install one team pack, holding the per-target lock unless this is a dry run.
+
+  Concurrent installs into the same target (threads or processes, from any
+  workspace) queue on ``.<target>.lock`` next to the target, which is removed
+  on release; the one that runs second usually finds the install up to date.
+  """
+  started = time.perf_counter()
+  install_phases = _TRACER.begin_install()
+  with contextlib.ExitStack() as stack:
+    if not args.dry_run:
+      with _TRACER.span("wait_target_lock", "lock"):
+        stack.enter_context(_lazy_import("action_plan").file_lock(_lock_path(target_root), remove=True))
+    return _install_team_locked(
+      workflow_root, project_root, teams, team_id, target_root, args, registry, write_local_config,
+      started, install_phases
+    )
+
+
+def _install_team_locked(
+  workflow_root: Path,
+  project_root: Path,
+  teams: Dict[str, Any],
+  team_id: str,
+  target_root: Path,
+  args: argparse.Namespace,
+  registry: Optional[Registry],
+  write_local_config: bool,
+  started: float,
+  install_phases: Dict[str, Dict[str, float]]
+) -> Dict[str, Any]:
+  result: Dict[str, Any] = {"team_id": team_id, "target": str(target_root), "status": "ok", "exit_code": 0}
+  flags = _fingerprint_flags(args, team_id, target_root, write_local_config)
+
+  previous_manifest: Dict[str, Any] = {}
+  if target_root.exists() and not args.full_copy:
+    with _TRACER.span("check_up_to_date", "fingerprint"):
+      previous_manifest = _load_install_manifest(target_root)
+      is_current = _install_is_current(previous_manifest, flags)
+    if is_current:
+      result.update({
+        "status": "up-to-date",
+        "team_profile_source": previous_manifest.get("team_profile_source", "-"),
+        "seconds": time.perf_counter() - started,
+      })
+      return result
+
+  if registry is None:
+    registry = _load_registry(project_root)
+  team_profile = json.loads(json.dumps(teams[team_id]))
+  team_profile_source = "profiles.json"
+  if not args.no_repo_profile:
+    team_profile, team_profile_source = _apply_repo_team_definition(project_root, team_id, team_profile, registry)
+  result["team_profile_source"] = team_profile_source
+
+  previous_files: Dict[str, Any] = {}
+  if target_root.exists():
+    if not args.force:
+      print(
+        f"Target exists: {target_root}\n"
+        "Use --force to replace, or pass --target to install elsewhere.",
+        file=sys.stderr,
+      )
+      result.update({"status": "target-exists", "exit_code": 3})
+      result["seconds"] = time.perf_counter() - started
+      return result
+    previous_files = previous_manifest.get("files") or {}
+    if previous_manifest.get("link_mode", "copy") != args.link_mode:
+      # Installed files were placed differently; rebuild rather than mix modes.
+      previous_files = {}
+    if not isinstance(previous_files, dict) or not previous_files:
+      # No file records to diff against: replace the whole target.
+      previous_files = {}
+      if args.dry_run:
+        print(f"[dry-run] rm -rf {target_root}")
+
+  # Real installs are built in a sibling staging directory and swapped in
+  # whole, so the live target is never half-written.
+  build_root = target_root
+  if not args.dry_run:
+    with _TRACER.span("prepare_stage", "stage"):
+      build_root = _prepare_stage(target_root, clone_existing=bool(previous_files))
+  try:
+    # One bounded scandir walk per tree replaces per-path exists()/stat() calls.
+    action_plan = _lazy_import("action_plan")
+    state = action_plan.TreeState()
+    if previous_files:
+      state.scan(build_root, max_depth=_TARGET_SCAN_DEPTH, with_stats=True)
+    _scan_vault_state(state, project_root, team_id)
+    plan = action_plan.ActionPlan(state)
+    plan.mkdir(build_root)
+
+    store: Optional[ObjectStore] = None
+    if args.link_mode != "copy":
+      store = _lazy_import("object_store").ObjectStore(_object_store_root(args))
+    enabled_skills = team_profile.get("enabled_skills", [])
+    files: Dict[str, Any] = {}
+    sync_stats = _new_sync_stats()
+    _copy_skills(workflow_root, build_root, enabled_skills, plan, previous_files, files, sync_stats, store, args.link_mode)
+    _copy_team_metadata(workflow_root, build_root, plan, previous_files, files, sync_stats, store, args.link_mode)
+    _delete_removed_files(build_root, previous_files, files, sync_stats, plan)
+    result["sync"] = sync_stats
+    _ensure_team_contract(project_root, plan)
+    team_store_paths = _ensure_ai_team_store(project_root, team_id, enabled_skills, plan)
+
+    datetime_module = _lazy_import("datetime")
+    installed_at = datetime_module.datetime.now(datetime_module.timezone.utc).isoformat()
+    team_profile_with_store = _profile_with_store(team_profile, team_store_paths)
+
+    manifest = {
+      "pack_name": args.pack_name,
+      "installed_at": installed_at,
+      "team_id": team_id,
+      "team_profile": team_profile_with_store,
+      "team_profile_source": team_profile_source,
+      "team_store_paths": team_store_paths,
+      "source_workflow_root": str(workflow_root),
+      "project_root": str(project_root),
+      "link_mode": args.link_mode,
+    }
+    if store is not None:
+      manifest["object_store"] = str(store.root)
+
+    plan.write(build_root / "config" / "active-team.json", _json_text(manifest))
+    plan.write(build_root / "TEAM_PROFILE.md", _team_profile_md(team_id, team_profile))
+    if write_local_config:
+      plan.write(workflow_root / "config" / "active-team.json", _json_text(manifest))
+
+    with _TRACER.span("fingerprint_inputs", "fingerprint"):
+      inputs = _fingerprint_inputs(workflow_root, project_root, registry, enabled_skills, not args.no_repo_profile)
+    fingerprint = {
+      "installer_version": INSTALLER_VERSION,
+      "digest": _compute_fingerprint(flags, inputs),
+      "inputs": inputs,
+      "outputs": _planned_outputs(plan, build_root, target_root),
+    }
+
+    if args.plan_json:
+      result["plan"] = plan.to_json()
+    with _TRACER.span("execute_plan", "execute") as span:
+      span.add(files=len(plan.operations), bytes=plan.byte_count())
+      if args.dry_run:
+        plan.print_dry_run()
+      else:
+        if store is not None:
+          # Reserved before any object is linked so a concurrent gc keeps them.
+          store.reserve(target_root, (op["sha256"] for op in plan.operations if op["op"] == "link"))
+        plan.execute(shared_lock=_vault_lock(workflow_root, project_root))
+
+    timings = {
+      "total_ms": round((time.perf_counter() - started) * 1000, 2),
+      "bytes_copied": plan.byte_count(),
+      "phases": _phase_summary(install_phases),
+    }
+    result["timings"] = timings
+    # Written last so an interrupted install never looks up to date.
+    with _TRACER.span("write_manifest", "manifest"):
+      _write_json(
+        build_root / "install-manifest.json",
+        dict(manifest, files=files, fingerprint=fingerprint, timings=timings),
+        args.dry_run
+      )
+    if build_root != target_root:
+      with _TRACER.span("swap_into_place", "stage"):
+        action_plan.swap_into_place(build_root, target_root)
+    if store is not None and not args.dry_run:
+      # Registered after the manifest exists so gc always sees its references.
+      store.register_install(target_root, installed_at)
+  except BaseException:
+    if build_root != target_root:
+      _lazy_import("shutil").rmtree(build_root, ignore_errors=True)
+    raise
+
+  result["seconds"] = time.perf_counter() - started
+  return result
+
+
+def _emit_plan_json(path_value: str, payload: Dict[str, Any]) -> None:
+  body = _json_text(payload)
+  if path_value == "-":
+    sys.stdout.write(body)
+    return
+  path = Path(path_value).expanduser()
+  path.parent.mkdir(parents=True, exist_ok=True)
+  path.write_text(body, encoding="utf-8")
+
+
+def _format_sync_stats(stats: Optional[Dict[str, int]]) -> str:
+  if not stats:
+    return "copied=0 skipped=0 deleted=0"
+  return f"copied={stats['copied']} skipped={stats['skipped']} deleted={stats['deleted']}"
+
+
+def _parse_team_list(value: str) -> List[str]:
+  return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _resolve_team_id(name: str, teams: Dict[str, Any], registry: Registry) -> str:
+  """Map a team id, registry alias/sub-team id or profile alias to a profile team id."""
+  if name in teams:
+    return name
+  resolved = registry.resolve(name)
+  if resolved:
+    return resolved
+  for team_id, team in teams.items():
+    if isinstance(team, dict) and (team.get("alias") == name or name in team.get("sub_teams", {})):
+      return team_id
+  return name
+
+
+def _batch_target(args: argparse.Namespace, team_id: str) -> Path:
+  if args.target:
+    return Path(args.target).expanduser() / team_id
+  return _default_target(f"{args.pack_name}-{team_id}")
+
+
+def _run_batch_install(
+  workflow_root: Path,
+  project_root: Path,
+  profiles: Dict[str, Any],
+  team_ids: List[str],
+  args: argparse.Namespace,
+  registry: Registry
+) -> int:
+  teams = profiles.get("teams", {})
+  unknown = [team_id for team_id in team_ids if team_id not in teams]
+  if unknown:
+    print(f"Unknown team(s): {', '.join(unknown)}", file=sys.stderr)
+    _print_teams(profiles)
+    return 2
+  if not team_ids:
+    print("No teams selected for batch install.", file=sys.stderr)
+    return 2
+
+  # Installs are I/O bound, so the pool is not capped by CPU count.
+  jobs = args.jobs or min(len(team_ids), 8)
+  jobs = max(1, min(jobs, len(team_ids)))
+  started = time.perf_counter()
+
+  def run(team_id: str) -> Dict[str, Any]:
+    try:
+      return _install_team(
+        workflow_root,
+        project_root,
+        teams,
+        team_id,
+        _batch_target(args, team_id),
+        args,
+        registry,
+        write_local_config=False
+      )
+    except Exception as exc:
+      return {
+        "team_id": team_id,
+        "target": str(_batch_target(args, team_id)),
+        "status": f"error: {exc}",
+        "exit_code": 1,
+        "seconds": 0.0,
+      }
+
+  futures = _lazy_import("concurrent.futures")
+  with futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+    results = list(pool.map(run, team_ids))
+  elapsed = time.perf_counter() - started
+  if args.plan_json:
+    _emit_plan_json(args.plan_json, {result["team_id"]: result.get("plan") for result in results})
+
+  print("Batch installation complete." if not args.dry_run else "Batch dry-run complete.")
+  print(f"Teams: {len(results)} (jobs={jobs}, {elapsed:.2f}s wall)")
+  for result in results:
+    source = result.get("team_profile_source", "-")
+    print(
+      f"  - {result['team_id']:16} {result['status']:14} {result.get('seconds', 0.0):6.2f}s "
+      f"{_format_sync_stats(result.get('sync'))} target={result['target']} source={source}"
+    )
+  print("Local config: skipped (batch mode)")
+  return max((result["exit_code"] for result in results), default=0)
+
+
+def _print_startup_profile() -> None:
+  total_ms = (time.perf_counter() - _PROCESS_STARTED) * 1000
+  print("Startup profile:", file=sys.stderr)
+  print(f"  module load to main(): {_MAIN_STARTED_MS:.1f} ms", file=sys.stderr)
+  if _IMPORT_TIMINGS:
+    for name, seconds in sorted(_IMPORT_TIMINGS.items(), key=lambda item: -item[1]):
+      print(f"  lazy import {name}: {seconds * 1000:.1f} ms", file=sys.stderr)
+  else:
+    print("  lazy imports: none", file=sys.stderr)
+  print(f"  total in-process time: {total_ms:.1f} ms", file=sys.stderr)
+
+
+_MAIN_STARTED_MS = 0.0
+
+
+def _add_install_arguments(parser: argparse.ArgumentParser) -> None:
+  parser.add_argument("--target", help="Install destination (default: $CODEX_HOME/skills/codex-workflow or ~/.codex/skills/codex-workflow); with --teams/--all-teams each team installs into <target>/<team>")
+  parser.add_argument("--pack-name", default="codex-workflow", help="Pack name under skills directory (default: codex-workflow; batch mode uses <pack-name>-<team>)")
+  parser.add_argument("--workspace-root", help="Project root (default: parent of .codex-workflow)")
+  parser.add_argument("--force", action="store_true", help="Overwrite existing target directory")
+  parser.add_argument("--full-copy", action="store_true", help="Skip the up-to-date check and, with --force, wipe and recopy the target instead of syncing only changed files")
+  parser.add_argument("--dry-run", action="store_true", help="Print actions without writing files")
+  parser.add_argument("--link-mode", choices=_LINK_MODES, default="copy", help="How skill files are placed: copy (default), or hardlink/symlink/reflink to a shared content-addressed store so identical files are stored once across targets")
+  parser.add_argument("--object-store", metavar="DIR", help="Content-addressed store used by --link-mode (default: $CODEX_HOME/skill-store or ~/.codex/skill-store)")
+  parser.add_argument("--plan-json", metavar="FILE", help="Write the planned filesystem operations as JSON to FILE ('-' for stdout)")
+  parser.add_argument("--no-cache", action="store_true", help="Do not read or write the parsed-YAML cache under .codex-workflow/cache/")
+  parser.add_argument("--no-local-config", action="store_true", help="Do not write .codex-workflow/config/active-team.json")
+  parser.add_argument("--no-repo-profile", action="store_true", help="Use only static profiles.json values and ignore dev_communication team definitions")
+  parser.add_argument("--startup-profile", action="store_true", help="Report module import and startup cost on stderr when the command exits")
+  parser.add_argument("--timings", action="store_true", help="Print a per-phase timing breakdown (ms, files, bytes) on stderr when the command exits")
+  parser.add_argument("--trace", metavar="FILE", help="Write Chrome trace-event JSON (viewable in Perfetto) with a span per installer helper")
+
+
+def _finish_tracing(args: argparse.Namespace) -> None:
+  if args.timings:
+    _print_timings(time.perf_counter() - _PROCESS_STARTED)
+  if args.trace:
+    _TRACER.write_trace(Path(args.trace).expanduser())
+
+
+def _load_cli_context(args: argparse.Namespace) -> tuple[Path, Path, Dict[str, Any]]:
+  if args.startup_profile:
+    _lazy_import("atexit").register(_print_startup_profile)
+  if args.timings or args.trace:
+    _TRACER.capture_events = bool(args.trace)
+    _lazy_import("atexit").register(_finish_tracing, args)
+  workflow_root = Path(__file__).resolve().parents[1]
+  project_root = Path(args.workspace_root).resolve() if args.workspace_root else workflow_root.parent
+  if not args.no_cache:
+    _configure_yaml_cache(workflow_root / "cache" / "yaml", read_only=getattr(args, "dry_run", False))
+  profiles = _load_profiles(workflow_root / "teams" / "profiles.json")
+  return workflow_root, project_root, profiles
+
+
+def _object_store_root(args: argparse.Namespace) -> Path:
+  return Path(args.object_store).expanduser() if args.object_store else _lazy_import("object_store").default_store_root()
+
+
+def _target_root(args: argparse.Namespace) -> Path:
+  return Path(args.target).expanduser() if args.target else _default_target(args.pack_name)
+
+
+def _print_install_result(
+  args: argparse.Namespace,
+  workflow_root: Path,
+  target_root: Path,
+  result: Dict[str, Any]
+) -> None:
+  if result["status"] == "up-to-date":
+    print(f"Up to date: {target_root} (team {result['team_id']}); nothing to do.")
+    return
+  print("Installation complete." if not args.dry_run else "Dry-run complete.")
+  print(f"Team: {result['team_id']}")
+  print(f"Team profile source: {result['team_profile_source']}")
+  print(f"Target: {target_root}")
+  print(f"Files: {_format_sync_stats(result.get('sync'))}")
+  if args.link_mode != "copy":
+    print(f"Link mode: {args.link_mode} (store: {_object_store_root(args)})")
+  if args.no_local_config:
+    print("Local config: skipped (--no-local-config)")
+  else:
+    print(f"Local config: {workflow_root / 'config' / 'active-team.json'}")
+
+
+def _workspace_cache_path(workflow_root: Path, project_root: Path, kind: str, suffix: str) -> Path:
+  encoded = str(project_root).encode("utf-8")
+  return workflow_root / "cache" / kind / f"{project_root.name}-{_lazy_import('zlib').crc32(encoded):08x}{suffix}"
+
+
+# Runners live in subcommands.py as _run_<name>.
+_SUBCOMMANDS = ("setup", "gc", "comms", "vault", "context", "log", "adr", "watch", "export", "archive", "reflect")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+  global _MAIN_STARTED_MS
+  _MAIN_STARTED_MS = (time.perf_counter() - _PROCESS_STARTED) * 1000
+  argv = sys.argv[1:] if argv is None else argv
+  if argv and argv[0] in _SUBCOMMANDS:
+    return getattr(_lazy_import("subcommands"), f"_run_{argv[0]}")(argv[1:])
+
+  parser = argparse.ArgumentParser(
+    description="Install Codex workflow with team-specific profile",
+    epilog="Subcommands: setup (detect + install in one process; see 'setup --help'), gc (prune the --link-mode object store; see 'gc --help'), comms (indexed inbox/issue queries; see 'comms --help'), vault (indexed vault search; see 'vault --help'), context (token-budgeted context packs; see 'context --help'), log (deduplicated, rotating vault log appends; see 'log --help'), adr (indexed ADR/gap queries; see 'adr --help'), watch (keep profile and indexes hot, answer socket queries; see 'watch --help'), export (JSONL activity events since a cursor; see 'export --help'), archive (packed archive of old issues and threads; see 'archive --help'), reflect (match changes against active patterns; see 'reflect --help')"
+  )
+  parser.add_argument("--team", help="Team id, e.g. backend, frontend, data-warehousing")
+  parser.add_argument("--teams", help="Comma-separated team ids to install in one run, e.g. backend,frontend")
+  parser.add_argument("--all-teams", action="store_true", help="Install every team in registry.yaml active_teams (or every profile when no registry exists)")
+  parser.add_argument("--jobs", type=int, help="Worker threads for --teams/--all-teams or --detect-team --recursive (default: up to 8)")
+  parser.add_argument("--auto-team", action="store_true", help="Auto-detect team from repository definitions when --team is omitted")
+  parser.add_argument("--detect-team", action="store_true", help="Print detected team id for this workspace and exit")
+  parser.add_argument("--recursive", metavar="ROOT", help="With --detect-team, scan ROOT for repositories (.git/.codex-workflow) and print a JSON map of repo path -> {team, source}")
+  parser.add_argument("--list-teams", action="store_true", help="List available team ids")
+  _add_install_arguments(parser)
+  args = parser.parse_args(argv)
+
+  workflow_root, project_root, profiles = _load_cli_context(args)
+  teams = profiles.get("teams", {})
+
+  if args.list_teams:
+    _print_teams(profiles)
+    return 0
+
+  if args.recursive:
+    if not args.detect_team:
+      parser.error("--recursive requires --detect-team")
+    detected = _detect_teams_recursive(Path(args.recursive).expanduser().resolve(), teams, args.jobs)
+    print(json.dumps(detected, indent=2, sort_keys=True))
+    return 0 if any(item["team"] for item in detected.values()) else 1
+
+  # The registry is parsed lazily so explicit --team reruns can hit the
+  # up-to-date fingerprint check without touching YAML.
+  registry: Optional[Registry] = None
+  detected_team: Optional[str] = None
+  if args.detect_team or (args.auto_team and not args.team):
+    registry = _load_registry(project_root)
+    detected_team = _detect_team_from_project(project_root, teams, registry)
+  if args.detect_team:
+    if detected_team:
+      print(detected_team)
+      return 0
+    return 1
+
+  if args.teams or args.all_teams:
+    if args.team:
+      parser.error("--team cannot be combined with --teams/--all-teams")
+    if registry is None:
+      registry = _load_registry(project_root)
+    if args.all_teams:
+      team_ids = [team_id for team_id in registry.team_ids if team_id in teams] or sorted(teams.keys())
+    else:
+      team_ids = list(dict.fromkeys(
+        _resolve_team_id(name, teams, registry) for name in _parse_team_list(args.teams)
+      ))
+    return _run_batch_install(workflow_root, project_root, profiles, team_ids, args, registry)
+
+  if not args.team:
+    if args.auto_team and detected_team:
+      args.team = detected_team
+      print(f"Auto-detected team: {args.team}")
+    else:
+      parser.error("--team is required unless --list-teams is used (or pass --auto-team)")
+
+  if args.team not in teams:
+    if registry is None:
+      registry = _load_registry(project_root)
+    resolved_team = _resolve_team_id(args.team, teams, registry)
+    if resolved_team != args.team and resolved_team in teams:
+      print(f"Resolved team alias: {args.team} -> {resolved_team}")
+      args.team = resolved_team
+
+  if args.team not in teams:
+    print(f"Unknown team: {args.team}", file=sys.stderr)
+    _print_teams(profiles)
+    return 2
+
+  target_root = _target_root(args)
+  result = _install_team(
+    workflow_root,
+    project_root,
+    teams,
+    args.team,
+    target_root,
+    args,
+    registry,
+    write_local_config=not args.no_local_config
+  )
+  if result["exit_code"]:
+    return result["exit_code"]
+  if args.plan_json and "plan" in result:
+    _emit_plan_json(args.plan_json, result["plan"])
+  _print_install_result(args, workflow_root, target_root, result)
+  return 0
@@ -0,0 +1,200 @@
+"""
+Content-addressed object store for installed skill files.
+
+Objects live under ``<codex_home>/skill-store/objects/<sha256[:2]>/<sha256>`` and are
+shared by every install that uses a link mode (hardlink, symlink, reflink), so
+identical skill files are stored once per machine. ``installs.json`` in the
+store records the install targets that reference it; garbage collection keeps
+only objects referenced by those targets' ``install-manifest.json`` files.
+
+An install reserves the digests it is about to link before materializing any
+of them, so a concurrent gc cannot delete objects that are in flight before the
+install's manifest exists. Reservations left by a crashed install expire after
+``RESERVATION_TTL`` seconds.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from action_plan import file_lock
+
+LINK_MODES = ("copy", "hardlink", "symlink", "reflink")
+
+# Linux FICLONE ioctl (_IOW(0x94, 9, int)) used for reflink copies.
+_FICLONE = 0x40049409
+_REGISTRY_LOCK = threading.Lock()
+RESERVATION_TTL = 24 * 3600
+
+
+def _tmp_sibling(path: Path) -> Path:
+  return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _reflink(src: Path, dst: Path) -> None:
+  import fcntl
+  import shutil
+
+  with src.open("rb") as src_file, dst.open("wb") as dst_file:
+    fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
+  shutil.copystat(src, dst)
+
+
+class ObjectStore:
+  def __init__(self, root: Path) -> None:
+    self.root = root
+    self.objects_root = root / "objects"
+    self.installs_path = root / "installs.json"
+    self.lock_path = root / ".installs.lock"
+
+  def object_path(self, digest: str) -> Path:
+    return self.objects_root / digest[:2] / digest
+
+  def put(self, src: Path, digest: str) -> Path:
+    """Store ``src`` under ``digest`` unless already present; return the object path."""
+    obj = self.object_path(digest)
+    if obj.exists():
+      return obj
+    import shutil
+
+    obj.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _tmp_sibling(obj)
+    shutil.copy2(src, tmp)
+    # Objects are shared through hard links and symlinks: keep them read-only.
+    os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    os.replace(tmp, obj)
+    return obj
+
+  def materialize(self, src: Path, digest: str, dst: Path, mode: str) -> str:
+    """Place the content of ``src`` at ``dst`` using ``mode``.
+
+    Returns the mode actually used: hardlink and reflink fall back to a plain
+    copy when the target filesystem does not support them.
+    """
+    import shutil
+
+    obj = self.put(src, digest)
+    tmp = _tmp_sibling(dst)
+    used = mode
+    try:
+      if mode == "hardlink":
+        os.link(obj, tmp)
+      elif mode == "symlink":
+        os.symlink(obj, tmp)
+      elif mode == "reflink":
+        _reflink(obj, tmp)
+      else:
+        shutil.copy2(obj, tmp)
+    except OSError:
+      if mode == "symlink":
+        raise
+      if tmp.exists() or tmp.is_symlink():
+        tmp.unlink()
+      shutil.copy2(obj, tmp)
+      os.chmod(tmp, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
+      used = "copy"
+    os.replace(tmp, dst)
+    return used
+
+  # -- install registry and garbage collection --------------------------------
+
+  def _read_installs(self) -> Dict[str, Any]:
+    try:
+      payload = json.loads(self.installs_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+      return {}
+    return payload if isinstance(payload, dict) else {}
+
+  def _write_installs(self, installs: Dict[str, Any]) -> None:
+    self.root.mkdir(parents=True, exist_ok=True)
+    tmp = _tmp_sibling(self.installs_path)
+    tmp.write_text(json.dumps(installs, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, self.installs_path)
+
+  def register_install(self, target_root: Path, installed_at: str) -> None:
+    with _REGISTRY_LOCK, file_lock(self.lock_path):
+      installs = self._read_installs()
+      installs[str(target_root)] = {"installed_at": installed_at}
+      self._write_installs(installs)
+
+  def reserve(self, target_root: Path, digests: Iterable[str]) -> None:
+    """Protect ``digests`` from gc until ``register_install`` records ``target_root``."""
+    with _REGISTRY_LOCK, file_lock(self.lock_path):
+      installs = self._read_installs()
+      entry = installs.get(str(target_root))
+      entry = dict(entry) if isinstance(entry, dict) else {}
+      entry.update(pending=sorted(set(digests)), reserved_at=time.time())
+      installs[str(target_root)] = entry
+      self._write_installs(installs)
+
+  def referenced_digests(self, extra_manifests: Iterable[Path] = ()) -> tuple[set[str], List[str]]:
+    """Digests referenced by registered installs and live reservations; also returns live targets."""
+    digests: set[str] = set()
+    live_targets: List[str] = []
+    installs = self._read_installs()
+    now = time.time()
+    for target, entry in installs.items():
+      if not isinstance(entry, dict) or not isinstance(entry.get("pending"), list):
+        continue
+      reserved_at = entry.get("reserved_at")
+      if isinstance(reserved_at, (int, float)) and now - reserved_at < RESERVATION_TTL:
+        live_targets.append(target)
+        digests.update(str(digest) for digest in entry["pending"])
+    manifests = [(Path(target) / "install-manifest.json", False) for target in installs]
+    manifests.extend((Path(path), True) for path in extra_manifests)
+    for manifest_path, explicit in manifests:
+      try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+      except (OSError, ValueError):
+        continue
+      files = manifest.get("files") if isinstance(manifest, dict) else None
+      if not isinstance(files, dict):
+        continue
+      # A registered target reinstalled with --link-mode copy no longer uses the store.
+      if not explicit and manifest.get("link_mode", "copy") == "copy":
+        continue
+      live_targets.append(str(manifest_path.parent))
+      for entry in files.values():
+        if isinstance(entry, dict) and entry.get("sha256"):
+          digests.add(str(entry["sha256"]))
+    return digests, live_targets
+
+  def gc(self, extra_manifests: Iterable[Path] = (), dry_run: bool = False) -> Dict[str, int]:
+    """Delete objects no registered ``install-manifest.json`` references."""
+    with _REGISTRY_LOCK, file_lock(self.lock_path):
+      referenced, live_targets = self.referenced_digests(extra_manifests)
+      installs = self._read_installs()
+      stale = [target for target in installs if target not in live_targets]
+      result = {"kept": 0, "removed": 0, "bytes_freed": 0, "stale_installs": len(stale)}
+      if self.objects_root.exists():
+        for bucket in sorted(self.objects_root.iterdir()):
+          if not bucket.is_dir():
+            continue
+          for obj in sorted(bucket.iterdir()):
+            if obj.name in referenced or obj.name.endswith(".tmp"):
+              result["kept"] += 1
+              continue
+            result["removed"] += 1
+            result["bytes_freed"] += obj.stat().st_size
+            if not dry_run:
+              obj.unlink()
+          if not dry_run and not any(bucket.iterdir()):
+            bucket.rmdir()
+      if stale and not dry_run:
+        for target in stale:
+          installs.pop(target, None)
+        self._write_installs(installs)
+    return result
+
+
+def default_store_root(codex_home: Optional[Path] = None) -> Path:
+  if codex_home is None:
+    env_home = os.environ.get("CODEX_HOME")
+    codex_home = Path(env_home).expanduser() if env_home else Path.home() / ".codex"
+  return codex_home / "skill-store"
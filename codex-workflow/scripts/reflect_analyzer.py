@@ -0,0 +1,683 @@
+"""
+Match working-tree changes against the active patterns for the reflect skill.
+
+install_team.py's ``reflect`` subcommand answers the skill's "patterns
+followed", "new pattern candidates" and "ADR gaps" questions without reading
+every pattern by hand:
+
+- each pattern document (``patterns/active/*.md``) is compiled once into a
+  signature: file globs (from its file trees, paths and ``paths:`` front
+  matter), identifiers it imports, calls or instantiates, member-call shapes
+  such as ``router.get`` and the modules it imports. Signatures are cached in
+  SQLite and recompiled only when a pattern's size or mtime changes;
+- ``stream_changes`` reads ``git diff`` line by line (plus untracked files)
+  and yields one changed file at a time with its added lines;
+- changed files are scored in batches on a process pool, started only once
+  the diff is larger than one batch. A file's features are extracted once and
+  matched against every signature with set lookups; signals shared by many
+  patterns weigh less than distinctive ones;
+- changed files that follow no pattern are grouped by location and suffix
+  (``src/jobs/*.job.ts``); groups of new files with shared signals become
+  pattern candidates.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import json
+import math
+import os
+import re
+import sqlite3
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_THRESHOLD = 0.3
+DEFAULT_MIN_FILES = 2
+BATCH_FILES = 32
+# Added text kept per file; enough for any hand-written source file.
+MAX_FILE_BYTES = 256 * 1024
+TOP_SIGNALS = 10
+# Workflow state, not code: never scored.
+SKIP_PREFIXES = (".codex-workflow/", ".claude-workflow/", "ai_team_config/", "dev_communication/", "node_modules/")
+SKIP_SUFFIXES = (".md", ".txt", ".lock", ".map", ".svg", ".png", ".jpg", ".gif", ".ico")
+
+_SCHEMA_VERSION = 1
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+  path TEXT PRIMARY KEY,
+  size INTEGER NOT NULL,
+  mtime_ns INTEGER NOT NULL,
+  signature TEXT NOT NULL
+);
+"""
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_PLACEHOLDER = re.compile(r"[\w$]*\{[A-Za-z_][\w-]*\}[\w$]*")
+_IDENT = re.compile(r"[A-Za-z_$][\w$]*")
+# One pass over a changed file: every identifier, plus the method when it is a member call.
+_TOKEN = re.compile(r"([A-Za-z_$][\w$]*)(?:\s*\.\s*([A-Za-z_$][\w$]*)\s*(?:<[^<>()\n]*>)?\()?")
+# Calls, allowing TypeScript type arguments: ``mongoose.model<IUser>(``.
+_CALL = re.compile(r"(?<![\w$.])([A-Za-z_$][\w$]*)\s*(?:<[^<>()\n]*>)?\(")
+_MEMBER_CALL = re.compile(r"(?<![\w$.])([A-Za-z_$][\w$]*)\s*\.\s*([A-Za-z_$][\w$]*)\s*(?:<[^<>()\n]*>)?\(")
+_NEW = re.compile(r"\bnew\s+([A-Za-z_$][\w$]*)")
+_MODULE = re.compile(r"""(?:from|import|require\s*\()\s*['"]([^'"\n]+)['"]""")
+_PY_IMPORT = re.compile(r"^\s*(?:from\s+([\w.]+)\s+import|import\s+([\w.]+))", re.MULTILINE)
+_PATH = re.compile(r"(?<![\w@/.{}*-])((?:[\w{}*-][\w.{}*-]*/)+[\w.{}*-]*\.[A-Za-z]{1,5})(?![\w/])")
+_TREE_BRANCH = re.compile(r"[├└]──\s*([^\s#]+)")
+
+_KEYWORDS = frozenset(
+  "if else for while do switch case break continue return function const let var new this class extends "
+  "implements interface type enum import export from default as async await yield try catch finally throw "
+  "typeof instanceof in of void delete true false null undefined string number boolean any unknown never "
+  "object symbol def self cls none and or not is lambda pass with elif raise except global nonlocal print "
+  "super constructor get set static public private protected readonly declare module require".split()
+)
+# Names every file uses; they say nothing about which pattern a file follows.
+_GENERIC = frozenset(
+  "req res next err error data result id name value key item items i j k x y e fn cb callback options "
+  "config args params body query status message console log length push map filter then resolve reject "
+  "Promise Object Array JSON Math Date String Number Boolean Error process module exports".split()
+)
+_GENERIC_RECEIVERS = frozenset("console JSON Object Array Math Promise process Date String Number Boolean Reflect this self".split())
+
+
+def _specific_receiver(name: str) -> bool:
+  return name not in _GENERIC_RECEIVERS and name not in _KEYWORDS and name not in _GENERIC
+
+
+def _strip_frontmatter(text: str) -> Tuple[Dict[str, str], str]:
+  if not text.startswith("---\n"):
+    return {}, text
+  end = text.find("\n---", 4)
+  if end == -1:
+    return {}, text
+  meta = {}
+  for line in text[4:end].splitlines():
+    key, sep, value = line.partition(":")
+    if sep:
+      meta[key.strip()] = value.strip()
+  return meta, text[end + 4:]
+
+
+def _split_list(value: Optional[str]) -> List[str]:
+  return [item.strip().strip("'\"") for item in (value or "").strip("[]").split(",") if item.strip().strip("'\"")]
+
+
+def _glob(path: str) -> str:
+  glob = re.sub(r"\{[^}/]*\}", "*", path.strip().strip("`'\""))
+  while glob.startswith("./"):
+    glob = glob[2:]
+  return re.sub(r"\*+", "*", glob)
+
+
+def _module_key(module: str) -> str:
+  module = re.sub(r"\{[^}/]*\}", "*", module.strip())
+  while module.startswith(("@/", "~/", "./", "../")):
+    module = module[module.index("/") + 1:]
+  return module
+
+
+def _tree_paths(lines: List[str]) -> List[str]:
+  """Files and leaf folders of a ``├──`` file-tree listing, with its root prefix."""
+  root = ""
+  stack: List[str] = []
+  found: List[str] = []
+  for line in lines:
+    branch = _TREE_BRANCH.search(line)
+    if branch is None:
+      stripped = line.split("#", 1)[0].strip()
+      if not stack and stripped.endswith("/") and " " not in stripped:
+        root = stripped
+      continue
+    depth = branch.start() // 4
+    stack[depth:] = [branch.group(1)]
+    if depth and found and found[-1] == root + "".join(stack[:depth]) + "*":
+      found.pop()  # the parent folder has listed children, so it is not a leaf
+    name = branch.group(1)
+    found.append(root + "".join(stack[:depth]) + (name + "*" if name.endswith("/") else name))
+  return [path for path in found if "/" in path]
+
+
+def compile_signature(text: str, name: str) -> Dict[str, Any]:
+  """Signature of a pattern document: ``{name, parent_adr, work_types, globs, identifiers, calls, modules}``."""
+  meta, body = _strip_frontmatter(text)
+  code: List[str] = []
+  block: List[str] = []
+  globs = [_glob(path) for path in _split_list(meta.get("paths"))]
+  in_fence = False
+  for line in body.splitlines():
+    if _FENCE.match(line):
+      if in_fence:
+        tree = _tree_paths(block)
+        if tree:
+          globs.extend(_glob(path) for path in tree)
+        else:
+          code.extend(block)
+        block = []
+      in_fence = not in_fence
+      continue
+    if in_fence:
+      block.append(line)
+    else:
+      globs.extend(_glob(match) for match in _PATH.findall(line) if "`" in line)
+  for line in code:
+    if line.lstrip().startswith(("//", "#", "*")):
+      globs.extend(_glob(match) for match in _PATH.findall(line))
+  source = "\n".join(code)
+  modules = {_module_key(module) for module in _MODULE.findall(source)}
+  # NUL, not a space: ``{feature}Service.create(`` must not read as ``await.create(``.
+  cleaned = _PLACEHOLDER.sub("\0", source)
+  identifiers = set(_split_list(meta.get("identifiers")))
+  for line in cleaned.splitlines():
+    stripped = line.strip()
+    if stripped.startswith("import ") and " from " in stripped:
+      identifiers.update(_IDENT.findall(stripped.split(" from ", 1)[0][7:]))
+  identifiers.update(_CALL.findall(cleaned))
+  identifiers.update(_NEW.findall(cleaned))
+  calls = {f"{receiver}.{method}" for receiver, method in _MEMBER_CALL.findall(cleaned) if _specific_receiver(receiver)}
+  return {
+    "name": meta.get("name") or name,
+    "parent_adr": meta.get("parent_adr") or None,
+    "work_types": _split_list(meta.get("work_types")),
+    "globs": sorted({glob for glob in globs if "/" in glob and not glob.startswith(("http", "/"))}),
+    "identifiers": sorted(ident for ident in identifiers if ident not in _KEYWORDS and ident not in _GENERIC and len(ident) > 1),
+    "calls": sorted(calls),
+    "modules": sorted(module for module in modules if module),
+  }
+
+
+def with_summary(signature: Dict[str, Any], summary: Optional[str]) -> Dict[str, Any]:
+  """Add the identifiers named in a ``pattern-index.md`` summary (``describeIfMongo,Joi.object``)."""
+  identifiers, calls = set(signature["identifiers"]), set(signature["calls"])
+  for term in (summary or "").split(","):
+    match = re.match(r"\s*([A-Za-z_$][\w$]*)(?:\.([A-Za-z_$][\w$]*))?", term)
+    if not match:
+      continue
+    name, member = match.groups()
+    if member:
+      calls.add(f"{name}.{member}")
+    elif name[1:] != name[1:].lower() and name not in _GENERIC:
+      identifiers.add(name)  # camelCase or PascalCase: a code name, not a prose word
+  return dict(signature, identifiers=sorted(identifiers), calls=sorted(calls))
+
+
+def pattern_files(directories: Iterable[Path]) -> Dict[str, Path]:
+  """Map pattern name (file stem) -> path for ``*.md`` in ``directories``; earlier directories win."""
+  found: Dict[str, Path] = {}
+  for directory in directories:
+    try:
+      entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+    except OSError:
+      continue
+    for entry in entries:
+      if entry.name.endswith(".md") and entry.name.lower() not in ("index.md", "readme.md") and entry.is_file():
+        found.setdefault(entry.name[:-3], Path(entry.path))
+  return found
+
+
+class SignatureCache:
+  def __init__(self, db_path: str) -> None:
+    """Open (or create) the cache at ``db_path`` (``":memory:"`` to compile every run)."""
+    if db_path != ":memory:":
+      Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    self.db = sqlite3.connect(db_path)
+    version = self.db.execute("PRAGMA user_version").fetchone()[0]
+    if version != _SCHEMA_VERSION:
+      self.db.executescript("DROP TABLE IF EXISTS signatures;")
+      self.db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    self.db.executescript(_SCHEMA)
+    self.stats = {"compiled": 0, "cached": 0}
+
+  def close(self) -> None:
+    self.db.close()
+
+  def __enter__(self) -> "SignatureCache":
+    return self
+
+  def __exit__(self, *exc: Any) -> None:
+    self.close()
+
+  def load(self, files: Dict[str, Path]) -> List[Dict[str, Any]]:
+    """Signatures of ``files`` (name -> path), compiling only new or changed documents."""
+    signatures: List[Dict[str, Any]] = []
+    with self.db:
+      for name, path in files.items():
+        try:
+          stat = path.stat()
+        except OSError:
+          continue
+        row = self.db.execute("SELECT size, mtime_ns, signature FROM signatures WHERE path = ?", (str(path),)).fetchone()
+        if row and (row[0], row[1]) == (stat.st_size, stat.st_mtime_ns):
+          signature = json.loads(row[2])
+          self.stats["cached"] += 1
+        else:
+          try:
+            signature = compile_signature(path.read_text(encoding="utf-8", errors="replace"), name)
+          except OSError:
+            continue
+          self.db.execute(
+            "INSERT OR REPLACE INTO signatures VALUES (?, ?, ?, ?)", (str(path), stat.st_size, stat.st_mtime_ns, json.dumps(signature))
+          )
+          self.stats["compiled"] += 1
+        signatures.append(dict(signature, path=str(path)))
+      known = [str(path) for path in files.values()]
+      self.db.execute(f"DELETE FROM signatures WHERE path NOT IN ({','.join('?' * len(known))})", known)
+    return signatures
+
+
+# -- diff streaming ---------------------------------------------------------------
+
+
+def _skipped(path: str) -> bool:
+  return path.startswith(SKIP_PREFIXES) or path.lower().endswith(SKIP_SUFFIXES)
+
+
+def _diff_path(value: str) -> str:
+  value = value.rstrip("\n").rstrip("\t")
+  if value.startswith('"') and value.endswith('"'):
+    value = value[1:-1].encode("latin-1", "backslashreplace").decode("unicode_escape").encode("latin-1").decode("utf-8", "replace")
+  return value[2:] if value[:2] in ("a/", "b/") else value
+
+
+def stream_changes(
+  project_root: Path,
+  base: str = "HEAD",
+  staged: bool = False,
+  untracked: bool = True,
+  pathspecs: Iterable[str] = ()
+) -> Iterator[Tuple[str, str, str]]:
+  """``(status, path, added_text)`` per changed file, parsed from ``git diff`` as it is read.
+
+  ``status`` is ``added``, ``modified`` or ``deleted``; binary files, workflow
+  folders and documentation are left out. Raises RuntimeError outside a git
+  work tree.
+  """
+  try:
+    inside = subprocess.run(
+      ["git", "-C", str(project_root), "rev-parse", "--is-inside-work-tree"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+  except OSError as exc:
+    raise RuntimeError(f"git is not available: {exc}") from exc
+  if inside.stdout.strip() != "true":
+    raise RuntimeError(f"not a git work tree: {project_root}")
+  command = ["git", "-C", str(project_root), "-c", "core.quotePath=false", "diff", "--no-color", "--no-ext-diff", "--unified=0", "--find-renames"]
+  command += ["--cached", base] if staged else [base]
+  command += ["--", *pathspecs]
+  proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding="utf-8", errors="replace")
+  path: Optional[str] = None
+  status = "modified"
+  added: List[str] = []
+  size = 0
+  header = False
+  assert proc.stdout is not None
+  with proc:
+    for line in proc.stdout:
+      if line.startswith("diff --git "):
+        if path is not None and not _skipped(path):
+          yield status, path, "".join(added)
+        path, status, added, size, header = None, "modified", [], 0, True
+      elif not header:
+        if line.startswith("+") and size < MAX_FILE_BYTES:
+          added.append(line[1:])
+          size += len(line)
+      elif line.startswith("@@"):
+        header = False
+      elif line.startswith("--- "):
+        if line.startswith("--- /dev/null"):
+          status = "added"
+        else:
+          path = _diff_path(line[4:])  # replaced by the +++ side unless deleted
+      elif line.startswith("+++ "):
+        if line.startswith("+++ /dev/null"):
+          status = "deleted"
+        else:
+          path = _diff_path(line[4:])
+      elif line.startswith("Binary files "):
+        path = None
+    stderr = proc.stderr.read() if proc.stderr else ""
+  if proc.returncode != 0:
+    raise RuntimeError((stderr.strip().splitlines() or [f"git diff exited with {proc.returncode}"])[0])
+  if path is not None and not _skipped(path):
+    yield status, path, "".join(added)
+  if staged or not untracked:
+    return
+  listing = subprocess.Popen(
+    ["git", "-C", str(project_root), "ls-files", "--others", "--exclude-standard", "-z", "--", *pathspecs],
+    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+  )
+  assert listing.stdout is not None
+  with listing:
+    pending = b""
+    for chunk in iter(lambda: listing.stdout.read(65536), b""):
+      pending += chunk
+      *names, pending = pending.split(b"\0")
+      for name in names:
+        rel = name.decode("utf-8", "replace")
+        if _skipped(rel):
+          continue
+        try:
+          with open(project_root / rel, "rb") as f:
+            raw = f.read(MAX_FILE_BYTES)
+        except OSError:
+          continue
+        if b"\0" not in raw[:8192]:
+          yield "added", rel, raw.decode("utf-8", "replace")
+
+
+# -- scoring ----------------------------------------------------------------------
+
+_WORKER: Dict[str, Any] = {}
+
+
+def weigh_signatures(signatures: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+  """Attach ``weights`` (signal -> weight): signals shared by many patterns weigh less."""
+  frequency: Dict[str, int] = {}
+  for signature in signatures:
+    for signal in _signals(signature):
+      frequency[signal] = frequency.get(signal, 0) + 1
+  total = len(signatures)
+  weighed = []
+  for signature in signatures:
+    weights = {signal: 1.0 + math.log(total / frequency[signal]) for signal in _signals(signature)}
+    top = sorted(weights.values(), reverse=True)[:TOP_SIGNALS]
+    weighed.append(dict(signature, weights=weights, saturation=sum(top) or 1.0))
+  return weighed
+
+
+def _signals(signature: Dict[str, Any]) -> List[str]:
+  return (
+    [f"id:{name}" for name in signature["identifiers"]]
+    + [f"call:{name}" for name in signature["calls"]]
+    + [f"mod:{name}" for name in signature["modules"]]
+  )
+
+
+def _glob_regex(glob: str) -> re.Pattern:
+  return re.compile(fnmatch.translate(glob))
+
+
+def init_worker(signatures: List[Dict[str, Any]], project_root: str, threshold: float) -> None:
+  """Pool initializer (also called in-process): compile per-signature lookups once."""
+  compiled = []
+  for signature in signatures:
+    weights = signature["weights"]
+    modules = [signal[4:] for signal in weights if signal.startswith("mod:")]
+    # A compound suffix (``*.validator.ts``) marks the pattern's files wherever they live.
+    suffixes = sorted({glob.rsplit("/", 1)[-1] for glob in signature["globs"] if glob.rsplit("/", 1)[-1].startswith("*.") and glob.count(".") > 1})
+    compiled.append({
+      "signature": signature,
+      "ids": frozenset(signal[3:] for signal in weights if signal.startswith("id:")),
+      "calls": frozenset(signal[5:] for signal in weights if signal.startswith("call:")),
+      "modules": frozenset(module for module in modules if "*" not in module),
+      "wild_modules": [(_glob_regex(module), module) for module in modules if "*" in module],
+      "globs": [(_glob_regex(glob), _glob_regex("*/" + glob), glob) for glob in signature["globs"]],
+      "suffixes": [(_glob_regex(suffix), suffix) for suffix in suffixes],
+    })
+  _WORKER.update(signatures=compiled, project_root=project_root, threshold=threshold)
+
+
+def _modules(text: str, python: bool = False) -> set:
+  modules = {_module_key(module) if "{" in module or module.startswith((".", "@/", "~/")) else module for module in _MODULE.findall(text)}
+  if python:
+    modules.update(a or b for a, b in _PY_IMPORT.findall(text))
+  return modules
+
+
+def features(text: str, python: bool = False) -> Tuple[set, set, set]:
+  """``(identifiers, member calls, module keys)`` used in ``text``."""
+  identifiers = set()
+  calls = set()
+  for name, method in _TOKEN.findall(text):
+    identifiers.add(name)
+    if method:
+      identifiers.add(method)
+      calls.add(f"{name}.{method}")
+  return identifiers, calls, _modules(text, python)
+
+
+def _location(path: str, compiled: Dict[str, Any]) -> Optional[str]:
+  for exact, nested, glob in compiled["globs"]:
+    if exact.match(path) or nested.match(path):
+      return glob
+  name = path.rsplit("/", 1)[-1]
+  for regex, suffix in compiled["suffixes"]:
+    if regex.match(name):
+      return suffix
+  return None
+
+
+def score_file(status: str, path: str, text: str) -> Dict[str, Any]:
+  python = path.endswith(".py")
+  identifiers, calls, modules = features(text, python)
+  if status == "modified":
+    # Imports sit at the top of the file, usually outside the changed hunks.
+    try:
+      with open(os.path.join(_WORKER["project_root"], path), encoding="utf-8", errors="replace") as f:
+        modules |= _modules(f.read(MAX_FILE_BYTES), python)
+    except OSError:
+      pass
+  threshold = _WORKER["threshold"]
+  matches = []
+  drift = []
+  for compiled in _WORKER["signatures"]:
+    signature = compiled["signature"]
+    weights = signature["weights"]
+    hits = [f"id:{name}" for name in compiled["ids"] & identifiers] + [f"call:{name}" for name in compiled["calls"] & calls]
+    hits += [f"mod:{module}" for module in compiled["modules"] & modules]
+    hits += [f"mod:{key}" for regex, key in compiled["wild_modules"] if any(regex.match(module) for module in modules)]
+    content = min(1.0, sum(weights[signal] for signal in hits) / signature["saturation"])
+    location = _location(path, compiled)
+    if content >= threshold and (location or content >= 2 * threshold):
+      hits.sort(key=lambda signal: (-weights[signal], signal))
+      matches.append({
+        "pattern": signature["name"],
+        "score": round(0.4 * bool(location) + 0.6 * content, 3),
+        "content": round(content, 3),
+        "location": location,
+        "signals": [signal.split(":", 1)[1] for signal in hits[:6]],
+      })
+    elif location and status == "added" and content < threshold / 2:
+      drift.append({"pattern": signature["name"], "location": location, "content": round(content, 3)})
+  matches.sort(key=lambda match: -match["score"])
+  if matches:
+    drift = []  # the file follows another pattern that shares the location
+  result: Dict[str, Any] = {"path": path, "status": status, "lines": text.count("\n"), "matches": matches, "drift": drift}
+  if not matches and not drift:
+    names = {name for name in identifiers if len(name) > 2 and name not in _KEYWORDS and name not in _GENERIC}
+    result["signals"] = sorted(
+      [f"mod:{module}" for module in modules]
+      + [f"call:{call}" for call in calls if _specific_receiver(call.split(".", 1)[0])]
+      + [f"id:{name}" for name in names if name[0].isupper() or any(c.isupper() for c in name[1:])]
+    )
+  return result
+
+
+def score_batch(batch: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+  return [score_file(*change) for change in batch]
+
+
+def score_changes(
+  changes: Iterable[Tuple[str, str, str]],
+  signatures: List[Dict[str, Any]],
+  project_root: Path,
+  threshold: float = DEFAULT_THRESHOLD,
+  jobs: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+  """Score every change; returns ``(results, workers)``.
+
+  Diffs that fit in one batch (or a single worker) are scored in-process;
+  larger ones are fed to a process pool batch by batch while the diff is
+  still being read.
+  """
+  init_args = (signatures, str(project_root), threshold)
+  workers = max(1, jobs or os.cpu_count() or 1)
+  deleted: List[Dict[str, Any]] = []
+
+  def batches() -> Iterator[List[Tuple[str, str, str]]]:
+    batch: List[Tuple[str, str, str]] = []
+    for change in changes:
+      if change[0] == "deleted":
+        deleted.append({"path": change[1], "status": "deleted", "lines": 0, "matches": [], "drift": []})
+        continue
+      batch.append(change)
+      if len(batch) >= BATCH_FILES:
+        yield batch
+        batch = []
+    if batch:
+      yield batch
+
+  pending = batches()
+  first = next(pending, [])
+  second = next(pending, None) if workers > 1 else None
+  if second is None:
+    init_worker(*init_args)
+    results = score_batch(first)
+    for batch in pending:
+      results.extend(score_batch(batch))
+    return results + deleted, 1
+
+  from concurrent.futures import ProcessPoolExecutor
+
+  with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=init_args) as pool:
+    futures = [pool.submit(score_batch, first), pool.submit(score_batch, second)]
+    futures.extend(pool.submit(score_batch, batch) for batch in pending)
+    results = [result for future in futures for result in future.result()]
+  return results + deleted, workers
+
+
+# -- report -----------------------------------------------------------------------
+
+
+def _suffix(name: str) -> str:
+  stem, dot, rest = name.lstrip(".").partition(".")
+  return "." + rest if dot else ""
+
+
+def find_candidates(results: List[Dict[str, Any]], known: Iterable[str], min_files: int = DEFAULT_MIN_FILES) -> List[Dict[str, Any]]:
+  """Groups of new files that follow no pattern but share a location, suffix and signals."""
+  groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+  for result in results:
+    if result["status"] != "added" or "signals" not in result:
+      continue
+    directory, _, name = result["path"].rpartition("/")
+    suffix = _suffix(name)
+    if not suffix:
+      continue
+    # Compound suffixes (.job.ts) name a kind of file wherever it lives; plain ones only within a folder.
+    key = ("", suffix) if suffix.count(".") > 1 else (directory, suffix)
+    groups.setdefault(key, []).append(result)
+  known = set(known)
+  candidates = []
+  for (_, suffix), members in groups.items():
+    if len(members) < min_files:
+      continue
+    directories = [member["path"].rpartition("/")[0] for member in members]
+    common = os.path.commonpath(directories) if all(directories) else ""
+    glob = (f"{common}/" if common else "") + ("*/" if common not in directories else "") + "*" + suffix
+    glob = glob.replace("*/*", "*")
+    counts: Dict[str, int] = {}
+    for member in members:
+      for signal in member["signals"]:
+        counts[signal] = counts.get(signal, 0) + 1
+    needed = max(2, math.ceil(0.6 * len(members)))
+    shared = sorted((signal for signal, count in counts.items() if count >= needed), key=lambda signal: (-counts[signal], signal))
+    kind = suffix.split(".")[1] if suffix.count(".") > 1 else ""
+    folder = common.rsplit("/", 1)[-1] if common else "root"
+    name = f"{folder}-{kind}" if kind and kind != folder.rstrip("s") else folder
+    if name in known:
+      name = f"{name}-variant"
+    candidates.append({
+      "name": name,
+      "glob": glob,
+      "files": sorted(member["path"] for member in members),
+      "shared": [signal.split(":", 1)[1] for signal in shared[:8]],
+    })
+  candidates.sort(key=lambda candidate: (-len(candidate["files"]), candidate["glob"]))
+  return candidates
+
+
+def build_report(
+  results: List[Dict[str, Any]],
+  signatures: List[Dict[str, Any]],
+  adr_ids: Optional[Iterable[str]],
+  min_files: int = DEFAULT_MIN_FILES
+) -> Dict[str, Any]:
+  """``{patterns_followed, candidates, adr_gaps, actions, files}`` from scored changes.
+
+  ``adr_ids`` are the ADRs in ``adr-index.md``; with None, cited ADRs are not checked.
+  """
+  by_name = {signature["name"]: signature for signature in signatures}
+  adr_ids = set(adr_ids) if adr_ids is not None else None
+  followed: Dict[str, Dict[str, Any]] = {}
+  drift: Dict[str, List[str]] = {}
+  for result in results:
+    for match in result["matches"]:
+      entry = followed.setdefault(match["pattern"], {"pattern": match["pattern"], "parent_adr": by_name[match["pattern"]]["parent_adr"], "files": []})
+      entry["files"].append({"path": result["path"], "score": match["score"], "signals": match["signals"]})
+    for item in result["drift"]:
+      drift.setdefault(item["pattern"], []).append(result["path"])
+  patterns = sorted(followed.values(), key=lambda entry: (-len(entry["files"]), entry["pattern"]))
+  candidates = find_candidates(results, by_name, min_files)
+
+  gaps = []
+  for name in sorted({entry["pattern"] for entry in patterns} | set(drift)):
+    parent = by_name[name]["parent_adr"]
+    if adr_ids is not None and parent and parent not in adr_ids:
+      gaps.append({"kind": "missing-adr", "pattern": name, "adr": parent, "detail": f"pattern {name} cites {parent}, which is not in adr-index.md"})
+  for name, paths in sorted(drift.items()):
+    parent = by_name[name]["parent_adr"] or "its ADR"
+    gaps.append({"kind": "drift", "pattern": name, "adr": by_name[name]["parent_adr"], "files": paths,
+                 "detail": f"{len(paths)} new file(s) in {name}'s location use few of its markers ({parent})"})
+  for candidate in candidates:
+    gaps.append({"kind": "uncovered", "pattern": candidate["name"], "adr": None, "files": candidate["files"],
+                 "detail": f"no pattern or ADR covers `{candidate['glob']}` ({len(candidate['files'])} new files)"})
+
+  actions = [f"create pattern draft `{candidate['name']}` for `{candidate['glob']}`" for candidate in candidates]
+  actions += [f"update pattern `{gap['pattern']}` or fix drift in {', '.join(gap['files'][:3])}" for gap in gaps if gap["kind"] == "drift"]
+  actions += [f"create ADR suggestion for {gap['adr']} (cited by `{gap['pattern']}`)" for gap in gaps if gap["kind"] == "missing-adr"]
+  actions += [f"bump usage_count of `{entry['pattern']}` ({len(entry['files'])} file(s))" for entry in patterns]
+  return {
+    "patterns_followed": patterns,
+    "candidates": candidates,
+    "adr_gaps": gaps,
+    "actions": actions,
+    "files": {
+      "changed": len(results),
+      "matched": sum(1 for result in results if result["matches"]),
+      "deleted": sum(1 for result in results if result["status"] == "deleted"),
+    },
+  }
+
+
+def render_report(report: Dict[str, Any]) -> str:
+  """The report in the reflect skill's output format."""
+  lines = ["## Patterns followed"]
+  for entry in report["patterns_followed"]:
+    lines.append(f"- `{entry['pattern']}` ({entry['parent_adr'] or 'no ADR'}): {len(entry['files'])} file(s)")
+    for item in entry["files"][:5]:
+      lines.append(f"  - {item['path']} ({item['score']:.2f}: {', '.join(item['signals'][:4])})")
+    if len(entry["files"]) > 5:
+      lines.append(f"  - … {len(entry['files']) - 5} more")
+  lines += [] if report["patterns_followed"] else ["- None"]
+  lines += ["", "## New pattern candidates"]
+  for candidate in report["candidates"]:
+    shared = f"; shared: {', '.join(candidate['shared'])}" if candidate["shared"] else ""
+    lines.append(f"- `{candidate['name']}`: `{candidate['glob']}` ({len(candidate['files'])} files{shared})")
+  lines += [] if report["candidates"] else ["- None"]
+  lines += ["", "## ADR gaps"]
+  lines += [f"- {gap['detail']}" for gap in report["adr_gaps"]] or ["- None"]
+  lines += ["", "## Recommended actions"]
+  lines += [f"- {action}" for action in report["actions"]] or ["- No notable deltas"]
+  return "\n".join(lines) + "\n"
+
+
+def candidate_lines(candidates: List[Dict[str, Any]], date: str) -> List[str]:
+  """One memory-log line per candidate, stable for a given day so reruns do not repeat it."""
+  lines = []
+  for candidate in candidates:
+    shared = f"; shared: {', '.join(candidate['shared'])}" if candidate["shared"] else ""
+    files = ", ".join(candidate["files"][:5]) + (f" (+{len(candidate['files']) - 5})" if len(candidate["files"]) > 5 else "")
+    lines.append(f"- **{date}**: candidate `{candidate['name']}` — `{candidate['glob']}`{shared} (files: {files})")
+  return lines
@@ -0,0 +1,1318 @@
+"""
+Subcommand runners for install_team.py.
+
+installer.main dispatches ``setup``, ``gc``, ``comms``, ``vault``, ``context``,
+``log``, ``adr``, ``watch``, ``export``, ``archive`` and ``reflect`` to the
+``_run_<name>`` functions here. The module is imported only for those
+subcommands, so a plain install or --detect-team never loads it; it shares
+the installer's profile, YAML and registry caches and its tracer.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from action_plan import atomic_write_text, file_lock
+from installer import (
+  _REGISTRY_CACHE,
+  _TRACER,
+  _YAML_CACHE,
+  _YAML_CACHE_LOCK,
+  _add_install_arguments,
+  _apply_repo_team_definition,
+  _detect_team_from_project,
+  _detect_team_with_source,
+  _emit_plan_json,
+  _install_team,
+  _json_text,
+  _lazy_import,
+  _load_cli_context,
+  _load_profiles,
+  _load_registry,
+  _object_store_root,
+  _print_install_result,
+  _print_teams,
+  _profile_with_store,
+  _registry_path,
+  _resolve_team_id,
+  _target_root,
+  _workspace_cache_path,
+)
+
+
+def _prompt_for_team(profiles: Dict[str, Any]) -> Optional[str]:
+  print("Codex team not specified.", file=sys.stderr)
+  stdout = sys.stdout
+  sys.stdout = sys.stderr
+  try:
+    _print_teams(profiles)
+  finally:
+    sys.stdout = stdout
+  try:
+    sys.stderr.write("Enter team id for Codex install: ")
+    sys.stderr.flush()
+    answer = sys.stdin.readline()
+  except (EOFError, KeyboardInterrupt):
+    return None
+  return answer.strip() or None
+
+
+def _setup(args: argparse.Namespace) -> Dict[str, Any]:
+  """Detect, optionally prompt, and install in one process.
+
+  Returns a JSON-serializable result; ``exit_code`` follows the installer's
+  conventions (2 no/unknown team, 3 target exists).
+  """
+  workflow_root, project_root, profiles = _load_cli_context(args)
+  teams = profiles.get("teams", {})
+  outcome: Dict[str, Any] = {
+    "command": "setup",
+    "project_root": str(project_root),
+    "team_id": None,
+    "team_source": None,
+    "exit_code": 0,
+  }
+
+  if args.list_teams:
+    _print_teams(profiles)
+    outcome.update({"status": "listed", "teams": sorted(teams.keys())})
+    return outcome
+
+  registry = _load_registry(project_root)
+  team_id: Optional[str] = args.team
+  team_source = "argument" if team_id else None
+  if not team_id and args.auto_team:
+    team_id, team_source = _detect_team_with_source(project_root, teams, registry)
+    if team_id:
+      print(f"Auto-detected Codex team: {team_id}")
+  if not team_id and not args.no_prompt:
+    team_id = _prompt_for_team(profiles)
+    team_source = "prompt" if team_id else None
+  if not team_id:
+    print("Error: team id is required for Codex install.", file=sys.stderr)
+    outcome.update({"status": "no-team", "exit_code": 2})
+    return outcome
+
+  team_id = _resolve_team_id(team_id, teams, registry)
+  outcome.update({"team_id": team_id, "team_source": team_source})
+  if team_id not in teams:
+    print(f"Unknown team: {team_id}", file=sys.stderr)
+    outcome.update({"status": "unknown-team", "exit_code": 2})
+    return outcome
+
+  target_root = _target_root(args)
+  print(f"==> Running Codex workflow install for team: {team_id}")
+  result = _install_team(
+    workflow_root,
+    project_root,
+    teams,
+    team_id,
+    target_root,
+    args,
+    registry,
+    write_local_config=not args.no_local_config
+  )
+  if not result["exit_code"]:
+    if args.plan_json and "plan" in result:
+      _emit_plan_json(args.plan_json, result["plan"])
+    _print_install_result(args, workflow_root, target_root, result)
+  outcome.update({
+    "status": result["status"],
+    "exit_code": result["exit_code"],
+    "target": result["target"],
+    "team_profile_source": result.get("team_profile_source"),
+    "sync": result.get("sync"),
+    "dry_run": bool(args.dry_run),
+    "local_config": None if args.no_local_config else str(workflow_root / "config" / "active-team.json"),
+  })
+  return outcome
+
+
+def _run_setup(argv: List[str]) -> int:
+  parser = argparse.ArgumentParser(
+    prog="install_team.py setup",
+    description="Detect the team, optionally prompt, and install in a single process"
+  )
+  parser.add_argument("--team", help="Team id or alias; detected from the workspace when omitted")
+  parser.add_argument("--auto-team", dest="auto_team", action="store_true", default=True, help="Auto-detect team when --team is omitted (default)")
+  parser.add_argument("--no-auto-team", dest="auto_team", action="store_false", help="Disable auto-detection")
+  parser.add_argument("--no-prompt", action="store_true", help="Never prompt for a team; fail when none is given or detected")
+  parser.add_argument("--list-teams", action="store_true", help="List available team ids and exit")
+  parser.add_argument("--json", action="store_true", help="Print a machine-readable result on stdout (human output goes to stderr)")
+  _add_install_arguments(parser)
+  args = parser.parse_args(argv)
+
+  if not args.json:
+    return _setup(args)["exit_code"]
+  stdout = sys.stdout
+  sys.stdout = sys.stderr
+  try:
+    outcome = _setup(args)
+  finally:
+    sys.stdout = stdout
+  print(json.dumps(outcome, indent=2))
+  return outcome["exit_code"]
+
+
+def _run_gc(argv: List[str]) -> int:
+  parser = argparse.ArgumentParser(
+    prog="install_team.py gc",
+    description="Remove store objects no longer referenced by any registered install manifest"
+  )
+  parser.add_argument("--object-store", metavar="DIR", help="Store to collect (default: $CODEX_HOME/skill-store or ~/.codex/skill-store)")
+  parser.add_argument("--manifest", action="append", default=[], metavar="FILE", help="Extra install-manifest.json whose objects must be kept (repeatable)")
+  parser.add_argument("--dry-run", action="store_true", help="Report what would be removed without deleting")
+  parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+  args = parser.parse_args(argv)
+
+  store = _lazy_import("object_store").ObjectStore(_object_store_root(args))
+  result = store.gc([Path(path).expanduser() for path in args.manifest], dry_run=args.dry_run)
+  if args.json:
+    print(json.dumps(dict(result, object_store=str(store.root), dry_run=args.dry_run), indent=2, sort_keys=True))
+    return 0
+  prefix = "[dry-run] " if args.dry_run else ""
+  print(f"{prefix}Object store: {store.root}")
+  print(
+    f"{prefix}Objects kept: {result['kept']}, removed: {result['removed']} "
+    f"({result['bytes_freed']} bytes), stale installs: {result['stale_installs']}"
+  )
+  return 0
+
+
+def _add_team_context_arguments(parser: argparse.ArgumentParser) -> None:
+  parser.add_argument("--team", help="Team id or alias (default: detected from the workspace)")
+  parser.add_argument("--workspace-root", help="Project root (default: parent of .codex-workflow)")
+  parser.add_argument("--no-cache", action="store_true", help="Do not read or write caches under .codex-workflow/cache/")
+  parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+  parser.set_defaults(startup_profile=False, timings=False, trace=None)
+
+
+def _resolve_team_context(args: argparse.Namespace) -> Optional[tuple[Path, Path, str, Dict[str, Any]]]:
+  """Resolve (workflow_root, project_root, team_id, team_profile) for workspace subcommands.
+
+  The profile carries the repository overlay from ``_apply_repo_team_definition``.
+  Prints an error and returns None when no known team is given or detected.
+  """
+  workflow_root, project_root, profiles = _load_cli_context(args)
+  teams = profiles.get("teams", {})
+  registry = _load_registry(project_root)
+  team_id = _resolve_team_id(args.team, teams, registry) if args.team else _detect_team_from_project(project_root, teams, registry)
+  if not team_id or team_id not in teams:
+    print(f"Unknown team: {args.team}" if args.team else "Error: no team given and none detected; pass --team.", file=sys.stderr)
+    return None
+  team_profile = json.loads(json.dumps(teams[team_id]))
+  team_profile, _ = _apply_repo_team_definition(project_root, team_id, team_profile, registry)
+  return workflow_root, project_root, team_id, team_profile
+
+
+def _print_comms_check(summary: Dict[str, Any]) -> None:
+  counts = summary["counts"]
+  print(f"Team: {summary['team']}")
+  print(f"Inbox: {counts['inbox']} message(s)")
+  for message in summary["inbox"]:
+    print(f"  - {message['date'] or '----------'} [{message['priority'] or '-'}] {message['subject']} ({message['path']})")
+  for folder in ("queue", "active"):
+    print(f"{folder.capitalize()}: {counts[folder]} issue(s)")
+    for issue in summary[folder]:
+      issue_id = f"{issue['prefix']}-{issue['number']:03d}" if issue["prefix"] else issue["path"]
+      print(f"  - {issue_id} [{issue['priority'] or '-'}] {issue['subject']}")
+  print(f"Completed: {counts['completed']} issue(s)")
+
+
+def _run_comms_move(
+  args: argparse.Namespace,
+  project_root: Path,
+  team_id: str,
+  team_profile: Dict[str, Any],
+  db_path: str,
+  journal_path: Path
+) -> int:
+  comms = _lazy_import("comms")
+  default_paths = team_profile.get("default_paths", {})
+  if args.resume or args.rollback:
+    if not journal_path.exists():
+      print(f"No interrupted move batch (journal not found: {journal_path})", file=sys.stderr)
+      return 1
+    if args.rollback:
+      payload = comms.rollback_moves(project_root, journal_path)
+      lines = [f"Restored {move['dst']} -> {move['src']}" for move in payload["restored"]]
+    else:
+      payload = comms.resume_moves(project_root, journal_path)
+      lines = [f"Moved {move['src']} -> {move['dst']} (Status: {move['status_to']})" for move in payload["moved"]]
+  else:
+    if journal_path.exists():
+      print(f"An interrupted move batch exists; run with --resume or --rollback first ({journal_path})", file=sys.stderr)
+      return 1
+    with comms.CommsIndex(db_path, project_root) as index:
+      index.refresh(team_id, default_paths)
+      moves, unmatched, conflicts = comms.plan_moves(index, team_id, args.issues, default_paths, args.to)
+    for pattern in unmatched:
+      print(f"Warning: no {team_id} issue matches {pattern}", file=sys.stderr)
+    if conflicts:
+      for move in conflicts:
+        print(f"Conflict: {move['dst']} already exists (moving {move['src']})", file=sys.stderr)
+      print("Nothing moved; rename or remove the conflicting files first.", file=sys.stderr)
+      return 1
+    if args.dry_run:
+      payload = {"moves": moves, "unmatched": unmatched}
+      lines = [f"[dry-run] move {move['src']} -> {move['dst']} (Status: {move['status_to']})" for move in moves]
+    else:
+      datetime_module = _lazy_import("datetime")
+      batch = {
+        "batch": datetime_module.datetime.now(datetime_module.timezone.utc).isoformat(),
+        "team": team_id,
+        "to": args.to,
+      }
+      payload = dict(comms.run_moves(project_root, journal_path, moves, batch), unmatched=unmatched)
+      lines = [f"Moved {move['src']} -> {move['dst']} (Status: {move['status_to']})" for move in payload["moved"]]
+  if args.json:
+    print(json.dumps(payload, indent=2, sort_keys=True))
+  else:
+    for line in lines:
+      print(line)
+    print(f"{len(lines)} issue(s)")
+  return 0
+
+
+def _run_comms(argv: List[str]) -> int:
+  parser = argparse.ArgumentParser(
+    prog="install_team.py comms",
+    description="Answer comms check/status/next-issue queries from an incremental SQLite index of dev_communication"
+  )
+  parser.add_argument("action", choices=("check", "status", "next-issue", "reindex", "move"), help="check: inbox + open issues; status: issue counts by folder and Status header; next-issue: next free issue id; reindex: rebuild the index; move: move issues between folders with the matching Status")
+  parser.add_argument("issues", nargs="*", metavar="ISSUE", help="For move: issue ids or globs, e.g. API-ISS-012 'API-ISS-01*'")
+  parser.add_argument("--prefix", help="Issue prefix for next-issue (default: the team's issue_prefix)")
+  parser.add_argument("--to", choices=("queue", "active", "completed"), help="For move: destination folder (Status becomes QUEUE/ACTIVE/COMPLETE)")
+  parser.add_argument("--resume", action="store_true", help="For move: finish an interrupted batch from its journal")
+  parser.add_argument("--rollback", action="store_true", help="For move: undo an interrupted batch from its journal")
+  parser.add_argument("--dry-run", action="store_true", help="For move: print the planned moves without changing files")
+  _add_team_context_arguments(parser)
+  args = parser.parse_args(argv)
+  if args.action == "move" and not (args.resume or args.rollback) and (not args.issues or not args.to):
+    parser.error("move requires ISSUE ids/globs and --to (or --resume/--rollback)")
+
+  context = _resolve_team_context(args)
+  if context is None:
+    return 2
+  workflow_root, project_root, team_id, team_profile = context
+  comms = _lazy_import("comms")
+  db_path = ":memory:" if args.no_cache else str(_workspace_cache_path(workflow_root, project_root, "comms", ".sqlite"))
+  if args.action == "reindex" and db_path != ":memory:" and os.path.exists(db_path):
+    os.remove(db_path)
+  if args.action == "move":
+    journal_path = _workspace_cache_path(workflow_root, project_root, "comms", ".move-journal.jsonl")
+    return _run_comms_move(args, project_root, team_id, team_profile, db_path, journal_path)
+
+  with comms.CommsIndex(db_path, project_root) as index:
+    with _TRACER.span("comms_refresh", "comms"):
+      refreshed = index.refresh(team_id, team_profile.get("default_paths", {}))
+    if args.action == "check":
+      payload: Dict[str, Any] = index.check_summary(team_id)
+    elif args.action == "status":
+      payload = {"team": team_id, "counts": index.status_counts(team_id), "mismatched": index.mismatched_status(team_id)}
+    elif args.action == "next-issue":
+      prefix = args.prefix or team_profile.get("issue_prefix") or ""
+      if not prefix:
+        print(f"Team {team_id} has no issue_prefix; pass --prefix.", file=sys.stderr)
+        return 2
+      archived = _archive_store(workflow_root, project_root).max_issue_number(prefix, team_id)
+      number = index.next_issue_number(team_id, prefix, archived)
+      payload = {"team": team_id, "prefix": prefix.upper(), "number": number, "issue_id": f"{prefix.upper()}-{number:03d}"}
+    else:
+      payload = {"team": team_id, "index": db_path}
+  payload["refreshed"] = refreshed
+
+  if args.json:
+    print(json.dumps(payload, indent=2, sort_keys=True))
+  elif args.action == "check":
+    _print_comms_check(payload)
+  elif args.action == "status":
+    for folder, counts in sorted(payload["counts"].items()):
+      print(f"{folder}: " + ", ".join(f"{status}={count}" for status, count in sorted(counts.items())))
+    for issue in payload["mismatched"]:
+      print(f"Warning: {issue['path']} has Status: {issue['status'] or '-'} (expected {issue['expected']})")
+  elif args.action == "next-issue":
+    print(payload["issue_id"])
+  else:
+    print(f"Indexed {refreshed['parsed']} file(s) for {team_id} into {db_path}")
+  return 0
+
+
+def _run_vault(argv: List[str]) -> int:
+  parser = argparse.ArgumentParser(
+    prog="install_team.py vault",
+    description="Query an incremental SQLite index (full text and wiki-link graph) of the ai_team_config vault"
+  )
+  parser.add_argument(
+    "action",
+    choices=("search", "stats", "reindex", "backlinks", "links", "orphans", "broken", "sync-backlinks"),
+    help="search: ranked full-text search with snippets; stats: note counts per team/store; reindex: rebuild the index; "
+    "backlinks/links NOTE: notes linking to / linked from NOTE; orphans: notes nothing links to; broken: unresolved links; "
+    "sync-backlinks: add missing graph backlinks to existing 'Backlinks:' header lines"
+  )
+  parser.add_argument("query", nargs="*", help="For search: words to look for (all must match unless --any); for backlinks/links: a note path or name")
+  parser.add_argument("--team", action="append", default=[], help="Only notes of this team ('shared' for vault-wide stores); repeatable")
+  parser.add_argument("--store", action="append", default=[], help="Only notes in this store, e.g. memory_store, adr_store, skill_store or skill_store/comms; repeatable")
+  parser.add_argument("--limit", type=int, default=20, help="Maximum search results (default: 20)")
+  parser.add_argument("--any", action="store_true", help="Match notes containing any of the words instead of all")
+  parser.add_argument("--dry-run", action="store_true", help="For sync-backlinks: print the header changes without writing")
+  parser.add_argument("--workspace-root", help="Project root (default: parent of .codex-workflow)")
+  parser.add_argument("--no-cache", action="store_true", help="Use a throwaway in-memory index instead of .codex-workflow/cache/vault/")
+  parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+  parser.set_defaults(startup_profile=False, timings=False, trace=None)
+  args = parser.parse_args(argv)
+  if args.action in ("search", "backlinks", "links") and not args.query:
+    parser.error(f"{args.action} requires {'a query' if args.action == 'search' else 'a note'}")
+
+  workflow_root, project_root, _ = _load_cli_context(args)
+  vault_index = _lazy_import("vault_index")
+  db_path = ":memory:" if args.no_cache else str(_workspace_cache_path(workflow_root, project_root, "vault", ".sqlite"))
+  if args.action == "reindex" and db_path != ":memory:" and os.path.exists(db_path):
+    os.remove(db_path)
+
+  with vault_index.VaultIndex(db_path, project_root) as index:
+    with _TRACER.span("vault_refresh", "vault"):
+      refreshed = index.refresh()
+    if args.action == "search":
+      payload: Dict[str, Any] = {
+        "query": " ".join(args.query),
+        "results": index.search(" ".join(args.query), args.team, args.store, args.limit, args.any),
+      }
+    elif args.action == "stats":
+      payload = {"counts": index.store_counts()}
+    elif args.action in ("backlinks", "links"):
+      note = index.resolve_note(" ".join(args.query))
+      if note is None:
+        print(f"Note not found in vault index: {' '.join(args.query)}", file=sys.stderr)
+        return 1
+      if args.action == "backlinks":
+        payload = {"note": f"{vault_index.VAULT_DIR}/{note}", "backlinks": [f"{vault_index.VAULT_DIR}/{path}" for path in index.backlinks(note)]}
+      else:
+        payload = {"note": f"{vault_index.VAULT_DIR}/{note}", "links": index.forward_links(note)}
+    elif args.action == "orphans":
+      payload = {"orphans": [f"{vault_index.VAULT_DIR}/{path}" for path in index.orphans()]}
+    elif args.action == "broken":
+      payload = {"broken": index.broken_links()}
+    elif args.action == "sync-backlinks":
+      payload = {"changes": index.sync_backlink_headers(dry_run=args.dry_run), "dry_run": args.dry_run}
+    else:
+      payload = {"index": db_path}
+  payload["refreshed"] = refreshed
+
+  if args.json:
+    print(json.dumps(payload, indent=2, sort_keys=True))
+  elif args.action == "search":
+    for hit in payload["results"]:
+      print(f"{hit['path']}  [{hit['team']}/{hit['store']}] {hit['score']:.2f}")
+      print(f"    {hit['snippet']}")
+    print(f"{len(payload['results'])} result(s)")
+  elif args.action == "stats":
+    for team, stores in payload["counts"].items():
+      print(f"{team}: " + ", ".join(f"{store}={count}" for store, count in stores.items()))
+  elif args.action == "backlinks":
+    for path in payload["backlinks"]:
+      print(path)
+  elif args.action == "links":
+    for link in payload["links"]:
+      print(f"{link['scope']:8} {link['target']}")
+  elif args.action == "orphans":
+    for path in payload["orphans"]:
+      print(path)
+  elif args.action == "broken":
+    for link in payload["broken"]:
+      print(f"{link['source']} -> {link['target']}")
+  elif args.action == "sync-backlinks":
+    prefix = "[dry-run] " if args.dry_run else ""
+    for change in payload["changes"]:
+      print(f"{prefix}{change['path']}: {change['new']}")
+    print(f"{prefix}{len(payload['changes'])} header(s) updated")
+  else:
+    print(f"Indexed {refreshed['indexed']} note(s) into {db_path}")
+  if args.action == "search":
+    return 0 if payload["results"] else 1
+  if args.action == "broken":
+    return 1 if payload["broken"] else 0
+  return 0
+
+
+def _context_indexes_root(args: argparse.Namespace, workflow_root: Path, project_root: Path) -> Optional[Path]:
+  if args.indexes:
+    return Path(args.indexes).expanduser().resolve()
+  for candidate in (project_root / ".claude-workflow" / "indexes", workflow_root.parent / "claude-workflow" / "indexes"):
+    if (candidate / "work-type-index.md").is_file():
+      return candidate
+  return None
+
+
+def _build_context_pack(
+  packer: Any,
+  lookup: Dict[str, Any],
+  indexes_root: Path,
+  project_root: Path,
+  team_id: str,
+  team_profile: Dict[str, Any],
+  work_type: str,
+  matched: List[str],
+  terms: List[str],
+  budget: int,
+  vault_db: str
+) -> tuple[Dict[str, Any], List[Path]]:
+  """Rank and assemble a pack; also returns the files and folders it depends on."""
+  context_pack = _lazy_import("context_pack")
+  default_paths = team_profile.get("default_paths", {})
+  memory_dirs = [project_root / default_paths[key] for key in ("memory_store", "memory_root") if default_paths.get(key)]
+  pattern_dirs = [indexes_root.parent / "patterns" / "active"] + [directory / "patterns" for directory in memory_dirs]
+  decisions_root = project_root / default_paths.get("architecture_root", "dev_communication/shared/architecture") / "decisions"
+  pattern_files = context_pack.source_files(pattern_dirs)
+  adr_files = context_pack.adr_files(decisions_root, lookup["adrs"])
+
+  memory_hits: List[str] = []
+  if terms:
+    vault_index = _lazy_import("vault_index")
+    with _TRACER.span("vault_search", "context"), vault_index.VaultIndex(vault_db, project_root) as index:
+      index.refresh()
+      hits = index.search(" ".join(terms), [team_id, "shared"], ["memory_store"], 10, True)
+    pattern_paths = {str(path) for path in pattern_files.values()}
+    memory_hits = [hit["path"] for hit in hits if str(project_root / hit["path"]) not in pattern_paths]
+
+  candidates = context_pack.rank_candidates(lookup, work_type, terms, pattern_files, adr_files, memory_hits)
+  with _TRACER.span("assemble_pack", "context"):
+    payload = context_pack.assemble_pack(packer, lookup, work_type, matched, candidates, budget, team_id)
+  deps = [indexes_root / name for name in context_pack.INDEX_FILES] + pattern_dirs + [decisions_root]
+  for directory in memory_dirs:
+    deps.append(directory)
+    try:
+      with os.scandir(directory) as entries:
+        deps.extend(Path(entry.path) for entry in entries if entry.is_dir())
+    except OSError:
+      pass
+  deps.extend(candidate["path"] for candidate in candidates if candidate["path"])
+  deps.extend(project_root / rel for rel in memory_hits)
+  return payload, deps
+
+
+def _run_context(argv: List[str]) -> int:
+  parser = argparse.ArgumentParser(
+    prog="install_team.py context",
+    description="Build a token-budgeted context pack (ADRs, patterns, memory) for a work type into the team context_store"
+  )
+  parser.add_argument("request", nargs="*", help="Request text or topic; the work type is inferred from its keywords unless --work-type is given")
+  parser.add_argument("--work-type", help="Work type from work-type-index.md, e.g. new-endpoint, bug-fix (default: inferred, else the index default)")
+  parser.add_argument("--budget", type=int, help="Token budget for the pack (default: 2000, estimated at 4 characters per token)")
+  parser.add_argument("--indexes", help="Directory with work-type-index.md, pattern-index.md and adr-index.md (default: .claude-workflow/indexes)")
+  parser.add_argument("--rebuild", action="store_true", help="Ignore a cached pack and rebuild it (summaries stay cached by content hash)")
+  parser.add_argument("--print-path", action="store_true", help="Print only the path of the written pack")
+  _add_team_context_arguments(parser)
+  args = parser.parse_args(argv)
+
+  context = _resolve_team_context(args)
+  if context is None:
+    return 2
+  workflow_root, project_root, team_id, team_profile = context
+  indexes_root = _context_indexes_root(args, workflow_root, project_root)
+  if indexes_root is None:
+    print("Error: work-type-index.md not found under .claude-workflow/indexes; pass --indexes.", file=sys.stderr)
+    return 2
+  context_pack = _lazy_import("context_pack")
+  budget = args.budget or context_pack.DEFAULT_BUDGET
+  db_path = ":memory:" if args.no_cache else str(_workspace_cache_path(workflow_root, project_root, "context", ".sqlite"))
+  vault_db = ":memory:" if args.no_cache else str(_workspace_cache_path(workflow_root, project_root, "vault", ".sqlite"))
+  request = " ".join(args.request)
+
+  with context_pack.ContextPacker(db_path, project_root) as packer:
+    with _TRACER.span("compile_indexes", "context"):
+      lookup = packer.lookup(indexes_root)
+    if args.work_type:
+      if args.work_type not in lookup["work_types"]:
+        print(f"Unknown work type: {args.work_type} (known: {', '.join(lookup['work_types'])})", file=sys.stderr)
+        return 2
+      work_type, matched = args.work_type, []
+    else:
+      work_type, matched = context_pack.infer_work_type(lookup, request)
+    terms = [term for term in context_pack.query_terms(request) if term not in work_type.split("-")]
+    key = context_pack.pack_key(team_id, work_type, budget, terms)
+    payload = None if args.rebuild else packer.cached_pack(key)
+    cached = payload is not None
+    if payload is None:
+      payload, deps = _build_context_pack(
+        packer, lookup, indexes_root, project_root, team_id, team_profile, work_type, matched, terms, budget, vault_db
+      )
+      packer.store_pack(key, payload, deps)
+    summary_stats = dict(packer.stats)
+
+  default_paths = team_profile.get("default_paths", {})
+  context_store = project_root / default_paths.get("context_store", f"ai_team_config/{team_id}/context_store")
+  pack_path = context_store / f"pack-{work_type}.md"
+  try:
+    current = pack_path.read_text(encoding="utf-8")
+  except OSError:
+    current = None
+  if current != payload["markdown"]:
+    context_store.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(pack_path, payload["markdown"])
+
+  if args.json:
+    result = {key: value for key, value in payload.items() if key != "markdown"}
+    result.update({"cached": cached, "path": str(pack_path), "summaries": summary_stats})
+    print(json.dumps(result, indent=2, sort_keys=True))
+  elif args.print_path:
+    print(pack_path)
+  else:
+    sys.stdout.write(payload["markdown"])
+    print(f"Context pack: {pack_path} ({'cached' if cached else 'built'}, ~{payload['tokens']}/{budget} tokens)", file=sys.stderr)
+  return 0
+
+
+def _run_adr(argv: List[str]) -> int:
+  parser = argparse.ArgumentParser(
+    prog="install_team.py adr",
+    description="Answer ADR status/check/gaps/next-id/stale queries from an incremental SQLite index of the architecture folder"
+  )
+  parser.add_argument(
+    "action",
+    nargs="?",
+    default="status",
+    choices=("status", "check", "gaps", "next-id", "stale", "sync-index", "reindex"),
+    help="status: ADR/gap/suggestion counts; check: domain coverage; gaps: open gaps by priority; next-id DOMAIN: next free ADR id; "
+    "stale: ADRs with many later commits touching their domain; sync-index: regenerate adr-index.md rows; reindex: rebuild the index"
+  )
+  parser.add_argument("domain", nargs="?", help="For next-id: domain code, e.g. API; for check: only this domain")
+  parser.add_argument("--indexes", help="Directory holding adr-index.md (default: .claude-workflow/indexes)")
+  parser.add_argument("--min-commits", type=int, default=5, help="For stale: commits touching the domain after the ADR date that make it stale (default: 5)")
+  parser.add_argument("--dry-run", action="store_true", help="For sync-index: report row changes without writing adr-index.md")
+  _add_team_context_arguments(parser)
+  args = parser.parse_args(argv)
+  if args.action == "next-id" and not args.domain:
+    parser.error("next-id requires a DOMAIN code, e.g. API")
+
+  if args.team:
+    context = _resolve_team_context(args)
+    if context is None:
+      return 2
+    workflow_root, project_root, _, team_profile = context
+    architecture_root = team_profile.get("default_paths", {}).get("architecture_root")
+  else:
+    workflow_root, project_root, _ = _load_cli_context(args)
+    architecture_root = None
+  architecture_root = architecture_root or "dev_communication/shared/architecture"
+  architecture_index = _lazy_import("architecture_index")
+  indexes_root = _context_indexes_root(args, workflow_root, project_root)
+  index_path = indexes_root / "adr-index.md" if indexes_root else None
+  db_path = ":memory:" if args.no_cache else str(_workspace_cache_path(workflow_root, project_root, "architecture", ".sqlite"))
+  if args.action == "reindex" and db_path != ":memory:" and os.path.exists(db_path):
+    os.remove(db_path)
+
+  with architecture_index.ArchitectureIndex(db_path, project_root, architecture_root) as index:
+    with _TRACER.span("architecture_refresh", "adr"):
+      refreshed = index.refresh()
+    synced = None
+    if index_path and args.action == "sync-index":
+      # Only sync-index (and the watch daemon) writes adr-index.md; queries just read it.
+      synced = index.sync_adr_index(index_path, dry_run=args.dry_run)
+    index_rows = architecture_index.read_index_rows(index_path) if index_path else {}
+    if args.action == "status":
+      payload: Dict[str, Any] = {"counts": index.status_counts(), "index_only_adrs": len(set(index_rows) - {adr["adr_id"] for adr in index.adrs()})}
+    elif args.action == "check":
+      domains = index.coverage(index_rows)
+      if args.domain:
+        domains = [entry for entry in domains if args.domain.upper() in (entry["code"], (entry["name"] or "").upper())]
+      payload = {"domains": domains, "adrs": index.adrs()}
+    elif args.action == "gaps":
+      payload = {"gaps": index.gaps()}
+    elif args.action == "next-id":
+      payload = {"domain": args.domain.upper(), "adr_id": index.next_adr_id(args.domain, index_rows)}
+    elif args.action == "stale":
+      payload = index.staleness(index_rows, args.min_commits)
+    else:
+      payload = {"index": db_path}
+  payload["refreshed"] = refreshed
+  if synced is not None:
+    payload["adr_index"] = synced
+  elif args.action == "sync-index":
+    print("Error: adr-index.md not found under .claude-workflow/indexes; pass --indexes.", file=sys.stderr)
+    return 2
+
+  if args.json:
+    print(json.dumps(payload, indent=2, sort_keys=True))
+  elif args.action == "status":
+    counts = payload["counts"]
+    for kind, label in (("adr", "ADRs"), ("gap", "Gaps"), ("suggestion", "Suggestions")):
+      by_status = counts.get(kind, {})
+      print(f"{label}: {sum(by_status.values())}" + (" (" + ", ".join(f"{status}={count}" for status, count in by_status.items()) + ")" if by_status else ""))
+    if counts.get("gap_priority"):
+      print("Open gaps by priority: " + ", ".join(f"{priority}={count}" for priority, count in counts["gap_priority"].items()))
+    if payload["index_only_adrs"]:
+      print(f"ADRs listed only in adr-index.md: {payload['index_only_adrs']}")
+  elif args.action == "check":
+    for entry in payload["domains"]:
+      adrs = ", ".join(f"{status}={count}" for status, count in sorted(entry["adrs"].items())) or "no ADRs"
+      print(f"{entry['coverage']:8} {entry['code']:10} {entry['name'] or '-'}: {adrs}; open gaps={entry['open_gaps']} (high={entry['high_gaps']})")
+  elif args.action == "gaps":
+    for gap in payload["gaps"]:
+      suggested = f" -> {gap['suggested_adr']}" if gap["suggested_adr"] else ""
+      print(f"[{gap['priority'] or '-'}] {gap['domain'] or '-'}: {gap['title']}{suggested} ({gap['path']})")
+    print(f"{len(payload['gaps'])} open gap(s)")
+  elif args.action == "next-id":
+    print(payload["adr_id"])
+  elif args.action == "stale":
+    if not payload["available"]:
+      print("Staleness needs a git work tree at the workspace root.", file=sys.stderr)
+      return 1
+    for adr in payload["adrs"]:
+      flag = "STALE" if adr["stale"] else "ok"
+      print(f"{flag:5} {adr['adr_id']:10} {adr['date']} ({adr['age_days']}d): {adr['commits_after']} later commit(s) touching its domain, last {adr['last_touch'] or '-'}")
+  elif args.action == "sync-index":
+    prefix = "[dry-run] " if args.dry_run else ""
+    synced = payload["adr_index"]
+    print(f"{prefix}{synced['path']}: {'updated' if synced['changed'] else 'unchanged'} (added {len(synced['added'])}, updated {len(synced['updated'])})")
+  else:
+    print(f"Indexed {refreshed['parsed']} architecture file(s) into {db_path}")
+  return 0
+
+
+def _run_log(argv: List[str]) -> int:
+  parser = argparse.ArgumentParser(
+    prog="install_team.py log",
+    description="Append to vault logs (notes.md, memory-log.md, index.md) with exact-line dedup from a line-hash sidecar and size-based rotation"
+  )
+  parser.add_argument("action", choices=("append", "rotate", "stats", "reindex"), help="append: add LINEs not already present; rotate: move the log to a dated segment now; stats: size, distinct lines and segments; reindex: rebuild the sidecar")
+  parser.add_argument("file", help="Log file, e.g. ai_team_config/memory_store/memory-log.md (relative to --workspace-root)")
+  parser.add_argument("lines", nargs="*", metavar="LINE", help="For append: lines to add (read from stdin when omitted)")
+  parser.add_argument("--max-bytes", type=int, help="For append: rotate the log into a dated segment before it grows past this size (default: 1 MiB; 0 disables)")
+  parser.add_argument("--workspace-root", help="Project root for relative FILE paths (default: parent of .codex-workflow)")
+  parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+  args = parser.parse_args(argv)
+
+  append_log = _lazy_import("append_log")
+  project_root = Path(args.workspace_root).resolve() if args.workspace_root else Path(__file__).resolve().parents[2]
+  path = project_root / Path(args.file).expanduser()
+  max_bytes = append_log.DEFAULT_MAX_BYTES if args.max_bytes is None else args.max_bytes
+  with append_log.AppendLog(path, max_bytes) as log:
+    if args.action == "append":
+      lines = args.lines or [line.rstrip("\n") for line in sys.stdin]
+      payload: Dict[str, Any] = {"path": str(path), "appended": log.append(lines)}
+      payload["skipped"] = len([line for line in lines if line.strip()]) - len(payload["appended"])
+    elif args.action == "rotate":
+      segment = log.rotate()
+      payload = {"path": str(path), "segment": str(segment) if segment else None}
+    elif args.action == "reindex":
+      payload = {"path": str(path), "lines": log.rebuild()}
+    else:
+      payload = log.stats()
+
+  if args.json:
+    print(json.dumps(payload, indent=2, sort_keys=True))
+  elif args.action == "append":
+    print(f"Appended {len(payload['appended'])} line(s) to {path} ({payload['skipped']} already present)")
+  elif args.action == "rotate":
+    print(f"Rotated {path} -> {payload['segment']}" if payload["segment"] else f"Nothing to rotate in {path}")
+  elif args.action == "reindex":
+    print(f"Indexed {payload['lines']} distinct line(s) from {path} and its segments")
+  else:
+    print(f"{payload['path']}: {payload['bytes']} bytes, {payload['distinct_lines']} distinct line(s), {len(payload['segments'])} segment(s)")
+    for segment in payload["segments"]:
+      print(f"  - {segment['name']} ({segment['rotated_at']}, {segment['lines']} lines, {segment['bytes']} bytes)")
+  return 0
+
+
+def _resolve_team_profiles(project_root: Path, profiles: Dict[str, Any], names: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+  """Profiles (with the repository overlay) of the named teams, else of every registry team (or every profile).
+
+  Prints an error and returns None when a name is unknown.
+  """
+  teams = profiles.get("teams", {})
+  registry = _load_registry(project_root)
+  if names:
+    team_ids = list(dict.fromkeys(_resolve_team_id(name, teams, registry) for name in names))
+    unknown = [team_id for team_id in team_ids if team_id not in teams]
+    if unknown:
+      print(f"Unknown team: {', '.join(unknown)}", file=sys.stderr)
+      return None
+  else:
+    team_ids = [team_id for team_id in registry.team_ids if team_id in teams] or sorted(teams)
+  resolved: Dict[str, Dict[str, Any]] = {}
+  for team_id in team_ids:
+    resolved[team_id], _ = _apply_repo_team_definition(project_root, team_id, json.loads(json.dumps(teams[team_id])), registry)
+  return resolved
+
+
+def _run_export(argv: List[str]) -> int:
+  parser = argparse.ArgumentParser(
+    prog="install_team.py export",
+    description="Stream comms and vault activity (message_created, issue_created, issue_moved, note_appended, adr_added) "
+    "as JSON lines, emitting only events newer than a persisted cursor"
+  )
+  parser.add_argument("--team", action="append", default=[], help="Only this team id or alias (repeatable; default: every team in registry.yaml, else every profile)")
+  parser.add_argument("--output", default="-", help="Append events to this JSONL file instead of stdout")
+  parser.add_argument("--cursor", help="Cursor file (default: .codex-workflow/cache/export/<workspace>[.<teams>].cursor.sqlite, one per --team selection)")
+  parser.add_argument("--baseline", action="store_true", help="Record the current state in the cursor without emitting events (skip the first-run backfill)")
+  parser.add_argument("--reset", action="store_true", help="Forget the cursor and emit every file as new again")
+  parser.add_argument("--workspace-root", help="Project root (default: parent of .codex-workflow)")
+  parser.set_defaults(startup_profile=False, timings=False, trace=None, no_cache=False)
+  args = parser.parse_args(argv)
+
+  workflow_root, project_root, profiles = _load_cli_context(args)
+  resolved = _resolve_team_profiles(project_root, profiles, args.team)
+  if resolved is None:
+    return 2
+  team_ids = list(resolved)
+  architecture_roots = sorted({
+    profile.get("default_paths", {}).get("architecture_root") or "dev_communication/shared/architecture" for profile in resolved.values()
+  })
+
+  activity_export = _lazy_import("activity_export")
+  # A cursor only knows the files of the teams it covers, so --team runs keep their own.
+  scope = "." + "+".join(sorted(team_ids)) if args.team else ""
+  cursor_path = Path(args.cursor).expanduser() if args.cursor else _workspace_cache_path(workflow_root, project_root, "export", f"{scope}.cursor.sqlite")
+  if args.reset and cursor_path.exists():
+    cursor_path.unlink()
+  output = contextlib.nullcontext(sys.stdout) if args.output == "-" else Path(args.output).expanduser().open("a", encoding="utf-8")
+  # One exporter per cursor at a time; a concurrent run would emit the same events twice.
+  with file_lock(cursor_path.with_name(cursor_path.name + ".lock")), activity_export.ActivityExporter(str(cursor_path), project_root) as exporter:
+    first_seq = exporter.seq + 1
+    with output as stream:
+      for event in exporter.events(resolved, architecture_roots, emit=not args.baseline):
+        stream.write(json.dumps(event, sort_keys=True) + "\n")
+      stream.flush()
+      if stream is not sys.stdout:
+        os.fsync(stream.fileno())
+    exporter.commit()
+    emitted = exporter.seq - first_seq + 1
+    counts = exporter.counts
+
+  if args.baseline:
+    print(f"Recorded baseline in {cursor_path}", file=sys.stderr)
+  elif emitted:
+    summary = ", ".join(f"{name}={count}" for name, count in sorted(counts.items()))
+    print(f"Exported {emitted} event(s) (seq {first_seq}-{first_seq + emitted - 1}: {summary})", file=sys.stderr)
+  else:
+    print("No new events", file=sys.stderr)
+  return 0
+
+
+def _archive_store(workflow_root: Path, project_root: Path, segment_bytes: Optional[int] = None) -> Any:
+  """The workspace's ArchiveStore; its writer lock lives in the cache, not next to the committed segments."""
+  archive_store = _lazy_import("archive_store")
+  lock_path = _workspace_cache_path(workflow_root, project_root, "archive", ".lock")
+  if segment_bytes is None:
+    segment_bytes = archive_store.DEFAULT_SEGMENT_BYTES
+  return archive_store.ArchiveStore(project_root, archive_store.ARCHIVE_DIR, lock_path, segment_bytes)
+
+
+def _run_archive(argv: List[str]) -> int:
+  parser = argparse.ArgumentParser(
+    prog="install_team.py archive",
+    description="Pack old completed issues and archived comms threads into compressed, append-only segments "
+    "under dev_communication/archive/packs/, and search, read or restore them"
+  )
+  parser.add_argument(
+    "action",
+    choices=("pack", "search", "show", "restore", "stats"),
+    help="pack: move items older than --older-than days into segments; search WORDS: match archived metadata; "
+    "show ITEM: print an archived document (or list an item's files); restore ITEM: write an item back as loose files; stats: segment and item counts"
+  )
+  parser.add_argument("query", nargs="*", help="For search: words (all must match); for show/restore: an item folder, archived path, issue id or unique name fragment")
+  parser.add_argument("--older-than", type=int, default=30, metavar="DAYS", help="For pack: only items completed/archived at least this many days ago (default: 30)")
+  parser.add_argument("--team", action="append", default=[], help="For pack: only this team's issues_completed folder (repeatable; default: every team); for search: only this team")
+  parser.add_argument("--kind", choices=("issue", "thread"), help="For search: only completed issues or archived threads")
+  parser.add_argument("--limit", type=int, default=50, help="Maximum search results (default: 50)")
+  parser.add_argument("--segment-mb", type=int, default=64, help="For pack: start a new segment once the current one reaches this size (default: 64)")
+  parser.add_argument("--dry-run", action="store_true", help="For pack: list what would be packed without changing files")
+  parser.add_argument("--force", action="store_true", help="For restore: overwrite loose files that already exist")
+  parser.add_argument("--workspace-root", help="Project root (default: parent of .codex-workflow)")
+  parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+  parser.set_defaults(startup_profile=False, timings=False, trace=None, no_cache=False)
+  args = parser.parse_args(argv)
+  if args.action in ("show", "restore") and not args.query:
+    parser.error(f"{args.action} requires an ITEM")
+
+  workflow_root, project_root, profiles = _load_cli_context(args)
+  archive_store = _lazy_import("archive_store")
+  store = _archive_store(workflow_root, project_root, args.segment_mb * 1024 * 1024)
+
+  if args.action == "pack":
+    resolved = _resolve_team_profiles(project_root, profiles, args.team)
+    if resolved is None:
+      return 2
+    completed_dirs = {
+      team_id: profile["default_paths"]["issues_completed"]
+      for team_id, profile in resolved.items() if profile.get("default_paths", {}).get("issues_completed")
+    }
+    candidates = archive_store.find_candidates(project_root, completed_dirs, store.archive_rel, args.older_than)
+    payload: Dict[str, Any] = dict(store.pack(candidates, dry_run=args.dry_run), dry_run=args.dry_run)
+  elif args.action == "search":
+    payload = {"results": store.search(args.query, args.team[0] if args.team else None, args.kind, args.limit)}
+  elif args.action in ("show", "restore"):
+    item, entries = store.find(" ".join(args.query))
+    if item is None:
+      if entries:
+        print("Ambiguous item; matches: " + ", ".join(sorted({entry["item"] for entry in entries})), file=sys.stderr)
+      else:
+        print(f"Not in the archive: {' '.join(args.query)}", file=sys.stderr)
+      return 1
+    if args.action == "restore":
+      try:
+        payload = {"item": item, "restored": store.restore(item, force=args.force)}
+      except FileExistsError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    elif len(entries) > 1:
+      payload = {"item": item, "files": sorted(entries, key=lambda entry: entry["path"])}
+    else:
+      if not args.json:
+        sys.stdout.buffer.write(store.read(entries[0]))
+        return 0
+      payload = dict(entries[0], text=store.read(entries[0]).decode("utf-8", errors="replace"))
+  else:
+    payload = store.stats()
+
+  if args.json:
+    print(json.dumps(payload, indent=2, sort_keys=True))
+  elif args.action == "pack":
+    prefix = "[dry-run] " if args.dry_run else ""
+    for item in payload["items"]:
+      print(f"{prefix}packed {item['kind']:6} {item['item']} ({item['files']} file(s))")
+    ratio = f", {payload['packed_bytes']} bytes stored" if not args.dry_run else ""
+    print(f"{prefix}{len(payload['items'])} item(s), {payload['files']} file(s), {payload['bytes']} bytes{ratio}")
+  elif args.action == "search":
+    for entry in payload["results"]:
+      label = entry.get("issue_id") or entry["item"].rsplit("/", 1)[-1]
+      print(f"{entry.get('date') or '----------'} [{entry.get('status') or '-'}] {label}: {entry.get('subject') or '-'} ({entry['path']})")
+    print(f"{len(payload['results'])} result(s)")
+    return 0 if payload["results"] else 1
+  elif args.action == "show":
+    for entry in payload["files"]:
+      print(f"{entry['path']} ({entry['size']} bytes, {entry['segment']}@{entry['offset']})")
+  elif args.action == "restore":
+    for path in payload["restored"]:
+      print(f"Restored {path}")
+  else:
+    print(f"{payload['root']}: {payload['segments']} segment(s), {payload['segment_bytes']} bytes")
+    print(f"Documents: {payload['documents']} ({payload['original_bytes']} bytes unpacked); items: " + (", ".join(f"{kind}={count}" for kind, count in sorted(payload["items"].items())) or "none"))
+    if payload["dead_bytes"]:
+      print(f"Restored/superseded records still in segments: {payload['dead_bytes']} bytes")
+  return 0
+
+
+_WATCH_QUERIES = (
+  "profile", "comms.check", "comms.status", "comms.next-issue", "vault.search", "vault.stats", "vault.backlinks",
+  "adr.status", "adr.check", "adr.gaps", "adr.next-id", "refresh", "ping", "stop",
+)
+
+
+class _WatchSession:
+  """Team profile and open indexes kept current by ``install_team.py watch``.
+
+  Each batch of changed paths is mapped to the work it invalidates: the profile
+  (profiles.json, registry.yaml, team definitions), the comms, vault and
+  architecture indexes, and the adr-index.md rows. Indexes stay open between
+  batches, so queries are plain SQLite reads.
+  """
+
+  def __init__(self, args: argparse.Namespace, workflow_root: Path, project_root: Path) -> None:
+    self.args = args
+    self.workflow_root = workflow_root
+    self.project_root = project_root
+    self.profiles_path = workflow_root / "teams" / "profiles.json"
+    self.config_path = workflow_root / "config" / "active-team.json"
+    self.indexes_root = _context_indexes_root(args, workflow_root, project_root)
+    self.index_rows: Dict[str, Dict[str, str]] = {}
+    self.team_id: Optional[str] = None
+    self.team_profile: Dict[str, Any] = {}
+    self.profile_source = ""
+    self.profile_files: set[Path] = set()
+    self.comms = _lazy_import("comms").CommsIndex(self._db_path("comms"), project_root)
+    self.vault = _lazy_import("vault_index").VaultIndex(self._db_path("vault"), project_root)
+    self.architecture: Any = None
+
+  def _db_path(self, kind: str) -> str:
+    return ":memory:" if self.args.no_cache else str(_workspace_cache_path(self.workflow_root, self.project_root, kind, ".sqlite"))
+
+  def close(self) -> None:
+    self.comms.close()
+    self.vault.close()
+    if self.architecture is not None:
+      self.architecture.close()
+
+  @property
+  def architecture_root(self) -> str:
+    return self.team_profile.get("default_paths", {}).get("architecture_root") or "dev_communication/shared/architecture"
+
+  def roots(self) -> List[Path]:
+    roots = [
+      self.profiles_path.parent,
+      self.project_root / "dev_communication",
+      self.project_root / "ai_team_config",
+      self.project_root / self.architecture_root,
+    ]
+    if self.indexes_root:
+      roots.append(self.indexes_root)
+    return roots
+
+  def _manifest(self) -> Dict[str, Any]:
+    try:
+      return json.loads(self.config_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+      return {}
+
+  def resolve_profile(self) -> Dict[str, Any]:
+    """Re-resolve the team profile; rewrites active-team.json only when it changed."""
+    with _YAML_CACHE_LOCK:
+      # Entries for superseded file versions would otherwise pile up in a long-lived process.
+      _YAML_CACHE.clear()
+      _REGISTRY_CACHE.clear()
+    teams = _load_profiles(self.profiles_path).get("teams", {})
+    registry = _load_registry(self.project_root)
+    manifest = self._manifest()
+    if self.args.team:
+      team_id: Optional[str] = _resolve_team_id(self.args.team, teams, registry)
+    elif manifest.get("team_id") in teams and manifest.get("project_root") == str(self.project_root):
+      team_id = manifest["team_id"]
+    else:
+      team_id = _detect_team_from_project(self.project_root, teams, registry)
+    if not team_id or team_id not in teams:
+      raise ValueError(f"Unknown team: {self.args.team}" if self.args.team else "no team given, installed or detected; pass --team")
+    profile = json.loads(json.dumps(teams[team_id]))
+    profile, source = _apply_repo_team_definition(self.project_root, team_id, profile, registry)
+    changed = self.team_id is not None and (team_id, profile) != (self.team_id, self.team_profile)
+    self.team_id, self.team_profile, self.profile_source = team_id, profile, source
+    self.profile_files = {self.profiles_path, _registry_path(self.project_root)}
+    self.profile_files.update(
+      self.project_root / "dev_communication" / entry["definition"] for entry in registry.entries if entry["definition"]
+    )
+
+    written = False
+    store_paths = manifest.get("team_store_paths")
+    if manifest.get("team_id") == team_id and manifest.get("project_root") == str(self.project_root) and store_paths:
+      profile_with_store = _profile_with_store(profile, store_paths)
+      if (manifest.get("team_profile"), manifest.get("team_profile_source")) != (profile_with_store, source):
+        atomic_write_text(self.config_path, _json_text(dict(manifest, team_profile=profile_with_store, team_profile_source=source)))
+        written = True
+    return {"team": team_id, "changed": changed, "active_team_written": written}
+
+  def apply(self, paths: set[Path], full: bool = False) -> Dict[str, Any]:
+    """Refresh whatever ``paths`` invalidate; returns a per-area summary."""
+    full = full or any(path in self.roots() for path in paths)
+
+    def touched(root: Optional[Path]) -> bool:
+      return root is not None and (full or any(path == root or root in path.parents for path in paths))
+
+    summary: Dict[str, Any] = {}
+    architecture_root = self.architecture_root
+    if full or self.team_id is None or paths & self.profile_files:
+      try:
+        summary["profile"] = self.resolve_profile()
+      except (OSError, ValueError) as exc:
+        if self.team_id is None:
+          raise
+        summary["profile"] = {"team": self.team_id, "error": str(exc)}
+    profile_changed = bool(summary.get("profile", {}).get("changed"))
+    if profile_changed or touched(self.project_root / "dev_communication"):
+      summary["comms"] = self.comms.refresh(self.team_id, self.team_profile.get("default_paths", {}))
+    if touched(self.project_root / "ai_team_config"):
+      summary["vault"] = self.vault.refresh()
+    if self.architecture is None or architecture_root != self.architecture_root:
+      if self.architecture is not None:
+        self.architecture.close()
+      self.architecture = _lazy_import("architecture_index").ArchitectureIndex(
+        self._db_path("architecture"), self.project_root, self.architecture_root
+      )
+      full = True
+    if touched(self.project_root / self.architecture_root):
+      summary["architecture"] = self.architecture.refresh()
+      if self.indexes_root and (self.indexes_root / "adr-index.md").is_file():
+        synced = self.architecture.sync_adr_index(self.indexes_root / "adr-index.md")
+        if synced["changed"]:
+          summary["adr_index"] = synced
+    if touched(self.indexes_root):
+      architecture_index = _lazy_import("architecture_index")
+      self.index_rows = architecture_index.read_index_rows(self.indexes_root / "adr-index.md")
+      summary["indexes"] = {"adr_rows": len(self.index_rows)}
+    return summary
+
+  def query(self, request: Dict[str, Any]) -> Dict[str, Any]:
+    """Answer one socket request: ``{"query": NAME, "args": [...], ...}``."""
+    name = request["query"]
+    args = [str(arg) for arg in request.get("args") or []]
+
+    def as_list(key: str) -> List[str]:
+      value = request.get(key) or []
+      return [value] if isinstance(value, str) else [str(item) for item in value]
+
+    team_id = self.team_id
+    if name == "profile":
+      return {"team": team_id, "source": self.profile_source, "profile": self.team_profile}
+    if name == "comms.check":
+      return self.comms.check_summary(team_id)
+    if name == "comms.status":
+      return {"team": team_id, "counts": self.comms.status_counts(team_id), "mismatched": self.comms.mismatched_status(team_id)}
+    if name == "comms.next-issue":
+      prefix = (args[0] if args else request.get("prefix") or self.team_profile.get("issue_prefix") or "").upper()
+      if not prefix:
+        raise ValueError(f"team {team_id} has no issue_prefix; pass a prefix")
+      archived = _archive_store(self.workflow_root, self.project_root).max_issue_number(prefix, team_id)
+      number = self.comms.next_issue_number(team_id, prefix, archived)
+      return {"team": team_id, "prefix": prefix, "number": number, "issue_id": f"{prefix}-{number:03d}"}
+    if name == "vault.search":
+      text = " ".join(args) or str(request.get("text") or "")
+      if not text:
+        raise ValueError("vault.search needs words to look for")
+      limit = int(request.get("limit") or 20)
+      match_any = str(request.get("any", "")).lower() in ("1", "true", "yes")
+      return {"query": text, "results": self.vault.search(text, as_list("team"), as_list("store"), limit, match_any)}
+    if name == "vault.stats":
+      return {"counts": self.vault.store_counts()}
+    if name == "vault.backlinks":
+      vault_index = _lazy_import("vault_index")
+      note = self.vault.resolve_note(" ".join(args) or str(request.get("note") or ""))
+      if note is None:
+        raise ValueError(f"note not found in vault index: {' '.join(args)}")
+      return {"note": f"{vault_index.VAULT_DIR}/{note}", "backlinks": [f"{vault_index.VAULT_DIR}/{path}" for path in self.vault.backlinks(note)]}
+    if name == "adr.status":
+      return {"counts": self.architecture.status_counts()}
+    if name == "adr.check":
+      return {"domains": self.architecture.coverage(self.index_rows)}
+    if name == "adr.gaps":
+      return {"gaps": self.architecture.gaps()}
+    if name == "adr.next-id":
+      domain = args[0] if args else str(request.get("domain") or "")
+      if not domain:
+        raise ValueError("adr.next-id needs a domain code, e.g. API")
+      return {"domain": domain.upper(), "adr_id": self.architecture.next_adr_id(domain, self.index_rows)}
+    if name == "refresh":
+      return self.apply(set(), full=True)
+    raise ValueError(f"unknown query {name!r}; known: {', '.join(_WATCH_QUERIES)}")
+
+
+def _print_watch_batch(args: argparse.Namespace, changes: int, summary: Dict[str, Any]) -> None:
+  stamp = time.strftime("%H:%M:%S")
+  if args.json:
+    print(json.dumps(dict(summary, time=stamp, changes=changes), sort_keys=True), flush=True)
+    return
+  parts = []
+  profile = summary.get("profile")
+  if profile:
+    if profile.get("error"):
+      parts.append(f"profile error ({profile['error']}), keeping {profile['team']}")
+    else:
+      state = "changed" if profile["changed"] else "resolved" if not changes else "unchanged"
+      parts.append(f"profile {profile['team']} {state}" + (", active-team.json rewritten" if profile["active_team_written"] else ""))
+  for area in ("comms", "vault", "architecture"):
+    counts = summary.get(area)
+    if counts is not None:
+      changed = " ".join(f"{key}={value}" for key, value in counts.items() if value and key != "unchanged")
+      parts.append(f"{area} {changed or 'up to date'}")
+  if summary.get("adr_index"):
+    parts.append("adr-index.md synced")
+  print(f"[{stamp}] {changes} change(s): " + ("; ".join(parts) or "nothing to refresh"), file=sys.stderr, flush=True)
+
+
+def _run_watch(argv: List[str]) -> int:
+  parser = argparse.ArgumentParser(
+    prog="install_team.py watch",
+    description="Keep the active team profile and the comms/vault/architecture indexes current as files change, "
+    "and answer queries from them over a local Unix socket"
+  )
+  parser.add_argument(
+    "action",
+    nargs="?",
+    default="start",
+    choices=("start", "query", "status", "stop"),
+    help="start: run the watcher in the foreground; query NAME [ARG...]: ask the running watcher; status: its counters; stop: shut it down"
+  )
+  parser.add_argument(
+    "query",
+    nargs="*",
+    metavar="ARG",
+    help="For query: a query name and its arguments, e.g. comms.check, 'vault.search retry backoff', 'adr.next-id API'. "
+    f"Names: {', '.join(_WATCH_QUERIES)}"
+  )
+  parser.add_argument("--param", action="append", default=[], metavar="KEY=VALUE", help="For query: extra request field, e.g. store=memory_store, team=backend or limit=5 (repeatable)")
+  parser.add_argument("--socket", help="Unix socket path (default: .codex-workflow/cache/watch/<workspace>.sock)")
+  parser.add_argument("--poll", action="store_true", help="Poll size/mtime snapshots instead of using inotify")
+  parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polling scans (default: 1.0)")
+  parser.add_argument("--debounce", type=float, default=0.25, help="Quiet period in seconds that closes a burst of changes into one refresh (default: 0.25)")
+  parser.add_argument("--indexes", help="Directory holding adr-index.md (default: .claude-workflow/indexes)")
+  _add_team_context_arguments(parser)
+  args = parser.parse_args(argv)
+  if args.action == "query" and not args.query:
+    parser.error("query requires a query NAME")
+
+  workflow_root, project_root, _ = _load_cli_context(args)
+  watch_daemon = _lazy_import("watch_daemon")
+  socket_path = Path(args.socket).expanduser() if args.socket else _workspace_cache_path(workflow_root, project_root, "watch", ".sock")
+
+  if args.action != "start":
+    request: Dict[str, Any] = {"query": {"status": "ping", "stop": "stop"}.get(args.action) or args.query[0]}
+    if args.action == "query":
+      request["args"] = args.query[1:]
+    for item in args.param:
+      key, _, value = item.partition("=")
+      if key in request:
+        request[key] = [request[key], value] if isinstance(request[key], str) else request[key] + [value]
+      else:
+        request[key] = value
+    try:
+      reply = watch_daemon.query(socket_path, request)
+    except OSError as exc:
+      print(f"No watch daemon on {socket_path} ({exc}); start one with 'install_team.py watch'.", file=sys.stderr)
+      return 1
+    if not reply.get("ok"):
+      print(f"Error: {reply.get('error')}", file=sys.stderr)
+      return 1
+    result = reply["result"]
+    if args.action == "status" and not args.json:
+      unit = "watch(es)" if result["backend"] == "inotify" else "file(s)"
+      print(f"pid {result['pid']}: {result['backend']}, {result['watches']} {unit}, {result['events']} event(s), {result['batches']} batch(es), {result['queries']} query(ies)")
+    elif args.action == "stop" and not args.json:
+      print(f"Stopping watch daemon on {socket_path}")
+    else:
+      print(json.dumps(result, indent=2, sort_keys=True))
+    return 0
+
+  session = _WatchSession(args, workflow_root, project_root)
+  try:
+    try:
+      startup = session.apply(set(), full=True)
+    except (OSError, ValueError) as exc:
+      print(f"Error: {exc}", file=sys.stderr)
+      return 2
+    try:
+      listener = watch_daemon.bind_socket(socket_path)
+    except RuntimeError as exc:
+      print(f"Error: {exc}", file=sys.stderr)
+      return 1
+    except OSError as exc:
+      print(f"Error: cannot listen on {socket_path} ({exc}); pass --socket with a shorter path.", file=sys.stderr)
+      return 1
+    signal = _lazy_import("signal")
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+      with watch_daemon.TreeWatcher(session.roots(), poll=args.poll) as watcher:
+        print(
+          f"Watching {project_root} for team {session.team_id} ({watcher.backend}, {watcher.watch_count} "
+          f"{'watches' if watcher.backend == 'inotify' else 'files'}); queries on {socket_path}",
+          file=sys.stderr,
+          flush=True
+        )
+        _print_watch_batch(args, 0, startup)
+
+        def on_changes(paths: set[Path]) -> None:
+          _print_watch_batch(args, len(paths), session.apply(paths))
+
+        server = watch_daemon.WatchServer(watcher, listener, on_changes, session.query, args.debounce, args.interval)
+        with contextlib.suppress(KeyboardInterrupt):
+          server.serve()
+    finally:
+      listener.close()
+      with contextlib.suppress(OSError):
+        socket_path.unlink()
+  finally:
+    session.close()
+  return 0
+
+
+def _run_reflect(argv: List[str]) -> int:
+  parser = argparse.ArgumentParser(
+    prog="install_team.py reflect",
+    description="Match working-tree changes against the active patterns and report patterns followed, new pattern candidates and ADR gaps; "
+    "candidates are recorded in the team skill_store/reflect/memory_store"
+  )
+  parser.add_argument("paths", nargs="*", help="Only changes under these paths (git pathspecs; default: the whole work tree)")
+  parser.add_argument("--base", default="HEAD", help="Revision the working tree (or the index with --staged) is compared with (default: HEAD)")
+  parser.add_argument("--staged", action="store_true", help="Only staged changes (git diff --cached); untracked files are left out")
+  parser.add_argument("--no-untracked", action="store_true", help="Leave out untracked files (by default they are scored as new files)")
+  parser.add_argument("--jobs", type=int, help="Worker processes for diffs larger than one batch of files (default: CPU count)")
+  parser.add_argument("--threshold", type=float, help="Share of a pattern's distinctive signals a file must use to follow it (default: 0.3; twice that outside the pattern's file locations)")
+  parser.add_argument("--min-files", type=int, help="New files that must share a location and suffix to form a pattern candidate (default: 2)")
+  parser.add_argument("--indexes", help="Directory with work-type-index.md, pattern-index.md and adr-index.md (default: .claude-workflow/indexes)")
+  parser.add_argument("--dry-run", action="store_true", help="Report only; do not record candidates in the reflect memory store")
+  _add_team_context_arguments(parser)
+  args = parser.parse_args(argv)
+
+  context = _resolve_team_context(args)
+  if context is None:
+    return 2
+  workflow_root, project_root, team_id, team_profile = context
+  reflect_analyzer = _lazy_import("reflect_analyzer")
+  threshold = reflect_analyzer.DEFAULT_THRESHOLD if args.threshold is None else args.threshold
+  min_files = reflect_analyzer.DEFAULT_MIN_FILES if args.min_files is None else args.min_files
+  started = time.perf_counter()
+
+  default_paths = team_profile.get("default_paths", {})
+  indexes_root = _context_indexes_root(args, workflow_root, project_root)
+  summaries: Dict[str, str] = {}
+  adr_ids: Optional[List[str]] = None
+  if indexes_root is not None:
+    context_pack = _lazy_import("context_pack")
+    context_db = ":memory:" if args.no_cache else str(_workspace_cache_path(workflow_root, project_root, "context", ".sqlite"))
+    with context_pack.ContextPacker(context_db, project_root) as packer:
+      lookup = packer.lookup(indexes_root)
+    summaries = {pattern_id: pattern["summary"] for pattern_id, pattern in lookup["patterns"].items()}
+    adr_ids = list(lookup["adrs"])
+  patterns_root = indexes_root.parent if indexes_root else project_root / ".claude-workflow"
+  memory_dirs = [project_root / default_paths[key] for key in ("memory_store", "memory_root") if default_paths.get(key)]
+  pattern_dirs = [patterns_root / "patterns" / "active"] + [directory / "patterns" for directory in memory_dirs]
+  db_path = ":memory:" if args.no_cache else str(_workspace_cache_path(workflow_root, project_root, "reflect", ".sqlite"))
+  with reflect_analyzer.SignatureCache(db_path) as cache:
+    with _TRACER.span("compile_signatures", "reflect"):
+      signatures = cache.load(reflect_analyzer.pattern_files(pattern_dirs))
+    signature_stats = dict(cache.stats)
+  if not signatures:
+    print(f"Error: no pattern documents under {pattern_dirs[0]}; pass --indexes.", file=sys.stderr)
+    return 2
+  signatures = reflect_analyzer.weigh_signatures(
+    [reflect_analyzer.with_summary(signature, summaries.get(signature["name"])) for signature in signatures]
+  )
+
+  changes = reflect_analyzer.stream_changes(project_root, args.base, args.staged, not args.no_untracked, args.paths)
+  try:
+    with _TRACER.span("score_changes", "reflect"):
+      results, workers = reflect_analyzer.score_changes(changes, signatures, project_root, threshold, args.jobs)
+  except RuntimeError as exc:
+    print(f"Error: {exc}", file=sys.stderr)
+    return 2
+  report = reflect_analyzer.build_report(results, signatures, adr_ids, min_files)
+
+  skill_store = project_root / default_paths.get("skill_store_root", f"ai_team_config/{team_id}/skill_store")
+  memory_store = skill_store / "reflect" / "memory_store"
+  candidates_path = memory_store / "pattern-candidates.md"
+  recorded: List[str] = []
+  if report["candidates"] and not args.dry_run:
+    append_log = _lazy_import("append_log")
+    try:
+      note: Optional[str] = candidates_path.relative_to(project_root).with_suffix("").as_posix()
+    except ValueError:
+      note = None
+    if not candidates_path.exists():
+      memory_store.mkdir(parents=True, exist_ok=True)
+      backlink = f"Backlinks: [[{note.rsplit('/', 1)[0]}/index]]\n\n" if note else ""
+      atomic_write_text(candidates_path, f"# Pattern Candidates\n\n{backlink}Recorded by `install_team.py reflect`; promote with a pattern draft.\n\n")
+    today = _lazy_import("datetime").date.today().isoformat()
+    with append_log.AppendLog(candidates_path, append_log.DEFAULT_MAX_BYTES) as log:
+      recorded = log.append(reflect_analyzer.candidate_lines(report["candidates"], today))
+    if note and (memory_store / "index.md").is_file():
+      with append_log.AppendLog(memory_store / "index.md") as log:
+        log.append([f"- [[{note}]]"])
+
+  if args.json:
+    payload = dict(report, results=results, recorded=recorded, candidates_path=str(candidates_path), workers=workers,
+                   signatures=signature_stats, seconds=round(time.perf_counter() - started, 3))
+    print(json.dumps(payload, indent=2, sort_keys=True))
+    return 0
+  sys.stdout.write(reflect_analyzer.render_report(report))
+  files = report["files"]
+  print(
+    f"Reflect: {files['changed']} changed file(s), {files['matched']} following a pattern, {len(signatures)} pattern(s) "
+    f"({signature_stats['compiled']} compiled), {workers} worker(s), {time.perf_counter() - started:.2f}s"
+    + (f"; {len(recorded)} candidate(s) recorded in {candidates_path}" if recorded else ""),
+    file=sys.stderr
+  )
+  return 0
@@ -0,0 +1,376 @@
+"""
+Incremental SQLite index over the ai_team_config vault.
+
+Every Markdown note under ``ai_team_config/`` is recorded with its team and
+store (``memory_store``, ``context_store``, ``adr_store``,
+``skill_store/<skill>``, ...) and its text is kept in an FTS5 table for ranked
+full-text search with snippets. A refresh walks the vault with os.scandir and
+re-reads only notes whose size or mtime changed; a note whose content hash is
+unchanged (e.g. only touched) just has its stat refreshed.
+
+The same pass extracts ``[[wiki-links]]`` into a ``links`` table (forward
+adjacency by source note, reverse adjacency through an index on the target),
+so backlinks, orphan notes and broken links are answered by indexed lookups.
+Links on ``Backlink(s):`` header lines are navigation metadata and are not
+part of the graph; ``sync_backlink_headers`` adds the graph's missing backlinks to them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+VAULT_DIR = "ai_team_config"
+
+_SCHEMA_VERSION = 3
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+  id INTEGER PRIMARY KEY,
+  path TEXT NOT NULL UNIQUE,
+  name TEXT NOT NULL,
+  team TEXT NOT NULL,
+  store TEXT NOT NULL,
+  title TEXT NOT NULL,
+  size INTEGER NOT NULL,
+  mtime_ns INTEGER NOT NULL,
+  sha1 TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notes_team_store ON notes(team, store);
+CREATE INDEX IF NOT EXISTS notes_name ON notes(name);
+CREATE TABLE IF NOT EXISTS links (
+  src_id INTEGER NOT NULL,
+  scope TEXT NOT NULL,
+  target TEXT NOT NULL,
+  label TEXT NOT NULL,
+  PRIMARY KEY (src_id, scope, target)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS links_target ON links(scope, target);
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(title, body, tokenize = 'porter unicode61');
+"""
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_WIKI_LINK = re.compile(r"\[\[([^\[\]\n]+?)\]\]")
+_BACKLINKS_LINE = re.compile(r"^(?P<label>Backlinks?):")
+
+
+def classify(rel_path: str) -> Tuple[str, str]:
+  """Map a vault-relative path to ``(team, store)``; vault-wide notes belong to team ``shared``."""
+  parts = rel_path.split("/")
+  if len(parts) == 1:
+    return "shared", "index"
+  if parts[0] == "memory_store":
+    return "shared", "memory_store"
+  team = parts[0]
+  if len(parts) == 2:
+    return team, "index"
+  if parts[1] == "skill_store" and len(parts) >= 4 and parts[3] == "memory_store":
+    return team, f"skill_store/{parts[2]}"
+  return team, parts[1]
+
+
+def _iter_notes(vault_root: Path) -> Iterator[Tuple[str, os.stat_result]]:
+  stack = [vault_root]
+  while stack:
+    directory = stack.pop()
+    try:
+      with os.scandir(directory) as it:
+        for entry in it:
+          if entry.name.startswith("."):
+            continue
+          if entry.is_dir(follow_symlinks=False):
+            stack.append(Path(entry.path))
+          elif entry.name.endswith(".md") and entry.is_file():
+            yield os.path.relpath(entry.path, vault_root).replace(os.sep, "/"), entry.stat()
+    except OSError:
+      continue
+
+
+def _title(text: str, rel_path: str) -> str:
+  for line in text.splitlines():
+    if line.startswith("# "):
+      return line[2:].strip()
+  return Path(rel_path).stem
+
+
+def link_target(raw: str) -> Optional[Tuple[str, str, str]]:
+  """Normalize ``[[raw]]`` to ``(scope, target, label)``.
+
+  Scope ``vault`` targets are vault-relative paths, ``name`` targets are bare
+  note names (Obsidian shortest-path links, matched case-insensitively, so the
+  target is lowercased) and ``external`` targets are project-relative paths
+  outside the vault. ``label`` keeps the original spelling.
+  """
+  target = raw.split("|", 1)[0].split("#", 1)[0].strip().replace("\\", "/")
+  while target.startswith("./"):
+    target = target[2:]
+  target = target.lstrip("/")
+  if not target:
+    return None
+  if not os.path.splitext(target)[1]:
+    target += ".md"
+  if "/" not in target:
+    return "name", target.lower(), target
+  if target.startswith(f"{VAULT_DIR}/"):
+    return "vault", target[len(VAULT_DIR) + 1:], target
+  return "external", target, target
+
+
+def parse_links(text: str) -> List[Tuple[str, str, str]]:
+  """Distinct wiki-link targets in ``text``, skipping code fences and Backlinks lines."""
+  links: Dict[Tuple[str, str], str] = {}
+  in_fence = False
+  for line in text.splitlines():
+    if line.lstrip().startswith("```"):
+      in_fence = not in_fence
+      continue
+    if in_fence or "[[" not in line or _BACKLINKS_LINE.match(line):
+      continue
+    for raw in _WIKI_LINK.findall(line):
+      target = link_target(raw)
+      if target:
+        links.setdefault(target[:2], target[2])
+  return [(scope, target, label) for (scope, target), label in links.items()]
+
+
+def note_link(rel_path: str) -> str:
+  """Wiki-link for a vault-relative note path, in the installer's ``[[ai_team_config/...]]`` style."""
+  return f"[[{VAULT_DIR}/{rel_path[:-3] if rel_path.endswith('.md') else rel_path}]]"
+
+
+def fts_query(text: str, match_any: bool = False) -> str:
+  """Quote each word of ``text`` for FTS5 (implicit AND, or OR with ``match_any``)."""
+  terms = [f'"{token}"' for token in _TOKEN.findall(text)]
+  return (" OR " if match_any else " ").join(terms)
+
+
+class VaultIndex:
+  def __init__(self, db_path: str, project_root: Path) -> None:
+    """Open (or create) the index at ``db_path`` (``":memory:"`` for a throwaway index)."""
+    self.project_root = project_root
+    self.vault_root = project_root / VAULT_DIR
+    if db_path != ":memory:":
+      Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    self.db = sqlite3.connect(db_path)
+    version = self.db.execute("PRAGMA user_version").fetchone()[0]
+    if version != _SCHEMA_VERSION:
+      self.db.executescript("DROP TABLE IF EXISTS notes; DROP TABLE IF EXISTS notes_fts; DROP TABLE IF EXISTS links;")
+      self.db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    try:
+      self.db.executescript(_SCHEMA)
+    except sqlite3.OperationalError as exc:
+      raise RuntimeError(f"SQLite FTS5 is required for vault search: {exc}") from exc
+
+  def close(self) -> None:
+    self.db.close()
+
+  def __enter__(self) -> "VaultIndex":
+    return self
+
+  def __exit__(self, *exc: Any) -> None:
+    self.close()
+
+  def refresh(self) -> Dict[str, int]:
+    """Sync the index with the vault; returns ``{indexed, touched, unchanged, removed}`` counts."""
+    stats = {"indexed": 0, "touched": 0, "unchanged": 0, "removed": 0}
+    known = {
+      path: (note_id, size, mtime_ns, sha1)
+      for note_id, path, size, mtime_ns, sha1 in self.db.execute("SELECT id, path, size, mtime_ns, sha1 FROM notes")
+    }
+    seen = set()
+    with self.db:
+      for rel, stat in _iter_notes(self.vault_root):
+        seen.add(rel)
+        previous = known.get(rel)
+        if previous and previous[1:3] == (stat.st_size, stat.st_mtime_ns):
+          stats["unchanged"] += 1
+          continue
+        raw = (self.vault_root / rel).read_bytes()
+        digest = hashlib.sha1(raw).hexdigest()
+        if previous and previous[3] == digest:
+          self.db.execute("UPDATE notes SET size = ?, mtime_ns = ? WHERE id = ?", (stat.st_size, stat.st_mtime_ns, previous[0]))
+          stats["touched"] += 1
+          continue
+        self._index_note(rel, raw.decode("utf-8", errors="replace"), stat, digest, previous[0] if previous else None)
+        stats["indexed"] += 1
+      removed = [(known[path][0],) for path in known if path not in seen]
+      if removed:
+        self._remove_notes(removed)
+        stats["removed"] = len(removed)
+    return stats
+
+  def _index_note(self, rel: str, text: str, stat: os.stat_result, digest: str, note_id: Optional[int]) -> int:
+    team, store = classify(rel)
+    title = _title(text, rel)
+    if note_id is None:
+      cursor = self.db.execute(
+        "INSERT INTO notes (path, name, team, store, title, size, mtime_ns, sha1) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (rel, rel.rsplit("/", 1)[-1].lower(), team, store, title, stat.st_size, stat.st_mtime_ns, digest),
+      )
+      note_id = int(cursor.lastrowid)
+    else:
+      self.db.execute(
+        "UPDATE notes SET title = ?, size = ?, mtime_ns = ?, sha1 = ? WHERE id = ?",
+        (title, stat.st_size, stat.st_mtime_ns, digest, note_id),
+      )
+      self.db.execute("DELETE FROM notes_fts WHERE rowid = ?", (note_id,))
+      self.db.execute("DELETE FROM links WHERE src_id = ?", (note_id,))
+    self.db.execute("INSERT INTO notes_fts (rowid, title, body) VALUES (?, ?, ?)", (note_id, title, text))
+    self.db.executemany(
+      "INSERT INTO links (src_id, scope, target, label) VALUES (?, ?, ?, ?)",
+      [(note_id, scope, target, label) for scope, target, label in parse_links(text)],
+    )
+    return note_id
+
+  def _remove_notes(self, note_ids: List[Tuple[int]]) -> None:
+    self.db.executemany("DELETE FROM notes_fts WHERE rowid = ?", note_ids)
+    self.db.executemany("DELETE FROM links WHERE src_id = ?", note_ids)
+    self.db.executemany("DELETE FROM notes WHERE id = ?", note_ids)
+
+  # -- queries ----------------------------------------------------------------
+
+  def search(
+    self,
+    query: str,
+    teams: Optional[List[str]] = None,
+    stores: Optional[List[str]] = None,
+    limit: int = 20,
+    match_any: bool = False
+  ) -> List[Dict[str, Any]]:
+    """Rank notes matching ``query`` with BM25 (title hits weigh more) and return snippets.
+
+    ``stores`` entries match a store exactly or as a prefix, so ``skill_store``
+    covers every ``skill_store/<skill>``.
+    """
+    match = fts_query(query, match_any)
+    if not match:
+      return []
+    sql = (
+      "SELECT n.path, n.team, n.store, n.title, bm25(notes_fts, 5.0, 1.0) AS score, "
+      "snippet(notes_fts, 1, '[', ']', ' ... ', 12) "
+      "FROM notes_fts JOIN notes n ON n.id = notes_fts.rowid WHERE notes_fts MATCH ?"
+    )
+    params: List[Any] = [match]
+    if teams:
+      sql += f" AND n.team IN ({', '.join('?' for _ in teams)})"
+      params.extend(teams)
+    if stores:
+      sql += " AND (" + " OR ".join("n.store = ? OR n.store LIKE ?" for _ in stores) + ")"
+      for store in stores:
+        params.extend([store, f"{store}/%"])
+    sql += " ORDER BY score LIMIT ?"
+    params.append(limit)
+    return [
+      {
+        "path": f"{VAULT_DIR}/{path}",
+        "team": team,
+        "store": store,
+        "title": title,
+        "score": round(-score, 4),
+        "snippet": " ".join(snippet.split()),
+      }
+      for path, team, store, title, score, snippet in self.db.execute(sql, params)
+    ]
+
+  def store_counts(self) -> Dict[str, Dict[str, int]]:
+    counts: Dict[str, Dict[str, int]] = {}
+    for team, store, count in self.db.execute("SELECT team, store, COUNT(*) FROM notes GROUP BY team, store ORDER BY team, store"):
+      counts.setdefault(team, {})[store] = count
+    return counts
+
+  # -- link graph ---------------------------------------------------------------
+
+  def resolve_note(self, name: str) -> Optional[str]:
+    """Vault-relative path for a note given as a path (with or without ``ai_team_config/``) or a name."""
+    target = link_target(name)
+    if target is None:
+      return None
+    scope, value, _ = target
+    if scope == "external":
+      scope, value = "vault", value
+    column = "name" if scope == "name" else "path"
+    row = self.db.execute(f"SELECT path FROM notes WHERE {column} = ? ORDER BY length(path), path LIMIT 1", (value,)).fetchone()
+    return row[0] if row else None
+
+  def backlinks(self, rel_path: str) -> List[str]:
+    """Vault-relative paths of notes linking to ``rel_path``."""
+    rows = self.db.execute(
+      "SELECT DISTINCT n.path FROM links l JOIN notes n ON n.id = l.src_id "
+      "WHERE ((l.scope = 'vault' AND l.target = ?) OR (l.scope = 'name' AND l.target = ?)) AND n.path != ? "
+      "ORDER BY n.path",
+      (rel_path, rel_path.rsplit("/", 1)[-1].lower(), rel_path),
+    )
+    return [path for (path,) in rows]
+
+  def forward_links(self, rel_path: str) -> List[Dict[str, str]]:
+    rows = self.db.execute(
+      "SELECT l.scope, l.label FROM links l JOIN notes n ON n.id = l.src_id WHERE n.path = ? ORDER BY l.scope, l.target",
+      (rel_path,),
+    )
+    return [{"scope": scope, "target": label} for scope, label in rows]
+
+  def orphans(self) -> List[str]:
+    """Notes no other note links to."""
+    rows = self.db.execute(
+      "SELECT n.path FROM notes n WHERE "
+      "NOT EXISTS (SELECT 1 FROM links l WHERE l.scope = 'vault' AND l.target = n.path AND l.src_id != n.id) AND "
+      "NOT EXISTS (SELECT 1 FROM links l WHERE l.scope = 'name' AND l.target = n.name AND l.src_id != n.id) "
+      "ORDER BY n.path"
+    )
+    return [path for (path,) in rows]
+
+  def broken_links(self) -> List[Dict[str, str]]:
+    """Links whose target is neither an indexed note nor an existing project file."""
+    rows = self.db.execute(
+      "SELECT n.path, l.scope, l.label FROM links l JOIN notes n ON n.id = l.src_id WHERE "
+      "(l.scope = 'vault' AND NOT EXISTS (SELECT 1 FROM notes t WHERE t.path = l.target)) OR "
+      "(l.scope = 'name' AND NOT EXISTS (SELECT 1 FROM notes t WHERE t.name = l.target)) OR "
+      "l.scope = 'external' ORDER BY n.path, l.target"
+    )
+    broken = []
+    for path, scope, label in rows:
+      if scope != "vault" and (self.project_root / label).exists():
+        continue
+      broken.append({"source": f"{VAULT_DIR}/{path}", "target": label})
+    return broken
+
+  def sync_backlink_headers(self, dry_run: bool = False) -> List[Dict[str, str]]:
+    """Add missing graph backlinks to each note's existing ``Backlinks:`` line.
+
+    Only notes that already carry such a header line are changed. Links
+    already on the line (including hand-written ones) and its label are kept
+    as written; backlinks from the graph that the line lacks are appended.
+    Returns ``{path, old, new}`` per changed note.
+    """
+    changes = []
+    for (rel,) in self.db.execute("SELECT path FROM notes ORDER BY path").fetchall():
+      sources = self.backlinks(rel)
+      if not sources:
+        continue
+      path = self.vault_root / rel
+      try:
+        lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+      except OSError:
+        continue
+      for position, line in enumerate(lines):
+        if line.startswith("## "):
+          break
+        if not _BACKLINKS_LINE.match(line):
+          continue
+        present = {self.resolve_note(link) for link in _WIKI_LINK.findall(line)}
+        missing = [note_link(source) for source in sources if source not in present]
+        if missing:
+          old_line = line.rstrip("\n")
+          new_line = f"{old_line.rstrip()} {' '.join(missing)}"
+          changes.append({"path": f"{VAULT_DIR}/{rel}", "old": old_line, "new": new_line})
+          if not dry_run:
+            lines[position] = f"{new_line}\n"
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text("".join(lines), encoding="utf-8")
+            os.replace(tmp, path)
+        break
+    return changes
@@ -0,0 +1,412 @@
+"""
+File watching and a local query server for ``install_team.py watch``.
+
+TreeWatcher reports the paths that changed under a set of root folders. On
+Linux it uses inotify through ctypes, with one watch per directory and new
+directories watched as they appear. Roots that do not exist yet are picked up
+once they are created. Where inotify is unavailable (or ``poll=True``) it diffs
+size/mtime snapshots taken with os.scandir.
+
+WatchServer multiplexes the watcher and a Unix socket with selectors. Bursts of
+events are debounced into one batch for ``on_changes``. Newline-delimited JSON
+queries are answered by ``handle_query``; pending batches are flushed first so
+an answer never lags behind a change that was already seen.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import selectors
+import socket
+import struct
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Directories never watched (hidden ones such as .git are skipped as well).
+PRUNE_DIRS = frozenset({"node_modules", "__pycache__", "venv", "dist", "build", "target", "vendor"})
+DEFAULT_DEBOUNCE = 0.25
+DEFAULT_INTERVAL = 1.0
+# A steady stream of events still produces a batch at least this often.
+MAX_DELAY_FACTOR = 8
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = getattr(os, "O_NONBLOCK", 0o4000)
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+  _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+  | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _skip_dir(name: str) -> bool:
+  return name.startswith(".") or name in PRUNE_DIRS
+
+
+def _load_libc() -> Optional[Any]:
+  if not hasattr(os, "uname") or os.uname().sysname != "Linux":
+    return None
+  try:
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+  except (OSError, AttributeError):
+    return None
+  return libc
+
+
+class TreeWatcher:
+  """Changed paths under ``roots``, from inotify or from polling snapshots."""
+
+  def __init__(self, roots: List[Path], poll: bool = False) -> None:
+    self.roots = sorted({Path(root) for root in roots})
+    self.fd: Optional[int] = None
+    self.backend = "polling"
+    self._libc = None if poll else _load_libc()
+    self._wds: Dict[int, Path] = {}
+    self._paths: Dict[Path, int] = {}
+    self._snapshot: Dict[str, Tuple[int, int]] = {}
+    if self._libc is not None:
+      fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+      if fd >= 0:
+        self.fd = fd
+        self.backend = "inotify"
+        for root in self.roots:
+          self._attach(root)
+        return
+    self._snapshot = self._scan()
+
+  def close(self) -> None:
+    if self.fd is not None:
+      os.close(self.fd)
+      self.fd = None
+
+  def __enter__(self) -> "TreeWatcher":
+    return self
+
+  def __exit__(self, *exc: Any) -> None:
+    self.close()
+
+  @property
+  def watch_count(self) -> int:
+    return len(self._wds) if self.fd is not None else len(self._snapshot)
+
+  # -- inotify ------------------------------------------------------------------
+
+  def _add_watch(self, directory: Path) -> bool:
+    if directory in self._paths:
+      return True
+    wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+    if wd < 0:
+      error = ctypes.get_errno()
+      if error == errno.ENOSPC:
+        raise OSError(error, "inotify watch limit reached (fs.inotify.max_user_watches); rerun with --poll")
+      return False
+    self._wds[wd] = directory
+    self._paths[directory] = wd
+    return True
+
+  def _add_tree(self, directory: Path) -> None:
+    stack = [directory]
+    while stack:
+      current = stack.pop()
+      if not self._add_watch(current):
+        continue
+      try:
+        with os.scandir(current) as entries:
+          stack.extend(Path(entry.path) for entry in entries if entry.is_dir(follow_symlinks=False) and not _skip_dir(entry.name))
+      except OSError:
+        continue
+
+  def _attach(self, root: Path) -> None:
+    """Watch ``root`` recursively, or its nearest existing ancestor until it appears."""
+    if root.is_dir():
+      self._add_tree(root)
+      return
+    for parent in root.parents:
+      if parent.is_dir():
+        self._add_watch(parent)
+        return
+
+  def _under_root(self, path: Path) -> bool:
+    return any(path == root or root in path.parents for root in self.roots)
+
+  def read(self) -> Set[Path]:
+    """Drain pending inotify events into the set of changed paths."""
+    changed: Set[Path] = set()
+    while True:
+      try:
+        data = os.read(self.fd, 64 * 1024)
+      except BlockingIOError:
+        break
+      if not data:
+        break
+      offset = 0
+      while offset < len(data):
+        wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+        offset += _EVENT_HEADER.size
+        name = data[offset:offset + length].rstrip(b"\0")
+        offset += length
+        if mask & _IN_Q_OVERFLOW:
+          # Events were dropped: report every root so callers refresh fully.
+          changed.update(self.roots)
+          continue
+        directory = self._wds.get(wd)
+        if directory is None:
+          continue
+        if mask & _IN_IGNORED:
+          del self._wds[wd]
+          self._paths.pop(directory, None)
+          continue
+        path = directory / os.fsdecode(name) if name else directory
+        if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+          if self._under_root(path) and not _skip_dir(path.name):
+            # Files written before the watch existed are reported as well.
+            self._add_tree(path)
+            changed.update(self._files_under(path))
+          elif any(path == root or path in root.parents for root in self.roots):
+            for root in self.roots:
+              if path == root or path in root.parents:
+                self._attach(root)
+            changed.update(self._files_under(path))
+        if self._under_root(path):
+          changed.add(path)
+    return changed
+
+  @staticmethod
+  def _files_under(directory: Path) -> List[Path]:
+    found: List[Path] = []
+    for current, dirs, files in os.walk(directory):
+      dirs[:] = [name for name in dirs if not _skip_dir(name)]
+      found.extend(Path(current) / name for name in files)
+    return found
+
+  # -- polling ------------------------------------------------------------------
+
+  def _scan(self) -> Dict[str, Tuple[int, int]]:
+    snapshot: Dict[str, Tuple[int, int]] = {}
+    for root in self.roots:
+      stack = [str(root)]
+      while stack:
+        try:
+          with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+              if entry.is_dir(follow_symlinks=False):
+                if not _skip_dir(entry.name):
+                  stack.append(entry.path)
+                continue
+              stat = entry.stat(follow_symlinks=False)
+              snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+          continue
+    return snapshot
+
+  def poll(self) -> Set[Path]:
+    """Rescan the roots and return paths added, removed or changed since the last scan."""
+    snapshot = self._scan()
+    previous = self._snapshot
+    self._snapshot = snapshot
+    changed = {path for path, stat in snapshot.items() if previous.get(path) != stat}
+    changed.update(path for path in previous if path not in snapshot)
+    return {Path(path) for path in changed}
+
+
+def bind_socket(path: Path) -> socket.socket:
+  """Listen on the Unix socket ``path``, replacing a stale socket file.
+
+  Raises RuntimeError when another daemon already answers on ``path``.
+  """
+  path.parent.mkdir(parents=True, exist_ok=True)
+  if path.exists():
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+      probe.connect(str(path))
+    except OSError:
+      path.unlink()
+    else:
+      raise RuntimeError(f"a watch daemon is already listening on {path}")
+    finally:
+      probe.close()
+  listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  old_umask = os.umask(0o177)
+  try:
+    listener.bind(str(path))
+  except BaseException:
+    listener.close()
+    raise
+  finally:
+    os.umask(old_umask)
+  listener.listen(16)
+  listener.setblocking(False)
+  return listener
+
+
+def query(path: Path, request: Dict[str, Any], timeout: float = 10.0) -> Dict[str, Any]:
+  """Send one request to the daemon on ``path`` and return its reply."""
+  with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+    client.settimeout(timeout)
+    client.connect(str(path))
+    client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+    buffer = bytearray()
+    while b"\n" not in buffer:
+      chunk = client.recv(65536)
+      if not chunk:
+        break
+      buffer.extend(chunk)
+  if not buffer:
+    raise ConnectionError(f"no reply from {path}")
+  return json.loads(bytes(buffer).split(b"\n", 1)[0])
+
+
+class WatchServer:
+  """Debounced change batches and socket queries in one selector loop."""
+
+  def __init__(
+    self,
+    watcher: TreeWatcher,
+    listener: Optional[socket.socket],
+    on_changes: Callable[[Set[Path]], Any],
+    handle_query: Callable[[Dict[str, Any]], Dict[str, Any]],
+    debounce: float = DEFAULT_DEBOUNCE,
+    interval: float = DEFAULT_INTERVAL
+  ) -> None:
+    self.watcher = watcher
+    self.listener = listener
+    self.on_changes = on_changes
+    self.handle_query = handle_query
+    self.debounce = debounce
+    self.interval = interval
+    self.stopping = False
+    self.stats = {"events": 0, "batches": 0, "queries": 0, "started": time.time(), "last_batch": None}
+    self._pending: Set[Path] = set()
+    self._first_event = 0.0
+    self._last_event = 0.0
+
+  def _deadline(self) -> Optional[float]:
+    if not self._pending:
+      return None
+    return min(self._last_event + self.debounce, self._first_event + self.debounce * MAX_DELAY_FACTOR)
+
+  def _note(self, paths: Set[Path]) -> None:
+    if not paths:
+      return
+    now = time.monotonic()
+    if not self._pending:
+      self._first_event = now
+    self._last_event = now
+    self._pending.update(paths)
+    self.stats["events"] += len(paths)
+
+  def flush(self) -> None:
+    """Hand pending changes to ``on_changes`` now instead of after the debounce."""
+    if self.watcher.fd is not None:
+      # Cheap and non-blocking; the polling backend waits for its next scan.
+      self._note(self.watcher.read())
+    if not self._pending:
+      return
+    paths, self._pending = self._pending, set()
+    self.stats["batches"] += 1
+    self.stats["last_batch"] = time.time()
+    self.on_changes(paths)
+
+  def _answer(self, line: bytes) -> Dict[str, Any]:
+    self.stats["queries"] += 1
+    try:
+      request = json.loads(line)
+      if not isinstance(request, dict) or not request.get("query"):
+        raise ValueError("expected a JSON object with a 'query' field")
+    except ValueError as exc:
+      return {"ok": False, "error": f"bad request: {exc}"}
+    name = request["query"]
+    try:
+      if name == "stop":
+        self.stopping = True
+        return {"ok": True, "result": {"stopping": True}}
+      self.flush()
+      if name == "ping":
+        result = dict(self.stats, backend=self.watcher.backend, watches=self.watcher.watch_count, pid=os.getpid())
+        return {"ok": True, "result": result}
+      return {"ok": True, "result": self.handle_query(request)}
+    except Exception as exc:  # a bad query must not take the daemon down
+      return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+  def serve(self) -> None:
+    """Run until a ``stop`` query arrives or the process is interrupted."""
+    selector = selectors.DefaultSelector()
+    buffers: Dict[int, bytearray] = {}
+    if self.listener is not None:
+      selector.register(self.listener, selectors.EVENT_READ, "accept")
+    if self.watcher.fd is not None:
+      selector.register(self.watcher.fd, selectors.EVENT_READ, "watch")
+    next_poll = time.monotonic() + self.interval
+    try:
+      while not self.stopping:
+        now = time.monotonic()
+        wake = [deadline for deadline in (self._deadline(),) if deadline is not None]
+        if self.watcher.fd is None:
+          wake.append(next_poll)
+        timeout = max(0.0, min(wake) - now) if wake else None
+        for key, _ in selector.select(timeout):
+          if key.data == "accept":
+            try:
+              conn, _ = self.listener.accept()
+            except BlockingIOError:
+              continue
+            conn.settimeout(10.0)
+            buffers[conn.fileno()] = bytearray()
+            selector.register(conn, selectors.EVENT_READ, "client")
+          elif key.data == "watch":
+            self._note(self.watcher.read())
+          else:
+            self._serve_client(selector, key.fileobj, buffers)
+        now = time.monotonic()
+        if self.watcher.fd is None and now >= next_poll:
+          self._note(self.watcher.poll())
+          next_poll = now + self.interval
+        deadline = self._deadline()
+        if deadline is not None and now >= deadline:
+          self.flush()
+    finally:
+      for key in list(selector.get_map().values()):
+        if key.data == "client":
+          key.fileobj.close()
+      selector.close()
+
+  def _serve_client(self, selector: selectors.BaseSelector, conn: socket.socket, buffers: Dict[int, bytearray]) -> None:
+    fileno = conn.fileno()
+    try:
+      chunk = conn.recv(65536)
+    except OSError:
+      chunk = b""
+    buffer = buffers[fileno]
+    buffer.extend(chunk)
+    try:
+      while b"\n" in buffer:
+        line, _, rest = bytes(buffer).partition(b"\n")
+        buffer[:] = rest
+        if line.strip():
+          conn.sendall(json.dumps(self._answer(line), sort_keys=True).encode("utf-8") + b"\n")
+    except OSError:
+      chunk = b""
+    if not chunk:
+      selector.unregister(conn)
+      buffers.pop(fileno, None)
+      conn.close()
@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The engine modules are loaded by installer.py from scripts/, not installed as a package.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+  """A generated three-team workspace; installer.main() runs against its own workflow root."""
+  import installer
+  from benchmark_install import generate_workspace
+
+  config = {"teams": 3, "skills": 2, "files_per_skill": 2, "file_size": 64, "sub_teams": 1, "vault_notes": 1}
+  project_root, workflow_root = generate_workspace(tmp_path, config)
+  # main() resolves the workflow root from installer.__file__.
+  monkeypatch.setattr(installer, "__file__", str(workflow_root / "scripts" / "installer.py"))
+  monkeypatch.setenv("CODEX_HOME", str(tmp_path / "codex-home"))
+  return project_root
@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import action_plan
+from action_plan import ActionPlan, TreeState, atomic_write_text, clone_tree, file_lock, swap_into_place
+
+
+def _tree(root: Path) -> dict:
+  return {str(path.relative_to(root)): path.read_text(encoding="utf-8") for path in sorted(root.rglob("*")) if path.is_file()}
+
+
+def test_execute_runs_deduplicated_operations(tmp_path):
+  (tmp_path / "src.md").write_text("copied\n", encoding="utf-8")
+  (tmp_path / "old.md").write_text("old\n", encoding="utf-8")
+  (tmp_path / "kept.md").write_text("kept\n", encoding="utf-8")
+  plan = ActionPlan(TreeState().scan(tmp_path, max_depth=1))
+  plan.write(tmp_path / "out" / "a.md", "first\n")
+  plan.write(tmp_path / "out" / "a.md", "second\n")
+  plan.write_if_missing(tmp_path / "kept.md", "ignored\n")
+  plan.append_line_if_missing(tmp_path / "out" / "log.md", "- one")
+  plan.append_line_if_missing(tmp_path / "out" / "log.md", "- one")
+  plan.copy(tmp_path / "src.md", tmp_path / "out" / "deep" / "b.md")
+  plan.delete(tmp_path / "old.md")
+  assert [op["op"] for op in plan.operations] == ["write", "write", "copy", "delete"]
+  assert sorted(plan.directories) == [str(tmp_path / "out"), str(tmp_path / "out" / "deep")]
+
+  plan.execute(jobs=4)
+  assert _tree(tmp_path) == {
+    "kept.md": "kept\n",
+    "out/a.md": "second\n",
+    "out/deep/b.md": "copied\n",
+    "out/log.md": "- one\n",
+    "src.md": "copied\n",
+  }
+
+
+def test_copy_replaces_instead_of_writing_through_hard_links(tmp_path):
+  live = tmp_path / "live"
+  live.mkdir()
+  (live / "a.md").write_text("v1\n", encoding="utf-8")
+  clone_tree(live, tmp_path / "stage")
+  (tmp_path / "new.md").write_text("v2\n", encoding="utf-8")
+  plan = ActionPlan(TreeState().scan(tmp_path / "stage", max_depth=1))
+  plan.copy(tmp_path / "new.md", tmp_path / "stage" / "a.md")
+  plan.execute()
+  assert (tmp_path / "stage" / "a.md").read_text(encoding="utf-8") == "v2\n"
+  assert (live / "a.md").read_text(encoding="utf-8") == "v1\n"
+
+
+def test_atomic_write_text_leaves_no_temp_file_on_failure(tmp_path, monkeypatch):
+  path = tmp_path / "note.md"
+  atomic_write_text(path, "one\n")
+
+  def fail(*args):
+    raise OSError("disk full")
+
+  monkeypatch.setattr(action_plan.os, "replace", fail)
+  with pytest.raises(OSError):
+    atomic_write_text(path, "two\n")
+  assert path.read_text(encoding="utf-8") == "one\n"
+  assert [entry.name for entry in tmp_path.iterdir()] == ["note.md"]
+
+
+def test_clone_tree_hard_links_files_and_keeps_symlinks(tmp_path):
+  src = tmp_path / "src"
+  (src / "skills" / "a").mkdir(parents=True)
+  (src / "skills" / "a" / "SKILL.md").write_text("skill\n", encoding="utf-8")
+  os.symlink("a", src / "skills" / "alias")
+  clone_tree(src, tmp_path / "dst")
+  assert os.path.samefile(src / "skills" / "a" / "SKILL.md", tmp_path / "dst" / "skills" / "a" / "SKILL.md")
+  assert os.readlink(tmp_path / "dst" / "skills" / "alias") == "a"
+
+
+@pytest.mark.parametrize("exchange", [True, False])
+def test_swap_into_place(tmp_path, monkeypatch, exchange):
+  if not exchange:
+    # No renameat2 (non-Linux, or an old libc): rename aside, then into place.
+    monkeypatch.setattr(action_plan, "_rename_exchange", lambda first, second: False)
+  target, stage = tmp_path / "target", tmp_path / ".target.stage-1"
+  target.mkdir()
+  (target / "old.md").write_text("old\n", encoding="utf-8")
+  stage.mkdir()
+  (stage / "new.md").write_text("new\n", encoding="utf-8")
+  swap_into_place(stage, target)
+  assert _tree(target) == {"new.md": "new\n"}
+  assert [path.name for path in tmp_path.iterdir()] == ["target"]
+
+
+def test_file_lock_serializes_and_removes_its_file(tmp_path):
+  lock = tmp_path / ".target.lock"
+  holders, overlaps = [], []
+
+  def hold() -> None:
+    with file_lock(lock, remove=True):
+      holders.append(1)
+      overlaps.append(len(holders) > 1)
+      time.sleep(0.01)
+      holders.pop()
+
+  threads = [threading.Thread(target=hold) for _ in range(6)]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  assert overlaps == [False] * 6
+  assert not lock.exists()
@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+
+from activity_export import ActivityExporter
+
+PATHS = {
+  "inbox": "dev_communication/api/inbox",
+  "issues_queue": "dev_communication/api/issues/queue",
+  "issues_completed": "dev_communication/api/issues/completed",
+}
+TEAMS = {"api": {"issue_prefix": "API-ISS", "default_paths": PATHS}}
+
+
+def _write(root: Path, rel: str, text: str) -> Path:
+  path = root / rel
+  path.parent.mkdir(parents=True, exist_ok=True)
+  path.write_text(text, encoding="utf-8")
+  return path
+
+
+def _export(root: Path, cursor: Path, commit: bool = True) -> list:
+  with ActivityExporter(str(cursor), root) as exporter:
+    events = list(exporter.events(TEAMS, []))
+    if commit:
+      exporter.commit()
+  return events
+
+
+def test_cursor_resumes_and_reports_changes(tmp_path):
+  cursor = tmp_path / "cache" / "export.sqlite"
+  issue = _write(tmp_path, f"{PATHS['issues_queue']}/API-ISS-001-task.md", "# API-ISS-001: Task\n\n**Status:** QUEUE\n")
+  _write(tmp_path, f"{PATHS['inbox']}/2024-01-02-hello.md", "# Hello\n")
+  notes = _write(tmp_path, "ai_team_config/api/memory_store/notes.md", "# Notes\n")
+
+  first = _export(tmp_path, cursor)
+  assert sorted(event["event"] for event in first) == ["issue_created", "message_created", "note_appended"]
+  assert [event["seq"] for event in first] == [1, 2, 3]
+  assert _export(tmp_path, cursor) == []
+
+  moved = tmp_path / PATHS["issues_completed"] / issue.name
+  moved.parent.mkdir(parents=True)
+  os.replace(issue, moved)
+  with notes.open("a", encoding="utf-8") as f:
+    f.write("- learned something\n")
+  second = {event["event"]: event for event in _export(tmp_path, cursor)}
+  assert second["issue_moved"]["from"] == "queue" and second["issue_moved"]["to"] == "completed"
+  assert second["note_appended"]["lines"] == ["- learned something"] and not second["note_appended"]["created"]
+  assert sorted(event["seq"] for event in second.values()) == [4, 5]
+
+
+def test_uncommitted_run_is_emitted_again(tmp_path):
+  cursor = tmp_path / "cache" / "export.sqlite"
+  _write(tmp_path, f"{PATHS['inbox']}/2024-01-02-hello.md", "# Hello\n")
+  _export(tmp_path, cursor)
+  _write(tmp_path, f"{PATHS['inbox']}/2024-01-03-again.md", "# Again\n")
+
+  lost = _export(tmp_path, cursor, commit=False)
+  replayed = _export(tmp_path, cursor)
+  assert [event["path"] for event in lost] == [event["path"] for event in replayed] == [f"{PATHS['inbox']}/2024-01-03-again.md"]
+  assert lost[0]["seq"] == replayed[0]["seq"] == 2
+  assert _export(tmp_path, cursor) == []
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+from append_log import AppendLog
+
+
+def _log(tmp_path: Path, max_bytes: int = 0) -> AppendLog:
+  return AppendLog(tmp_path / "vault" / "memory-log.md", max_bytes, tmp_path / "cache")
+
+
+def test_append_dedups_exact_lines(tmp_path):
+  with _log(tmp_path) as log:
+    assert log.append(["- one", "- two", "- one"]) == ["- one", "- two"]
+    assert log.append(["- two  ", "- three", "- on"]) == ["- three", "- on"]
+    assert log.contains("- one") and not log.contains("- four")
+  assert (tmp_path / "vault" / "memory-log.md").read_text(encoding="utf-8") == "- one\n- two\n- three\n- on\n"
+  # The sidecar and its lock stay in the cache, never next to the log.
+  assert sorted(path.name for path in (tmp_path / "vault").iterdir()) == ["memory-log.md"]
+  assert log.sidecar.parent == tmp_path / "cache" and log.lock_path.exists()
+
+
+def test_hand_appended_lines_are_picked_up(tmp_path):
+  with _log(tmp_path) as log:
+    log.append(["- one"])
+    with log.path.open("a", encoding="utf-8") as f:
+      f.write("- by hand\n")
+    assert log.append(["- by hand", "- two"]) == ["- two"]
+    assert log.stats()["sync"] == "current"
+
+
+def test_contains_is_read_only(tmp_path):
+  log = _log(tmp_path)
+  log.path.parent.mkdir(parents=True)
+  log.path.write_text("- one\n", encoding="utf-8")
+  assert log.contains("- one") and not log.contains("- two")
+  assert not log.sidecar.exists() and not log.lock_path.exists()
+
+  with log:
+    log.append(["- two"])
+  stamp = log.sidecar.stat().st_mtime_ns
+  with log.path.open("a", encoding="utf-8") as f:
+    f.write("- three\n")
+  # A stale sidecar is not synced; the answer comes from the file.
+  assert log.contains("- three")
+  assert log.sidecar.stat().st_mtime_ns == stamp
+
+
+def test_rotation_keeps_header_and_dedup_across_segments(tmp_path):
+  with _log(tmp_path, max_bytes=60) as log:
+    log.path.parent.mkdir(parents=True)
+    log.path.write_text("# Memory Log\n\n", encoding="utf-8")
+    for index in range(12):
+      log.append([f"- entry {index:02d}"])
+    segments = log.segment_paths()
+    assert len(segments) >= 2
+    assert log.path.read_text(encoding="utf-8").startswith("# Memory Log\n\nOlder entries: [[memory-log-segments]]\n")
+    assert log.append(["- entry 00", "- entry 11"]) == []
+    assert log.contains("- entry 00")
+
+    names = [segment["name"] for segment in log.stats()["segments"]]
+    assert names == [segment.name for segment in segments]
+    # Same-day segments sort by their counter, not as strings.
+    assert names[0].count("-") < names[1].count("-")
+    listed = [line for line in log.segments_index.read_text(encoding="utf-8").splitlines() if line.startswith("- [[")]
+    assert [line[4:].split("]]")[0] for line in listed] == [Path(name).stem for name in reversed(names)]
+
+
+def test_rebuild_counts_every_segment(tmp_path):
+  with _log(tmp_path, max_bytes=40) as log:
+    for index in range(6):
+      log.append([f"- entry {index}"])
+    log.sidecar.unlink()
+  with _log(tmp_path) as log:
+    assert log.rebuild() >= 6
+    assert log.append([f"- entry {index}" for index in range(6)]) == []
@@ -0,0 +1,125 @@
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import installer
+from architecture_index import ArchitectureIndex, read_index_rows
+
+ROOT = "dev_communication/shared/architecture"
+ADR_INDEX = Path(__file__).resolve().parents[2] / "claude-workflow" / "indexes" / "adr-index.md"
+
+GAPS = """# Gaps
+
+| Gap | Status | Domain | Priority | Suggested ADR |
+|-----|--------|--------|----------|---------------|
+| Rate limits | open | Endpoints | medium | — |
+| Retention | open | Models | high | DATA-002 |
+| Secrets rotation | open | Security | low | — |
+| Old pagination | closed | Endpoints | high | — |
+"""
+
+
+def _adr(root: Path, name: str, status: str = "accepted", domain: str = "Endpoints") -> Path:
+  path = root / ROOT / "decisions" / f"{name}.md"
+  path.parent.mkdir(parents=True, exist_ok=True)
+  path.write_text(f"---\ndate: 2024-02-29\nstatus: {status}\ndomain: {domain}\n---\n# {name[:7]}: {name[8:]}\n", encoding="utf-8")
+  return path
+
+
+def test_invalid_adr_date_is_dropped_not_fatal(tmp_path):
+  decisions = tmp_path / ROOT / "decisions"
+  decisions.mkdir(parents=True)
+  (decisions / "API-001-bad-date.md").write_text("---\ndate: 2024-02-30\nstatus: accepted\n---\n# API-001: Bad date\n", encoding="utf-8")
+  (decisions / "API-002-good.md").write_text("---\ndate: 2024-02-29\nstatus: accepted\n---\n# API-002: Good\n", encoding="utf-8")
+  git = ["git", "-C", str(tmp_path), "-c", "user.name=t", "-c", "user.email=t@example.com"]
+  subprocess.run(git[:3] + ["init", "-q"], check=True)
+  subprocess.run(git + ["commit", "-q", "--allow-empty", "-m", "init"], check=True)
+
+  with ArchitectureIndex(":memory:", tmp_path, ROOT) as index:
+    index.refresh()
+    assert {adr["adr_id"]: adr["date"] for adr in index.adrs()} == {"API-001": None, "API-002": "2024-02-29"}
+    assert [adr["adr_id"] for adr in index.staleness()["adrs"]] == ["API-002"]
+
+
+def test_refresh_reparses_only_changed_files(tmp_path):
+  first = _adr(tmp_path, "API-001-routes")
+  _adr(tmp_path, "API-002-caching")
+  (tmp_path / ROOT / "gaps").mkdir()
+  (tmp_path / ROOT / "gaps" / "index.md").write_text(GAPS, encoding="utf-8")
+  db = str(tmp_path / "architecture.sqlite")
+
+  with ArchitectureIndex(db, tmp_path, ROOT) as index:
+    assert index.refresh() == {"parsed": 3, "unchanged": 0, "removed": 0, "adr_changes": 2}
+  with ArchitectureIndex(db, tmp_path, ROOT) as index:
+    assert index.refresh() == {"parsed": 0, "unchanged": 3, "removed": 0, "adr_changes": 0}
+
+    # Same size, new mtime: the path+mtime key still picks it up.
+    first.write_text(first.read_text(encoding="utf-8").replace("accepted", "proposed"), encoding="utf-8")
+    stat = first.stat()
+    os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert index.refresh() == {"parsed": 1, "unchanged": 2, "removed": 0, "adr_changes": 1}
+    assert {adr["adr_id"]: adr["status"] for adr in index.adrs()} == {"API-001": "proposed", "API-002": "accepted"}
+
+    (tmp_path / ROOT / "decisions" / "API-002-caching.md").unlink()
+    assert index.refresh() == {"parsed": 0, "unchanged": 2, "removed": 1, "adr_changes": 1}
+    assert [adr["adr_id"] for adr in index.adrs()] == ["API-001"]
+
+
+def test_next_adr_id_counts_files_and_index_rows(tmp_path):
+  _adr(tmp_path, "API-001-routes")
+  _adr(tmp_path, "API-003-versioning", status="proposed")
+  with ArchitectureIndex(":memory:", tmp_path, ROOT) as index:
+    index.refresh()
+    assert index.next_adr_id("API") == "API-004"
+    assert index.next_adr_id("adr-api") == "API-004"
+    assert index.next_adr_id("NEW") == "NEW-001"
+    # adr-index.md also lists API-001..003 and DEV-002 without files here.
+    rows = read_index_rows(ADR_INDEX)
+    assert index.next_adr_id("API", {**rows, "API-007": {}}) == "API-008"
+    assert index.next_adr_id("DEV", rows) == "DEV-003"
+
+
+def test_coverage_counts_adrs_and_open_gaps_per_domain(tmp_path):
+  _adr(tmp_path, "API-001-routes")
+  _adr(tmp_path, "API-002-caching")
+  _adr(tmp_path, "DATA-001-models", status="proposed", domain="Models")
+  (tmp_path / ROOT / "gaps").mkdir()
+  (tmp_path / ROOT / "gaps" / "index.md").write_text(GAPS, encoding="utf-8")
+  with ArchitectureIndex(":memory:", tmp_path, ROOT) as index:
+    index.refresh()
+    coverage = index.coverage({"DEV-001": {"domain": "Testing"}, "API-001": {"domain": "Endpoints"}})
+  assert [(entry["code"], entry["coverage"]) for entry in coverage] == [
+    ("SECURITY", "missing"),
+    ("DATA", "weak"),
+    ("API", "covered"),
+    ("DEV", "covered"),
+  ]
+  by_code = {entry["code"]: entry for entry in coverage}
+  # Gap domains given by name land on the ADR code; closed gaps are not counted.
+  assert by_code["API"] == {"code": "API", "name": "Endpoints", "adrs": {"accepted": 2}, "open_gaps": 1, "high_gaps": 0, "coverage": "covered"}
+  assert by_code["DATA"]["adrs"] == {"proposed": 1} and by_code["DATA"]["high_gaps"] == 1
+  assert by_code["DEV"]["adrs"] == {"accepted": 1} and by_code["SECURITY"]["adrs"] == {}
+
+
+@pytest.mark.parametrize("action", [["status"], ["check"], ["gaps"], ["next-id", "API"], ["stale"]])
+def test_only_sync_index_rewrites_adr_index(workspace, capsys, action):
+  indexes = workspace / "indexes"
+  indexes.mkdir()
+  index_path = indexes / "adr-index.md"
+  shutil.copy2(ADR_INDEX, index_path)
+  _adr(workspace, "API-004-errors")
+  before = (index_path.read_bytes(), index_path.stat().st_mtime_ns)
+
+  def adr(*argv: str) -> int:
+    return installer.main(["adr", *argv, "--indexes", str(indexes), "--workspace-root", str(workspace), "--json"])
+
+  assert adr(*action) == 0
+  assert (index_path.read_bytes(), index_path.stat().st_mtime_ns) == before
+
+  assert adr("sync-index", "--dry-run") == 0
+  assert index_path.read_bytes() == before[0]
+  assert adr("sync-index") == 0
+  assert "API-004|Endpoints|errors|—|—\n" in index_path.read_text(encoding="utf-8")
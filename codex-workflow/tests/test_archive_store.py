@@ -0,0 +1,82 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from archive_store import ARCHIVE_DIR, ArchiveStore, find_candidates
+from comms import CommsIndex
+
+PATHS = {"issues_queue": "dev_communication/api/issues/queue", "issues_completed": "dev_communication/api/issues/completed"}
+OLD = 1_600_000_000  # 2020-09-13
+
+
+def _issue(root: Path, folder: str, name: str, status: str = "COMPLETE") -> Path:
+  path = root / PATHS[folder] / name
+  path.parent.mkdir(parents=True, exist_ok=True)
+  path.write_text(f"# {name[:11]}: Subject of {name}\n\n**Status:** {status}\n\n## Details\n\nBody.\n", encoding="utf-8")
+  os.utime(path, (OLD, OLD))
+  return path
+
+
+def _store(root: Path, segment_bytes: int = 1024 * 1024) -> ArchiveStore:
+  return ArchiveStore(root, ARCHIVE_DIR, root / "cache" / "archive.lock", segment_bytes)
+
+
+def _pack(root: Path, store: ArchiveStore) -> dict:
+  return store.pack(find_candidates(root, {"api": PATHS["issues_completed"]}, store.archive_rel, 30))
+
+
+def test_next_issue_number_counts_packed_issues(tmp_path):
+  for number in (1, 2, 3):
+    _issue(tmp_path, "issues_completed", f"API-ISS-00{number}-done.md")
+  store = _store(tmp_path)
+  assert len(_pack(tmp_path, store)["items"]) == 3
+  assert not list((tmp_path / PATHS["issues_completed"]).iterdir())
+
+  with CommsIndex(":memory:", tmp_path) as index:
+    index.refresh("api", PATHS)
+    assert index.next_issue_number("api", "API-ISS") == 1
+    assert index.next_issue_number("api", "API-ISS", store.max_issue_number("API-ISS", "api")) == 4
+  assert store.max_issue_number("API-ISS", "web") == 0
+
+
+def test_pack_find_read_and_restore_round_trip(tmp_path):
+  originals = {name: _issue(tmp_path, "issues_completed", name) for name in ("API-ISS-001-login.md", "API-ISS-002-logout.md")}
+  contents = {name: path.read_bytes() for name, path in originals.items()}
+  recent = _issue(tmp_path, "issues_completed", "API-ISS-003-recent.md")
+  os.utime(recent, None)
+  store = _store(tmp_path, segment_bytes=64)  # tiny segments: every document rolls over
+
+  packed = _pack(tmp_path, store)
+  assert sorted(item["item"].rsplit("/", 1)[-1] for item in packed["items"]) == sorted(originals)
+  assert not any(path.exists() for path in originals.values()) and recent.exists()
+  assert len(store.segments()) == 2
+
+  item, entries = store.find("api-iss-002")
+  assert item == f"{PATHS['issues_completed']}/API-ISS-002-logout.md"
+  assert store.read(entries[0]) == contents["API-ISS-002-logout.md"]
+  assert store.find("logout") == (item, entries)
+  assert [result["path"] for result in store.search(["logout"])] == [item]
+
+  assert store.restore(item) == [item]
+  restored = tmp_path / item
+  assert restored.read_bytes() == contents["API-ISS-002-logout.md"] and restored.stat().st_mtime == OLD
+  assert store.find("API-ISS-002") == (None, [])
+  assert store.max_issue_number("API-ISS") == 2
+
+  # Restoring over an existing file needs force.
+  _pack(tmp_path, store)
+  item, _ = store.find("API-ISS-002")
+  restored.write_text("edited\n", encoding="utf-8")
+  with pytest.raises(FileExistsError):
+    store.restore(item)
+  store.restore(item, force=True)
+  assert restored.read_bytes() == contents["API-ISS-002-logout.md"]
+
+
+def test_pack_dry_run_changes_nothing(tmp_path):
+  path = _issue(tmp_path, "issues_completed", "API-ISS-001-done.md")
+  store = _store(tmp_path)
+  result = store.pack(find_candidates(tmp_path, {"api": PATHS["issues_completed"]}, store.archive_rel, 30), dry_run=True)
+  assert [item["item"] for item in result["items"]] == [f"{PATHS['issues_completed']}/API-ISS-001-done.md"]
+  assert path.exists() and store.segments() == []
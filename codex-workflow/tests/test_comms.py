@@ -0,0 +1,124 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import comms
+from comms import CommsIndex, parse_header, plan_moves, resume_moves, rollback_moves, run_moves
+
+PATHS = {
+  "issues_queue": "dev_communication/api/issues/queue",
+  "issues_active": "dev_communication/api/issues/active",
+  "issues_completed": "dev_communication/api/issues/completed",
+}
+
+
+def _setup(root: Path) -> list:
+  queue = root / PATHS["issues_queue"]
+  queue.mkdir(parents=True)
+  for number in (1, 2, 3):
+    (queue / f"API-ISS-00{number}-task.md").write_text(f"# API-ISS-00{number}: Task\n\n**Status:** QUEUE\n\n## Details\n\nBody.\n", encoding="utf-8")
+  with CommsIndex(":memory:", root) as index:
+    index.refresh("api", PATHS)
+    moves, unmatched, conflicts = plan_moves(index, "api", ["API-ISS-*"], PATHS, "active")
+  assert unmatched == [] and conflicts == [] and len(moves) == 3
+  return moves
+
+
+def _crash_after(monkeypatch, calls: int) -> None:
+  move_one = comms._move_one
+  count = {"n": 0}
+
+  def flaky(*args):
+    if count["n"] == calls:
+      raise OSError("simulated crash")
+    count["n"] += 1
+    move_one(*args)
+
+  monkeypatch.setattr(comms, "_move_one", flaky)
+
+
+def _folder(root: Path, name: str) -> list:
+  directory = root / PATHS[f"issues_{name}"]
+  return sorted(path.name for path in directory.iterdir()) if directory.exists() else []
+
+
+def test_resume_finishes_an_interrupted_batch(tmp_path, monkeypatch):
+  moves = _setup(tmp_path)
+  journal = tmp_path / "cache" / "move.jsonl"
+  _crash_after(monkeypatch, 1)
+  with pytest.raises(OSError):
+    run_moves(tmp_path, journal, moves, {"batch": "b1"})
+  assert journal.exists() and len(_folder(tmp_path, "active")) == 1
+  monkeypatch.undo()
+
+  result = resume_moves(tmp_path, journal)
+  assert result["batch"] == "b1" and result["previously_done"] == 1 and len(result["moved"]) == 2
+  assert not journal.exists() and _folder(tmp_path, "queue") == []
+  for name in _folder(tmp_path, "active"):
+    assert parse_header(tmp_path / PATHS["issues_active"] / name)["status"] == "ACTIVE"
+
+
+def test_rollback_restores_folder_and_status(tmp_path, monkeypatch):
+  moves = _setup(tmp_path)
+  before = {path.name: path.read_bytes() for path in (tmp_path / PATHS["issues_queue"]).iterdir()}
+  journal = tmp_path / "cache" / "move.jsonl"
+  _crash_after(monkeypatch, 2)
+  with pytest.raises(OSError):
+    run_moves(tmp_path, journal, moves, {"batch": "b2"})
+  monkeypatch.undo()
+
+  result = rollback_moves(tmp_path, journal)
+  assert result["batch"] == "b2" and len(result["restored"]) == 2
+  assert not journal.exists() and _folder(tmp_path, "active") == []
+  assert {path.name: path.read_bytes() for path in (tmp_path / PATHS["issues_queue"]).iterdir()} == before
+
+
+def test_rollback_after_copy_before_unlink_keeps_source(tmp_path):
+  moves = _setup(tmp_path)[:1]
+  journal = tmp_path / "cache" / "move.jsonl"
+  journal.parent.mkdir()
+  journal.write_text(json.dumps({"batch": "b3", "count": 1}) + "\n" + json.dumps(moves[0]) + "\n", encoding="utf-8")
+  # Crash between writing the destination and removing the source.
+  src, dst = tmp_path / moves[0]["src"], tmp_path / moves[0]["dst"]
+  dst.parent.mkdir(parents=True)
+  comms.rewrite_status(src, dst, "ACTIVE")
+
+  rollback_moves(tmp_path, journal)
+  assert not dst.exists() and parse_header(src)["status"] == "QUEUE"
+
+
+def test_plan_reports_taken_destinations_as_conflicts(tmp_path):
+  _setup(tmp_path)
+  active = tmp_path / PATHS["issues_active"]
+  active.mkdir(parents=True)
+  (active / "API-ISS-002-task.md").write_text("# API-ISS-002: Another copy\n", encoding="utf-8")
+  queued = f"{PATHS['issues_queue']}/API-ISS-002-task.md"
+  with CommsIndex(":memory:", tmp_path) as index:
+    index.refresh("api", PATHS)
+    moves, _, conflicts = plan_moves(index, "api", ["API-ISS-*"], PATHS, "active")
+    # The active copy only gets its status set; the queued one would replace it.
+    assert [move["src"] for move in conflicts] == [queued]
+    assert len(moves) == 3 and queued not in [move["src"] for move in moves]
+
+    moves, _, conflicts = plan_moves(index, "api", ["API-ISS-002"], PATHS, "completed")
+    # Both copies claim the same completed path; the second one conflicts.
+    assert len(moves) == 1 and len(conflicts) == 1 and moves[0]["dst"] == conflicts[0]["dst"]
+
+
+def test_moves_never_replace_an_unrelated_file(tmp_path):
+  moves = _setup(tmp_path)[:1]
+  dst = tmp_path / moves[0]["dst"]
+  dst.parent.mkdir(parents=True)
+  # Created after planning: the move fails instead of overwriting it.
+  dst.write_text("unrelated\n", encoding="utf-8")
+  journal = tmp_path / "cache" / "move.jsonl"
+  with pytest.raises(FileExistsError):
+    run_moves(tmp_path, journal, moves, {"batch": "b4"})
+  assert dst.read_text(encoding="utf-8") == "unrelated\n"
+  assert json.loads(journal.read_text(encoding="utf-8").splitlines()[1])["dst_existed"] is True
+
+  # Rollback leaves dst alone: the batch did not create it.
+  rollback_moves(tmp_path, journal)
+  assert dst.read_text(encoding="utf-8") == "unrelated\n"
+  assert parse_header(tmp_path / moves[0]["src"])["status"] == "QUEUE"
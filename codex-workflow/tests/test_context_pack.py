@@ -0,0 +1,60 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+import installer
+from context_pack import _render_item, estimate_tokens, summarize
+
+CLAUDE_WORKFLOW = Path(__file__).resolve().parents[2] / "claude-workflow"
+
+
+def test_summaries_drop_wiki_links():
+  text = (
+    "---\nname: Retry policy\n---\n# Retry [[ai_team_config/api/index|API]] policy\n\n"
+    "Backlinks: [[ai_team_config/api/index]]\n\nUse [[backoff-pattern]] for [[ADR-001#Decision|retries]].\n\n"
+    "## Details [[ref]]\n\n- see [[ai_team_config/memory_store/note]]\n"
+  )
+  title, summary = summarize(text, 200)
+  assert title == "Retry API policy"
+  assert summary == "Use backoff-pattern for retries.\n**Details ref:**\n- see ai_team_config/memory_store/note"
+
+  block = _render_item("memory", "ai_team_config/api/note.md", {"title": "[[x|X]] note", "summary": "from [[cache]]"}, None)
+  assert "[[" not in block and block.startswith("### X note\n")
+
+
+@pytest.fixture
+def pack_workspace(workspace):
+  shutil.copytree(CLAUDE_WORKFLOW / "indexes", workspace / ".claude-workflow" / "indexes")
+  shutil.copytree(CLAUDE_WORKFLOW / "patterns" / "active", workspace / ".claude-workflow" / "patterns" / "active")
+  return workspace
+
+
+def _build(project_root: Path, capsys, budget: int) -> dict:
+  argv = ["context", "add", "a", "new", "endpoint", "--team", "team-0000", "--workspace-root", str(project_root), "--budget", str(budget), "--json"]
+  assert installer.main(argv) == 0
+  return json.loads(capsys.readouterr().out)
+
+
+@pytest.mark.parametrize("budget", [200, 600, 1500])
+def test_pack_stays_within_the_token_budget(pack_workspace, capsys, budget):
+  result = _build(pack_workspace, capsys, budget)
+  markdown = Path(result["path"]).read_text(encoding="utf-8")
+  assert result["tokens"] <= estimate_tokens(markdown) <= budget
+  assert result["items"] and (result["skipped_for_budget"] > 0) == (budget < 1500)
+
+
+def test_pack_cache_is_invalidated_by_a_changed_source(pack_workspace, capsys):
+  first = _build(pack_workspace, capsys, 600)
+  assert first["cached"] is False and first["summaries"]["summary_hits"] == 0
+  second = _build(pack_workspace, capsys, 600)
+  assert second["cached"] is True and second["summaries"]["summarized"] == 0
+  assert second["items"] == first["items"]
+
+  pattern = pack_workspace / ".claude-workflow" / "patterns" / "active" / "endpoint-structure.md"
+  pattern.write_text(pattern.read_text(encoding="utf-8") + "\nExtra note.\n", encoding="utf-8")
+  third = _build(pack_workspace, capsys, 600)
+  # Only the edited pattern is summarized again; the others come from the content-hash cache.
+  assert third["cached"] is False
+  assert third["summaries"] == {"summarized": 1, "summary_hits": first["summaries"]["summarized"] - 1}
@@ -0,0 +1,98 @@
+import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import installer
+
+
+def _main(project_root: Path, *argv: str) -> int:
+  return installer.main(["--workspace-root", str(project_root), *argv])
+
+
+def test_batch_install_writes_each_team(workspace, capsys):
+  out = workspace.parent / "out"
+  assert _main(workspace, "--teams", "team-0000,t1", "--target", str(out)) == 0
+  assert "Teams: 2" in capsys.readouterr().out
+  for team_id in ("team-0000", "team-0001"):
+    manifest = json.loads((out / team_id / "install-manifest.json").read_text(encoding="utf-8"))
+    assert manifest["team_id"] == team_id
+    assert (out / team_id / "skills" / "skill-000" / "SKILL.md").is_file()
+    assert (out / team_id / "TEAM_PROFILE.md").read_text(encoding="utf-8").startswith(f"# Active Team Profile: {team_id}\n")
+  assert not (out / "team-0002").exists()
+
+  assert _main(workspace, "--all-teams", "--target", str(out)) == 0
+  assert sorted(path.name for path in out.iterdir() if path.is_dir()) == ["team-0000", "team-0001", "team-0002"]
+
+
+def test_batch_install_rejects_unknown_team(workspace, capsys):
+  out = workspace.parent / "out"
+  assert _main(workspace, "--teams", "team-0000,nope", "--target", str(out)) == 2
+  assert "Unknown team(s): nope" in capsys.readouterr().err
+  assert not out.exists()
+
+
+def test_force_reinstall_copies_only_changed_files(workspace, capsys):
+  out = workspace.parent / "out"
+  assert _main(workspace, "--team", "team-0000", "--target", str(out)) == 0
+  assert "Files: copied=6 skipped=0 deleted=0" in capsys.readouterr().out
+
+  skill = workspace / ".codex-workflow" / "skills" / "skill-000" / "SKILL.md"
+  skill.write_text(skill.read_text(encoding="utf-8") + "edited\n", encoding="utf-8")
+  assert _main(workspace, "--team", "team-0000", "--target", str(out), "--force") == 0
+  assert "Files: copied=1 skipped=5 deleted=0" in capsys.readouterr().out
+  assert (out / "skills" / "skill-000" / "SKILL.md").read_text(encoding="utf-8").endswith("edited\n")
+
+
+def test_rerun_with_unchanged_inputs_is_a_no_op(workspace, capsys):
+  out = workspace.parent / "out"
+  assert _main(workspace, "--team", "team-0000", "--target", str(out)) == 0
+  manifest = (out / "install-manifest.json").read_text(encoding="utf-8")
+  capsys.readouterr()
+
+  assert _main(workspace, "--team", "team-0000", "--target", str(out)) == 0
+  assert capsys.readouterr().out.startswith(f"Up to date: {out} (team team-0000)")
+  assert (out / "install-manifest.json").read_text(encoding="utf-8") == manifest
+
+
+@pytest.mark.parametrize("removed", [
+  "ai_team_config/team-0000/skill_store/skill-001/memory_store/index.md",
+  "ai_team_config/team-0000/context_store",
+  "out/skills/skill-000/references/ref-001.md",
+])
+def test_rerun_reinstalls_when_an_output_is_missing(workspace, capsys, removed):
+  out = workspace.parent / "out"
+  assert _main(workspace, "--team", "team-0000", "--target", str(out)) == 0
+  path = (workspace.parent if removed.startswith("out/") else workspace) / removed
+  shutil.rmtree(path) if path.is_dir() else path.unlink()
+  capsys.readouterr()
+
+  assert _main(workspace, "--team", "team-0000", "--target", str(out), "--force") == 0
+  assert capsys.readouterr().out.startswith("Installation complete.")
+  assert path.exists()
+
+
+def test_concurrent_installs_leave_an_intact_target(workspace, capsys):
+  out = workspace.parent / "skills" / "codex-workflow"
+  argv = ["--team", "team-0000", "--target", str(out), "--force", "--full-copy"]
+  with ThreadPoolExecutor(max_workers=4) as pool:
+    codes = list(pool.map(lambda _: _main(workspace, *argv), range(8)))
+  assert codes == [0] * 8
+
+  manifest = json.loads((out / "install-manifest.json").read_text(encoding="utf-8"))
+  installed = sorted(str(path.relative_to(out)) for path in out.rglob("*") if path.is_file())
+  assert installed == sorted([*manifest["files"], "TEAM_PROFILE.md", "config/active-team.json", "install-manifest.json"])
+  # No staging directories or lock files are left next to the target.
+  assert [path.name for path in out.parent.iterdir()] == ["codex-workflow"]
+
+
+def test_recursive_detect_skips_node_modules(workspace, capsys):
+  (workspace / "repo-0001" / ".git").mkdir(parents=True)
+  (workspace / "node_modules" / "repo-0002" / ".git").mkdir(parents=True)
+  assert _main(workspace, "--detect-team", "--recursive", str(workspace)) == 0
+  assert json.loads(capsys.readouterr().out) == {
+    str(workspace): {"team": "team-0000", "source": "registry"},
+    str(workspace / "repo-0001"): {"team": "team-0001", "source": "registry"},
+  }
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import object_store
+from object_store import ObjectStore
+
+
+def _put(store: ObjectStore, tmp_path: Path, text: str) -> str:
+  src = tmp_path / "src" / f"{len(text)}-{text[:8]}.md"
+  src.parent.mkdir(parents=True, exist_ok=True)
+  src.write_text(text, encoding="utf-8")
+  digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+  store.put(src, digest)
+  return digest
+
+
+def _install(target: Path, digests, link_mode: str = "hardlink") -> None:
+  target.mkdir(parents=True, exist_ok=True)
+  files = {f"file-{index}": {"sha256": digest} for index, digest in enumerate(digests)}
+  (target / "install-manifest.json").write_text(json.dumps({"link_mode": link_mode, "files": files}), encoding="utf-8")
+
+
+def test_gc_keeps_only_referenced_objects(tmp_path):
+  store = ObjectStore(tmp_path / "store")
+  kept, dropped = _put(store, tmp_path, "kept\n"), _put(store, tmp_path, "dropped\n")
+  _install(tmp_path / "a", [kept])
+  store.register_install(tmp_path / "a", "now")
+  store.register_install(tmp_path / "gone", "now")
+
+  preview = store.gc(dry_run=True)
+  assert preview == {"kept": 1, "removed": 1, "bytes_freed": len("dropped\n"), "stale_installs": 1}
+  assert store.object_path(dropped).exists()
+
+  assert store.gc()["removed"] == 1
+  assert store.object_path(kept).exists() and not store.object_path(dropped).exists()
+  assert list(json.loads(store.installs_path.read_text(encoding="utf-8"))) == [str(tmp_path / "a")]
+
+
+def test_gc_ignores_copy_mode_targets_unless_given_explicitly(tmp_path):
+  store = ObjectStore(tmp_path / "store")
+  digest = _put(store, tmp_path, "copied\n")
+  _install(tmp_path / "a", [digest], link_mode="copy")
+  store.register_install(tmp_path / "a", "now")
+  assert store.gc([tmp_path / "a" / "install-manifest.json"], dry_run=True)["removed"] == 0
+  assert store.gc()["removed"] == 1
+
+
+def test_reservation_protects_in_flight_objects(tmp_path):
+  store = ObjectStore(tmp_path / "store")
+  digest = _put(store, tmp_path, "in flight\n")
+  store.reserve(tmp_path / "new", [digest])
+  # No manifest yet: only the reservation keeps the object and the target.
+  assert store.gc() == {"kept": 1, "removed": 0, "bytes_freed": 0, "stale_installs": 0}
+
+  _install(tmp_path / "new", [digest])
+  store.register_install(tmp_path / "new", "now")
+  assert "pending" not in json.loads(store.installs_path.read_text(encoding="utf-8"))[str(tmp_path / "new")]
+  assert store.gc()["kept"] == 1
+
+
+def test_expired_reservation_is_collected(tmp_path, monkeypatch):
+  store = ObjectStore(tmp_path / "store")
+  digest = _put(store, tmp_path, "crashed\n")
+  store.reserve(tmp_path / "crashed", [digest])
+  later = time.time() + object_store.RESERVATION_TTL + 1
+  monkeypatch.setattr(object_store.time, "time", lambda: later)
+  assert store.gc() == {"kept": 0, "removed": 1, "bytes_freed": len("crashed\n"), "stale_installs": 1}
+
+
+def test_installer_link_modes_match_store():
+  import installer
+
+  assert installer._LINK_MODES == object_store.LINK_MODES
@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import reflect_analyzer
+from reflect_analyzer import DEFAULT_THRESHOLD, compile_signature, find_candidates, score_file, weigh_signatures
+
+PATTERNS = Path(__file__).resolve().parents[2] / "claude-workflow" / "patterns" / "active"
+
+ROUTES = """import { Router } from 'express';
+import { isAuthenticated } from '@/middlewares/isAuthenticated';
+import { authorize } from '@/middlewares/authorize';
+import { validateCreate, validateList } from '@/validators/widget.validator';
+import * as controller from '@/controllers/catalog/widget.controller';
+
+const router = Router();
+router.use(isAuthenticated);
+router.get('/', authorize('content:widgets:read'), validateList, controller.list);
+router.post('/', authorize('content:widgets:manage'), validateCreate, controller.create);
+
+export default router;
+"""
+
+
+def test_compile_signature_collects_globs_names_and_modules():
+  text = """---
+name: jobs-queue
+work_types: [background-job]
+paths: [src/queues/{name}.queue.ts]
+---
+
+# jobs-queue
+
+Jobs live in `src/jobs/{name}.job.ts`.
+
+```
+src/
+├── jobs/
+│   └── {name}.job.ts
+└── workers/
+```
+
+```typescript
+import { Queue } from 'bullmq';
+import { logger } from '@/utils/logger';
+
+const queue = new Queue('{name}');
+queue.add('run', payload);
+logger.info(`queued`);
+```
+"""
+  signature = compile_signature(text, "fallback")
+  assert signature["name"] == "jobs-queue" and signature["work_types"] == ["background-job"]
+  assert signature["globs"] == ["src/jobs/*.job.ts", "src/queues/*.queue.ts", "src/workers/*"]
+  assert {"Queue", "logger"} <= set(signature["identifiers"])
+  assert signature["calls"] == ["logger.info", "queue.add"]
+  assert signature["modules"] == ["bullmq", "utils/logger"]
+
+
+def test_conforming_route_scores_endpoint_structure(tmp_path):
+  signatures = weigh_signatures([compile_signature(path.read_text(encoding="utf-8"), path.stem) for path in sorted(PATTERNS.glob("*.md"))])
+  reflect_analyzer.init_worker(signatures, str(tmp_path), DEFAULT_THRESHOLD)
+
+  result = score_file("added", "src/routes/v2/widgets.routes.ts", ROUTES)
+  best = result["matches"][0]
+  assert best["pattern"] == "endpoint-structure" and best["location"] == "src/routes/v2/*.routes.ts"
+  assert best["score"] >= DEFAULT_THRESHOLD and "Router" in best["signals"]
+  assert "signals" not in result
+
+  # An unrelated file outside every pattern location matches nothing.
+  other = score_file("added", "scripts/seed.ts", "const seed = loadFixtures();\n")
+  assert other["matches"] == [] and other["drift"] == []
+
+
+def test_find_candidates_groups_unmatched_new_files():
+  def added(path, *signals):
+    return {"path": path, "status": "added", "matches": [], "drift": [], "signals": list(signals)}
+
+  results = [
+    added("src/jobs/email.job.ts", "mod:bullmq", "call:queue.add", "id:EmailJob"),
+    added("src/jobs/billing/invoice.job.ts", "mod:bullmq", "call:queue.add", "id:InvoiceJob"),
+    added("src/jobs/cleanup.job.ts", "mod:bullmq", "call:queue.add"),
+    added("src/lib/one.helper.ts", "mod:lodash"),
+    dict(added("src/jobs/report.job.ts", "mod:bullmq"), status="modified"),
+  ]
+  assert find_candidates(results, known=[]) == [{
+    "name": "jobs",
+    "glob": "src/jobs/*.job.ts",
+    "files": ["src/jobs/billing/invoice.job.ts", "src/jobs/cleanup.job.ts", "src/jobs/email.job.ts"],
+    "shared": ["queue.add", "bullmq"],
+  }]
+  assert find_candidates(results, known=["jobs"])[0]["name"] == "jobs-variant"
+  assert find_candidates(results, known=[], min_files=4) == []
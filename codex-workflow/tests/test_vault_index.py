@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from vault_index import VaultIndex
+
+
+def _note(root: Path, rel: str, text: str) -> Path:
+  path = root / "ai_team_config" / rel
+  path.parent.mkdir(parents=True, exist_ok=True)
+  path.write_text(text, encoding="utf-8")
+  return path
+
+
+def test_sync_backlink_headers_merges_and_keeps_label(tmp_path):
+  target = _note(tmp_path, "api/memory_store/note.md", "# Note\n\nBacklinks: [[ai_team_config/api/index]] [[manual-page]]\n\nBody.\n")
+  _note(tmp_path, "api/index.md", "# API\n\n- [[ai_team_config/api/memory_store/note]]\n")
+  _note(tmp_path, "api/memory_store/other.md", "# Other\n\nSee [[note]].\n")
+
+  with VaultIndex(":memory:", tmp_path) as index:
+    index.refresh()
+    changes = index.sync_backlink_headers()
+    assert [change["path"] for change in changes] == ["ai_team_config/api/memory_store/note.md"]
+    assert target.read_text(encoding="utf-8").splitlines()[2] == (
+      "Backlinks: [[ai_team_config/api/index]] [[manual-page]] [[ai_team_config/api/memory_store/other]]"
+    )
+    index.refresh()
+    assert index.sync_backlink_headers() == []
+
+
+def test_sync_backlink_headers_keeps_singular_label(tmp_path):
+  target = _note(tmp_path, "api/memory_store/note.md", "# Note\n\nBacklink: [[manual-page]]\n")
+  _note(tmp_path, "api/index.md", "# API\n\n- [[ai_team_config/api/memory_store/note]]\n")
+
+  with VaultIndex(":memory:", tmp_path) as index:
+    index.refresh()
+    index.sync_backlink_headers()
+  assert target.read_text(encoding="utf-8").splitlines()[2] == "Backlink: [[manual-page]] [[ai_team_config/api/index]]"
@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+import watch_daemon
+from watch_daemon import MAX_DELAY_FACTOR, TreeWatcher, WatchServer, bind_socket, query
+
+
+def test_poll_reports_a_changed_definition(tmp_path):
+  definition = tmp_path / "dev_communication" / "backend" / "definition.yaml"
+  definition.parent.mkdir(parents=True)
+  definition.write_text("team:\n  id: backend\n", encoding="utf-8")
+  (tmp_path / "dev_communication" / "node_modules").mkdir()
+  with TreeWatcher([tmp_path / "dev_communication", tmp_path / "missing"], poll=True) as watcher:
+    assert watcher.backend == "polling" and watcher.poll() == set()
+    definition.write_text("team:\n  id: backend\n  alias: api\n", encoding="utf-8")
+    (tmp_path / "dev_communication" / "node_modules" / "ignored.yaml").write_text("x\n", encoding="utf-8")
+    assert watcher.poll() == {definition}
+    definition.unlink()
+    assert watcher.poll() == {definition}
+
+
+def test_events_are_debounced_into_one_batch(tmp_path, monkeypatch):
+  clock = [100.0]
+  monkeypatch.setattr(watch_daemon.time, "monotonic", lambda: clock[0])
+  batches = []
+  with TreeWatcher([tmp_path], poll=True) as watcher:
+    server = WatchServer(watcher, None, batches.append, lambda request: {}, debounce=0.5)
+    assert server._deadline() is None
+    for index in range(3):
+      server._note({tmp_path / f"{index}.md"})
+      clock[0] += 0.2
+    # Each event pushes the flush back by the debounce delay...
+    assert server._deadline() == pytest.approx(100.4 + 0.5)
+    for _ in range(30):
+      server._note({tmp_path / "0.md"})
+      clock[0] += 0.2
+    # ...but a steady stream is still flushed after MAX_DELAY_FACTOR delays.
+    assert server._deadline() == 100.0 + 0.5 * MAX_DELAY_FACTOR
+    server.flush()
+  assert batches == [{tmp_path / f"{index}.md" for index in range(3)}]
+  assert server.stats["events"] == 33 and server.stats["batches"] == 1
+
+
+def test_socket_queries(tmp_path):
+  socket_path = tmp_path / "watch.sock"
+  listener = bind_socket(socket_path)
+  seen = []
+
+  def handle(request):
+    seen.append(request)
+    if request["query"] == "boom":
+      raise KeyError("boom")
+    return {"team": "backend"}
+
+  with TreeWatcher([tmp_path], poll=True) as watcher:
+    server = WatchServer(watcher, listener, lambda paths: None, handle, interval=0.05)
+    thread = threading.Thread(target=server.serve)
+    thread.start()
+    try:
+      assert query(socket_path, {"query": "team"}) == {"ok": True, "result": {"team": "backend"}}
+      assert query(socket_path, {"query": "ping"})["result"]["backend"] == "polling"
+      assert query(socket_path, {"query": "boom"}) == {"ok": False, "error": "KeyError: 'boom'"}
+      assert query(socket_path, {"nope": 1})["ok"] is False
+    finally:
+      assert query(socket_path, {"query": "stop"})["result"] == {"stopping": True}
+      thread.join(timeout=5)
+  listener.close()
+  assert not thread.is_alive() and [request["query"] for request in seen] == ["team", "boom"]